@@ -0,0 +1,243 @@
+"""
+Benchmarks for Chain Guardian's hot paths on synthetic stores.
+
+    python -m benchmarks.bench_core                        # full run: 1k/100k/1M orders, 10..10k addresses
+    python -m benchmarks.bench_core --orders 1000 --addresses 10 --out bench.json
+    python -m benchmarks.bench_core --compare bench-0.1.0.json
+
+Results are JSON ({"meta": ..., "results": [...]}) so runs from different releases can be
+diffed; --compare prints the ratio against a previous file and exits non-zero on regressions.
+All network access is stubbed: requests.get returns canned payloads and never leaves the box.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import requests
+
+ORDER_SIZES = [1_000, 100_000, 1_000_000]
+ADDRESS_SIZES = [10, 100, 1_000, 10_000]
+ASSETS = ["BTC", "ETH", "XRP", "ADA", "SOL", "DOGE", "DOT", "LTC", "LINK", "BNB"]
+QUOTES = ["USDT", "USD", "EUR"]
+EXCHANGES = ["binance", "kraken", "coinbase", ""]
+CHAINS = ["btc", "eth", "xrp", "bnb", "ada"]
+
+class _StubResponse:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+def _stub_get(url, params=None, timeout=None, **kwargs):
+    """
+    Offline stand-in for requests.get: answers the endpoints the app calls with plausible data.
+    """
+    if "etherscan" in url:
+        addrs = str((params or {}).get("address", "")).split(",")
+        if (params or {}).get("action") == "balancemulti":
+            return _StubResponse({"status": "1", "result": [{"account": a, "balance": "1000000000000000000"} for a in addrs]})
+        return _StubResponse({"status": "1", "result": "1000000000000000000"})
+    if "blockchair" in url:
+        addrs = url.rstrip("/").split("/")[-1].split(",")
+        if "/dashboards/addresses/" in url:
+            return _StubResponse({"data": {"addresses": {a: {"balance": 100_000_000} for a in addrs}}})
+        return _StubResponse({"data": {a: {"address": {"balance": 100_000_000}} for a in addrs}})
+    if "exchange_rates" in url:
+        return _StubResponse({"rates": {"btc": {"value": 1.0}, "usd": {"value": 60000.0}, "eur": {"value": 55000.0}}})
+    return _StubResponse({})
+
+def synthetic_orders(n: int, seed: int = 7):
+    rnd = random.Random(seed)
+    t0 = 1_600_000_000
+    orders = []
+    for i in range(n):
+        base = rnd.choice(ASSETS)
+        orders.append({
+            # mixed id / number types on purpose, like real stores
+            "id": i if i % 2 else str(i),
+            "asset": f"{base}/{rnd.choice(QUOTES)}",
+            "side": "buy" if rnd.random() < 0.7 else "sell",
+            "amount": rnd.uniform(0.01, 10.0) if i % 3 else str(round(rnd.uniform(0.01, 10.0), 6)),
+            "price": rnd.uniform(0.1, 50_000.0),
+            "exchange": rnd.choice(EXCHANGES),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S+00:00", time.gmtime(t0 + i * 60)),
+            "note": "",
+            "status": "recorded",
+        })
+    return orders
+
+def synthetic_addresses(n: int, seed: int = 11):
+    rnd = random.Random(seed)
+    tracked = {c: [] for c in CHAINS}
+    for i in range(n):
+        chain = CHAINS[i % len(CHAINS)]
+        if chain in ("eth", "bnb"):
+            addr = "0x" + "".join(rnd.choice("0123456789abcdef") for _ in range(40))
+        else:
+            addr = "bc1q" + "".join(rnd.choice("023456789acdefghjklmnpqrstuvwxyz") for _ in range(38))
+        tracked[chain].append(addr)
+    return tracked
+
+def synthetic_store(n_orders: int, n_addresses: int):
+    return {
+        "settings": {"default_quote": "USD", "profit_pct_to_take": 300.0},
+        "api_keys": {"etherscan": "bench"},
+        "orders": synthetic_orders(n_orders),
+        "tracked_addresses": synthetic_addresses(n_addresses),
+    }
+
+def synthetic_stats(n_assets: int, seed: int = 3):
+    rnd = random.Random(seed)
+    return {f"A{i}": {
+        "remaining_qty": rnd.uniform(0, 100), "avg_buy": rnd.uniform(1, 100), "current_price": rnd.uniform(1, 500),
+        "unrealized_value": rnd.uniform(-1000, 1000), "unrealized_pct": rnd.uniform(-90, 900),
+        "change_24h": rnd.uniform(-10, 10), "exchange": "binance",
+    } for i in range(n_assets)}
+
+def price_provider(symbols):
+    return {s: {"price": 100.0 + i, "change_24h": 1.0} for i, s in enumerate(symbols)}
+
+def timeit(fn, repeat: int):
+    times = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    return times
+
+def run(order_sizes=ORDER_SIZES, address_sizes=ADDRESS_SIZES, repeat: int = 3, log=None):
+    """
+    Runs every benchmark and returns the result document.
+    Large cases run once regardless of `repeat` to keep the full suite bounded.
+    """
+    from chainguardian import storage, graphs, thresholds, market_data, top_wallets
+    from chainguardian.portfolio import Portfolio
+
+    results = []
+
+    def record(name, params, fn, reps=repeat):
+        times = timeit(fn, reps)
+        row = {"bench": name, "params": params, "repeat": reps,
+               "min_s": min(times), "median_s": statistics.median(times), "mean_s": statistics.fmean(times)}
+        results.append(row)
+        if log:
+            log(f"{name:<32} {json.dumps(params):<24} median {row['median_s'] * 1000:10.2f} ms")
+
+    real_get, real_home = requests.get, os.environ.get("HOME")
+    requests.get = _stub_get
+    tmp_home = tempfile.mkdtemp(prefix="cg-bench-")
+    os.environ["HOME"] = tmp_home
+    try:
+        for n in order_sizes:
+            reps = repeat if n <= 100_000 else 1
+            store = synthetic_store(n, address_sizes[0] if address_sizes else 0)
+            p = {"orders": n}
+            record("storage.save_store", p, lambda: storage.save_store(store), reps)
+            record("storage.load_store", p, storage.load_store, reps)
+            record("Portfolio.__init__", p, lambda: Portfolio(store), reps)
+            portfolio = Portfolio(store)
+            record("Portfolio.compute_stats", p, lambda: portfolio.compute_stats(price_provider), reps)
+            rates = {"btc": 1.0, "usd": 60000.0, "eur": 55000.0}
+            record("Portfolio.compute_stats_multi", p,
+                   lambda: portfolio.compute_stats_multi(price_provider, rates=rates), reps)
+
+        for n in address_sizes:
+            store = synthetic_store(0, n)
+            p = {"addresses": n}
+            record("storage.save_store", p, lambda: storage.save_store(store))
+            record("storage.load_store", p, storage.load_store)
+            record("top_wallets.get_whale_activity", p, lambda: top_wallets.get_whale_activity(store))
+
+        for n in (10, 100, 1_000, 10_000):
+            stats = synthetic_stats(n)
+            p = {"assets": n}
+            record("graphs._stats_to_df", p, lambda: graphs._stats_to_df(stats))
+            record("thresholds.profit_take_signal", p,
+                   lambda: [thresholds.profit_take_signal(s, 300.0) for s in stats.values()])
+
+        rnd = random.Random(5)
+        for points in (100, 1_000, 10_000):
+            prices = [100.0 + rnd.gauss(0, 1) for _ in range(points)]
+            p = {"points": points}
+            record("market_data.indicators", p, lambda: (
+                market_data.calculate_rsi(prices), market_data.calculate_macd(prices),
+                market_data.calculate_sma(prices, 20), market_data.calculate_ema(prices, 20)))
+    finally:
+        requests.get = real_get
+        shutil.rmtree(tmp_home, ignore_errors=True)
+        if real_home is None:
+            os.environ.pop("HOME", None)
+        else:
+            os.environ["HOME"] = real_home
+
+    return {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "version": _version(),
+        },
+        "results": results,
+    }
+
+def _version():
+    try:
+        from chainguardian.init import __version__
+        return __version__
+    except Exception:
+        return None
+
+def compare(current: dict, baseline: dict, tolerance: float = 1.25):
+    """
+    Returns rows of (bench, params, baseline_median, current_median, ratio) and whether any
+    ratio exceeds `tolerance`.
+    """
+    base = {(r["bench"], json.dumps(r["params"], sort_keys=True)): r for r in baseline.get("results", [])}
+    rows, regressed = [], False
+    for r in current.get("results", []):
+        b = base.get((r["bench"], json.dumps(r["params"], sort_keys=True)))
+        if not b or not b["median_s"]:
+            continue
+        ratio = r["median_s"] / b["median_s"]
+        regressed |= ratio > tolerance
+        rows.append((r["bench"], r["params"], b["median_s"], r["median_s"], ratio))
+    return rows, regressed
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--orders", type=lambda s: [int(x) for x in s.split(",")], default=ORDER_SIZES)
+    ap.add_argument("--addresses", type=lambda s: [int(x) for x in s.split(",")], default=ADDRESS_SIZES)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--out", help="write results JSON here (default: stdout)")
+    ap.add_argument("--compare", help="previous results JSON to compare against")
+    ap.add_argument("--tolerance", type=float, default=1.25, help="max allowed slowdown ratio with --compare")
+    args = ap.parse_args(argv)
+
+    doc = run(args.orders, args.addresses, args.repeat, log=lambda m: print(m, file=sys.stderr))
+    if args.out:
+        with open(args.out, "w") as fh:
+            json.dump(doc, fh, indent=2)
+    else:
+        json.dump(doc, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare) as fh:
+            rows, regressed = compare(doc, json.load(fh), args.tolerance)
+        for bench, params, old, new, ratio in rows:
+            print(f"{bench:<32} {json.dumps(params):<24} {old * 1000:9.2f} -> {new * 1000:9.2f} ms  x{ratio:.2f}", file=sys.stderr)
+        return 1 if regressed else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,266 @@
+import re
+import time
+from bisect import bisect_left
+from typing import Iterable
+
+CHAINS = ("btc", "eth", "xrp", "bnb", "ada")
+
+_BASE58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_XRP58 = "rpshnaf39wBUDNEGHJKLM4PQRST7VWXYZ2bcdeCg65jkm8oFqi1tuvAxyz"
+_BECH32 = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+
+_PATTERNS = {
+    "btc": [(re.compile(rf"^[13][{_BASE58}]{{25,34}}$"), False),
+            (re.compile(rf"^bc1[{_BECH32}]{{11,71}}$"), True)],
+    "eth": [(re.compile(r"^0x[0-9a-f]{40}$"), True)],
+    "bnb": [(re.compile(r"^0x[0-9a-f]{40}$"), True),
+            (re.compile(rf"^bnb1[{_BECH32}]{{38}}$"), True)],
+    "xrp": [(re.compile(rf"^r[{_XRP58}]{{24,34}}$"), False)],
+    "ada": [(re.compile(rf"^addr1[{_BECH32}]{{50,110}}$"), True),
+            (re.compile(rf"^(Ae2|DdzFF)[{_BASE58}]{{40,120}}$"), False)],
+}
+
+# Keccak-256 (Ethereum's pre-standard SHA-3; hashlib's sha3_256 pads differently), only needed
+# to check EIP-55 mixed-case checksums, so a small pure-Python permutation is enough.
+_KECCAK_ROT = [0, 1, 62, 28, 27, 36, 44, 6, 55, 20, 3, 10, 43, 25, 39, 41, 45, 15, 21, 8, 18, 2, 61, 56, 14]
+_MASK64 = (1 << 64) - 1
+
+def _keccak_round_constants():
+    out, r = [], 1
+    for _ in range(24):
+        rc = 0
+        for j in range(7):
+            if r & 1:
+                rc |= 1 << ((1 << j) - 1)
+            r = ((r << 1) ^ 0x71) & 0xFF if r & 0x80 else r << 1
+        out.append(rc)
+    return out
+
+_KECCAK_RC = _keccak_round_constants()
+
+def _rol(v: int, n: int) -> int:
+    return ((v << n) | (v >> (64 - n))) & _MASK64 if n else v
+
+def _keccak_f(a: list):
+    for rc in _KECCAK_RC:
+        c = [a[x] ^ a[x + 5] ^ a[x + 10] ^ a[x + 15] ^ a[x + 20] for x in range(5)]
+        d = [c[(x - 1) % 5] ^ _rol(c[(x + 1) % 5], 1) for x in range(5)]
+        b = [0] * 25
+        for x in range(5):
+            for y in range(5):
+                b[y + 5 * ((2 * x + 3 * y) % 5)] = _rol(a[x + 5 * y] ^ d[x], _KECCAK_ROT[x + 5 * y])
+        for i in range(25):
+            row = 5 * (i // 5)
+            a[i] = b[i] ^ (~b[row + (i + 1) % 5] & b[row + (i + 2) % 5])
+        a[0] ^= rc
+
+def _keccak256(data: bytes) -> bytes:
+    rate = 136
+    msg = bytearray(data) + b"\x01" + bytes(-(len(data) + 1) % rate)
+    msg[-1] |= 0x80
+    state = [0] * 25
+    for off in range(0, len(msg), rate):
+        for i in range(rate // 8):
+            state[i] ^= int.from_bytes(msg[off + 8 * i:off + 8 * i + 8], "little")
+        _keccak_f(state)
+    return b"".join(state[i].to_bytes(8, "little") for i in range(4))
+
+def _eip55_ok(addr: str) -> bool:
+    """
+    True unless a 0x address is written in mixed case that fails its EIP-55 checksum: a
+    mixed-case address carries one, so a typo in it shows up as a mismatch. Single-case
+    addresses carry none and always pass.
+    """
+    hexpart = addr[2:]
+    if hexpart == hexpart.lower() or hexpart == hexpart.upper():
+        return True
+    digest = _keccak256(hexpart.lower().encode("ascii")).hex()
+    return all(ch == (ch.upper() if int(digest[i], 16) >= 8 else ch.lower()) for i, ch in enumerate(hexpart))
+
+def normalize_address(chain: str, addr: str) -> str | None:
+    """
+    Canonical form of an address, or None if it is not valid for the chain.
+    Case-insensitive encodings (hex, bech32) are lowercased, so an ETH checksum address and
+    its lowercase form map to the same key; base58 encodings keep their case. A mixed-case
+    0x address must match its EIP-55 checksum (a mistyped one is rejected, not tracked).
+    """
+    a = str(addr or "").strip()
+    if a[:2].lower() == "0x" and chain in ("eth", "bnb") and not _eip55_ok(a):
+        return None
+    for pattern, case_insensitive in _PATTERNS.get(chain, []):
+        candidate = a.lower() if case_insensitive else a
+        if case_insensitive and a != a.lower() and a != a.upper() and not a.lower().startswith("0x"):
+            continue  # mixed-case bech32 is invalid by spec
+        if pattern.match(candidate):
+            return candidate
+    return None
+
+class AddressIndex:
+    """
+    Tracked addresses for one chain: canonical address -> metadata, in insertion order.
+    Membership tests and updates are dict operations; iteration order is the order added.
+    Metadata keys: label, added_at (epoch s), last_balance, last_seen (epoch s).
+    """
+    __slots__ = ("chain", "entries", "_sorted")
+
+    def __init__(self, chain: str, entries: dict | None = None):
+        self.chain = chain
+        self.entries = entries if entries is not None else {}
+        self._sorted = None  # [(lowercased address, address)], built on the first search
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __contains__(self, addr):
+        key = normalize_address(self.chain, addr)
+        return key is not None and key in self.entries
+
+    def add(self, addr: str, label: str = "", added_at: float | None = None) -> str | None:
+        """
+        Adds one address; returns its canonical form if it was new, None if invalid or known.
+        """
+        key = normalize_address(self.chain, addr)
+        if key is None or key in self.entries:
+            return None
+        self.entries[key] = {"label": label, "added_at": added_at or time.time(), "last_balance": None, "last_seen": None}
+        self._sorted = None
+        return key
+
+    def extend(self, addrs: Iterable[str], label: str = "") -> tuple:
+        """
+        Adds many addresses. Returns (added, invalid) lists.
+        """
+        now = time.time()
+        added, invalid = [], []
+        for a in addrs:
+            key = self.add(a, label=label, added_at=now)
+            if key is not None:
+                added.append(key)
+            elif normalize_address(self.chain, a) is None:
+                invalid.append(a)
+        return added, invalid
+
+    def remove(self, addr: str) -> bool:
+        key = normalize_address(self.chain, addr)
+        self._sorted = None
+        return self.entries.pop(key, None) is not None
+
+    def meta(self, addr: str) -> dict | None:
+        return self.entries.get(normalize_address(self.chain, addr))
+
+    def record_balances(self, balances: dict, ts: float | None = None):
+        """
+        Stores last_balance / last_seen from a { addr: balance } map (non-numeric values ignored).
+        """
+        ts = ts or time.time()
+        for addr, bal in balances.items():
+            m = self.entries.get(addr) or self.meta(addr)  # keys are usually canonical already
+            if m is not None and isinstance(bal, (int, float)):
+                m["last_balance"] = float(bal)
+                m["last_seen"] = ts
+
+    def merge(self, other: "AddressIndex") -> int:
+        """
+        Adds the other index's entries that are not here yet (keeping their metadata).
+        """
+        n = 0
+        for key, meta in other.entries.items():
+            if key not in self.entries:
+                self.entries[key] = dict(meta)
+                n += 1
+        self._sorted = None
+        return n
+
+    def addresses(self) -> list:
+        return list(self.entries)
+
+    def search(self, prefix: str, limit: int | None = None) -> list:
+        """
+        Addresses starting with prefix (case-insensitive), in address order, via binary search
+        over a sorted copy of the keys that is rebuilt only after the index changes.
+        """
+        if self._sorted is None or len(self._sorted) != len(self.entries):
+            self._sorted = sorted((a.lower(), a) for a in self.entries)
+        p = prefix.strip().lower()
+        out = []
+        for low, addr in self._sorted[bisect_left(self._sorted, (p, "")):]:
+            if not low.startswith(p) or (limit is not None and len(out) >= limit):
+                break
+            out.append(addr)
+        return out
+
+class TrackedAddresses:
+    """
+    All chains' AddressIndex objects for one account, persisted in the store as
+      tracked_addresses[chain]  ordered list of canonical addresses (what older code reads)
+      tracked_meta[chain]       { address: metadata }
+    Loading normalizes and de-duplicates whatever lists are already there.
+    """
+
+    def __init__(self, indexes: dict | None = None):
+        self.indexes = indexes or {}
+
+    def __getitem__(self, chain: str) -> AddressIndex:
+        return self.indexes.setdefault(chain, AddressIndex(chain))
+
+    def __iter__(self):
+        return iter(self.indexes.items())
+
+    @classmethod
+    def from_store(cls, account_data: dict) -> "TrackedAddresses":
+        tracked = account_data.get("tracked_addresses", {}) or {}
+        metas = account_data.get("tracked_meta", {}) or {}
+        indexes = {}
+        for chain, addrs in tracked.items():
+            idx = AddressIndex(chain)
+            meta = metas.get(chain, {})
+            for a in addrs:
+                key = idx.add(a)
+                if key is None and normalize_address(chain, a) is None:
+                    # Keep unknown-format entries verbatim rather than silently dropping them.
+                    key = str(a).strip()
+                    idx.entries.setdefault(key, {"label": "", "added_at": None, "last_balance": None, "last_seen": None})
+                if key is not None and key in meta:
+                    idx.entries[key].update(meta[key])
+                elif key is not None and a in meta:
+                    idx.entries[key].update(meta[a])
+            indexes[chain] = idx
+        return cls(indexes)
+
+    def save_to(self, account_data: dict):
+        account_data["tracked_addresses"] = {c: idx.addresses() for c, idx in self.indexes.items()}
+        account_data["tracked_meta"] = {c: idx.entries for c, idx in self.indexes.items()}
+
+    def add(self, chain: str, addrs: Iterable[str], label: str = "") -> tuple:
+        return self[chain].extend(addrs, label=label)
+
+    def labelled(self, label: str) -> set:
+        """
+        {(chain, address)} for every entry whose label is `label` (case-insensitive).
+        """
+        label = label.lower()
+        return {(c, a) for c, idx in self.indexes.items() for a, m in idx.entries.items()
+                if str(m.get("label") or "").lower() == label}
+
+    def record_balances(self, balances: dict, ts: float | None = None):
+        for chain, bals in balances.items():
+            if chain in self.indexes:
+                self.indexes[chain].record_balances(bals, ts)
+
+_tracked = {}
+
+def tracked_for(key: str, account_data: dict) -> TrackedAddresses:
+    """
+    Process-wide TrackedAddresses per key (e.g. profile/account), so reruns reuse the built
+    indexes and the balances recorded into them. Rebuilt from account_data only when an address
+    list changes (added or removed here or by another app), which is cheap to check per chain.
+    """
+    tracked = account_data.get("tracked_addresses", {}) or {}
+    sig = tuple((c, len(addrs), addrs[-1] if addrs else None) for c, addrs in tracked.items())
+    hit = _tracked.get(key)
+    if hit is None or hit[0] != sig:
+        hit = _tracked[key] = (sig, TrackedAddresses.from_store(account_data))
+    return hit[1]
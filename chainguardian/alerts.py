@@ -0,0 +1,138 @@
+import json
+import time
+from collections import deque
+import numpy as np
+from .config import ALERT_HISTORY_SIZE
+from .metrics import TOTAL
+
+# kind -> (input key builder, comparison, human description). Inputs are keyed by tuples:
+#   ('price', ASSET)           current price in the default quote
+#   ('change', ASSET, window)  % change over '24h' | '7d' | '30d' | '365d'
+#   ('rsi', ASSET)             RSI(14) on daily closes
+#   ('outflow', CHAIN)         tracked-wallet outflow over the last 24h, native units
+#   ('drawdown', TOTAL)        portfolio's current drawdown from its running peak, in %
+RULE_KINDS = {
+    "price_above":   (lambda r: ("price", r["asset"].upper()), "ge", "{asset} price ≥ {value:g}"),
+    "price_below":   (lambda r: ("price", r["asset"].upper()), "le", "{asset} price ≤ {value:g}"),
+    "pct_move":      (lambda r: ("change", r["asset"].upper(), r.get("window", "24h")), "abs_ge", "{asset} moved ≥ {value:g}% over {window}"),
+    "rsi_above":     (lambda r: ("rsi", r["asset"].upper()), "ge", "{asset} RSI ≥ {value:g}"),
+    "rsi_below":     (lambda r: ("rsi", r["asset"].upper()), "le", "{asset} RSI ≤ {value:g}"),
+    "whale_outflow": (lambda r: ("outflow", r["asset"].lower()), "ge", "{asset} whale outflow ≥ {value:g} in 24h"),
+    "drawdown":      (lambda r: ("drawdown", TOTAL), "ge", "portfolio drawdown ≥ {value:g}%"),
+}
+CHANGE_WINDOWS = {"24h": "change_24h", "7d": "change_7d", "30d": "change_30d", "365d": "change_365d"}
+
+def describe_rule(rule: dict) -> str:
+    return RULE_KINDS[rule["kind"]][2].format(**{"window": "24h", **rule})
+
+class AlertEngine:
+    """
+    Compiled set of alert rules. Rules are grouped by the input they read, and each
+    (input, comparison) group holds its thresholds as one NumPy array, so a refresh only
+    evaluates the groups whose input value changed, one vectorized compare per group.
+    Alerts are edge-triggered: a rule fires when its condition becomes true and re-arms once
+    it is false again.
+    """
+
+    def __init__(self, rules, previous: "AlertEngine | None" = None):
+        self.rules = [r for r in rules if r.get("enabled", True) and r.get("kind") in RULE_KINDS]
+        groups = {}
+        for i, r in enumerate(self.rules):
+            key_fn, op, _ = RULE_KINDS[r["kind"]]
+            groups.setdefault(key_fn(r), {}).setdefault(op, []).append((float(r["value"]), i))
+        self.groups = {
+            key: {op: (np.array([t for t, _ in items]), np.array([i for _, i in items], dtype=np.intp))
+                  for op, items in ops.items()}
+            for key, ops in groups.items()
+        }
+        self.active = np.zeros(len(self.rules), dtype=bool)
+        self.inputs = {}
+        self.history = deque(maxlen=ALERT_HISTORY_SIZE)
+        if previous is not None:
+            # Rules that survive an edit keep their armed/fired state and the alert log carries over.
+            was = {json.dumps(r, sort_keys=True, default=str): bool(a) for r, a in zip(previous.rules, previous.active)}
+            self.active[:] = [was.get(json.dumps(r, sort_keys=True, default=str), False) for r in self.rules]
+            self.history.extend(previous.history)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def update(self, inputs: dict, now: float | None = None) -> list:
+        """
+        Feed the latest input values ({key: value}); None/NaN values are ignored.
+        Returns the alerts that fired on this update: [{'rule', 'key', 'value', 'ts', 'message'}].
+        """
+        now = time.time() if now is None else now
+        fired = []
+        for key, value in inputs.items():
+            if value is None or value != value or key not in self.groups or self.inputs.get(key) == value:
+                continue
+            self.inputs[key] = value
+            for op, (thresholds, idx) in self.groups[key].items():
+                if op == "ge":
+                    cond = value >= thresholds
+                elif op == "le":
+                    cond = value <= thresholds
+                else:
+                    cond = abs(value) >= thresholds
+                rising = idx[cond & ~self.active[idx]]
+                self.active[idx] = cond
+                for i in rising.tolist():
+                    rule = self.rules[i]
+                    event = {"rule": rule, "key": key, "value": float(value), "ts": now,
+                             "message": f"{describe_rule(rule)} (now {value:,.4g})"}
+                    fired.append(event)
+                    self.history.append(event)
+        return fired
+
+def trigger_levels(take_profit, rules) -> dict:
+    """
+    Prices that would fire something, per asset ({ASSET: [price, ...]}, default quote): each
+    take-profit price (profit_take_table: avg_buy grown by its threshold) and each price rule.
+    """
+    levels = {}
+    if take_profit is not None and not take_profit.empty:
+        for sym, row in take_profit.iterrows():
+            if row["avg_buy"] > 0:
+                levels.setdefault(str(sym).upper(), []).append(float(row["avg_buy"] * (1.0 + row["threshold"] / 100.0)))
+    for r in rules or []:
+        if r.get("enabled", True) and r.get("kind") in ("price_above", "price_below"):
+            levels.setdefault(str(r.get("asset", "")).upper(), []).append(float(r["value"]))
+    return levels
+
+def alert_inputs(stats: dict, rsi: dict | None = None, flows=None, perf=None) -> dict:
+    """
+    Builds the engine's input map from what a refresh already computed:
+    stats (compute_stats, with change_* fields), rsi ({ASSET: value}), flows
+    (SnapshotStore.net_flows frame) and perf (performance_metrics frame with a TOTAL row).
+    """
+    inputs = {}
+    for sym, s in stats.items():
+        inputs[("price", sym.upper())] = s.get("current_price") or None
+        for window, field in CHANGE_WINDOWS.items():
+            if isinstance(s.get(field), (int, float)):
+                inputs[("change", sym.upper(), window)] = float(s[field])
+    for sym, value in (rsi or {}).items():
+        inputs[("rsi", sym.upper())] = value
+    if flows is not None and not flows.empty:
+        for chain, out in flows["outflow"].items():
+            inputs[("outflow", chain)] = float(out)
+    if perf is not None and not perf.empty and TOTAL in perf.index:
+        # The current drawdown, not the window's worst: the rule must clear once the portfolio recovers.
+        dd = perf.loc[TOTAL, "drawdown"]
+        if dd == dd:
+            inputs[("drawdown", TOTAL)] = float(-dd * 100.0)
+    return inputs
+
+_engines = {}
+
+def engine_for(key: str, rules) -> AlertEngine:
+    """
+    Process-wide engine per key (e.g. profile/account); recompiled only when the rules change,
+    so edge-trigger state survives reruns.
+    """
+    sig = json.dumps(rules, sort_keys=True, default=str)
+    hit = _engines.get(key)
+    if hit is None or hit[0] != sig:
+        hit = _engines[key] = (sig, AlertEngine(rules, previous=hit[1] if hit else None))
+    return hit[1]
@@ -0,0 +1,118 @@
+import numpy as np
+import pandas as pd
+from .config import WHALE_ZSCORE_WINDOW, WHALE_ZSCORE_THRESHOLD, WHALE_ZSCORE_MIN_PERIODS
+from .snapshots import CHAIN_NAMES
+
+ANOMALY_COLUMNS = ["ts", "kind", "chain", "address", "delta", "zscore", "balance"]
+
+# kind values
+ADDRESS_MOVE = "address_move"          # one wallet moved far outside its own recent range
+EXCHANGE_INFLOW = "exchange_inflow"    # exchange-labelled wallet received an unusual deposit (sell pressure)
+EXCHANGE_OUTFLOW = "exchange_outflow"  # exchange-labelled wallet paid out unusually much (withdrawals)
+CHAIN_SURGE = "chain_surge"            # the chain's aggregate net flow per refresh spiked
+
+def rolling_zscore(groups: np.ndarray, values: np.ndarray, window: int = WHALE_ZSCORE_WINDOW,
+                   min_periods: int = WHALE_ZSCORE_MIN_PERIODS) -> np.ndarray:
+    """
+    z-score of each value against the previous `window` values of the same group, for
+    inputs already sorted by (group, time). Cumulative sums restart at each group and run on
+    values centered on their group's mean, so a large wallet ahead of a small one cannot cancel
+    the small one's variance away; no per-group Python loop.
+    NaN where the group has fewer than min_periods earlier values, and where the history is
+    flat: a zero spread gives no scale to judge a move by (it would otherwise be +/-inf, so any
+    move after a quiet spell would be flagged).
+    """
+    n = len(values)
+    if n == 0:
+        return np.zeros(0)
+    values = values.astype(float)
+    idx = np.arange(n)
+    starts = np.r_[0, np.flatnonzero(groups[1:] != groups[:-1]) + 1]
+    group_id = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, n]))
+    group_start = starts[group_id]
+    lo = np.maximum(group_start, idx - window)
+    center = pd.Series(values).groupby(group_id).transform("mean").to_numpy()
+    x = values - center
+    # Per-group running sums of the values before each row (0 at the group's first row).
+    cs = pd.Series(x).groupby(group_id).cumsum().to_numpy() - x
+    cs2 = pd.Series(x * x).groupby(group_id).cumsum().to_numpy() - x * x
+    count = idx - lo
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = (cs[idx] - cs[lo]) / count
+        var = (cs2[idx] - cs2[lo]) / count - mean * mean
+        std = np.sqrt(np.clip(var, 0.0, None))
+        # Running sums leave tiny residue on flat histories; treat it as zero spread.
+        std[std <= 1e-12 * np.maximum(np.abs(mean + center), 1.0)] = 0.0
+        z = (x - mean) / std
+    z[std == 0] = np.nan
+    z[count < min_periods] = np.nan
+    return z
+
+def detect_anomalies(store, since: float | None = None, exchanges=(), window: int = WHALE_ZSCORE_WINDOW,
+                     threshold: float = WHALE_ZSCORE_THRESHOLD,
+                     min_periods: int = WHALE_ZSCORE_MIN_PERIODS, addresses=None) -> pd.DataFrame:
+    """
+    Flags statistically unusual whale flows in a SnapshotStore's history:
+      address_move      |z| of an address's balance change vs its own last `window` changes
+      exchange_inflow   same test on wallets in `exchanges` ({(chain, address)}), positive moves
+      exchange_outflow  ... negative moves
+      chain_surge       |z| of a chain's summed net flow per refresh vs its previous refreshes
+    The full history is scored (so windows are warm), then only rows with ts >= since are kept.
+    `addresses` ({(chain, address)}) limits the history to those wallets, chain surges included.
+    Returns a DataFrame with ANOMALY_COLUMNS, largest |z| first; chain_surge rows have no address.
+    """
+    recs = store.records(addresses=addresses)
+    if len(recs) < 2:
+        return pd.DataFrame(columns=ANOMALY_COLUMNS)
+    recs = recs[np.lexsort((recs["ts"], recs["addr"]))]
+    same = recs["addr"][1:] == recs["addr"][:-1]
+    cur = recs[1:][same]
+    delta = (recs["balance"][1:] - recs["balance"][:-1])[same]
+    if not len(cur):
+        return pd.DataFrame(columns=ANOMALY_COLUMNS)
+
+    # Per-address: cur is still sorted by (addr, ts).
+    z_addr = rolling_zscore(cur["addr"], delta, window, min_periods)
+    uniq, inv = np.unique(cur["addr"], return_inverse=True)
+    keys = [store.address(int(i)) for i in uniq]
+    chain_of = np.array([k[0] for k in keys], dtype=object)[inv]
+    addr_of = np.array([k[1] for k in keys], dtype=object)[inv]
+    exch_row = np.array([k in exchanges for k in keys], dtype=bool)[inv]
+    kind = np.where(exch_row, np.where(delta > 0, EXCHANGE_INFLOW, EXCHANGE_OUTFLOW), ADDRESS_MOVE)
+    hit = np.abs(np.nan_to_num(z_addr, nan=0.0)) >= threshold
+    if since is not None:
+        hit &= cur["ts"] >= since
+    addr_rows = pd.DataFrame({
+        "ts": cur["ts"][hit],
+        "kind": kind[hit],
+        "chain": chain_of[hit],
+        "address": addr_of[hit],
+        "delta": delta[hit],
+        "zscore": z_addr[hit],
+        "balance": cur["balance"][hit],
+    })
+
+    # Chain-wide: sum deltas per (chain, refresh ts), then score each chain's series.
+    flows = pd.DataFrame({"chain": cur["chain"], "ts": cur["ts"], "delta": delta}).groupby(["chain", "ts"], sort=True)["delta"].sum()
+    chains = flows.index.get_level_values(0).to_numpy()
+    z_chain = rolling_zscore(chains, flows.to_numpy(), window, min_periods)
+    chain_hit = np.abs(np.nan_to_num(z_chain, nan=0.0)) >= threshold
+    ts_chain = flows.index.get_level_values(1).to_numpy()
+    if since is not None:
+        chain_hit &= ts_chain >= since
+    chain_rows = pd.DataFrame({
+        "ts": ts_chain[chain_hit],
+        "kind": CHAIN_SURGE,
+        "chain": [CHAIN_NAMES.get(int(c), "?") for c in chains[chain_hit]],
+        "address": None,
+        "delta": flows.to_numpy()[chain_hit],
+        "zscore": z_chain[chain_hit],
+        "balance": np.nan,
+    })
+
+    parts = [df for df in (addr_rows, chain_rows) if not df.empty]
+    if not parts:
+        return pd.DataFrame(columns=ANOMALY_COLUMNS)
+    out = pd.concat(parts, ignore_index=True)
+    out["ts"] = pd.to_datetime(out["ts"], unit="s", utc=True)
+    return out.reindex(out["zscore"].abs().sort_values(ascending=False).index)[ANOMALY_COLUMNS].reset_index(drop=True)
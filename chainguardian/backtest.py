@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+from .config import PROFIT_PCT_DEFAULT, FEAR_BUY_THRESHOLD, BACKTEST_BUY_AMOUNT, BACKTEST_FEE_PCT
+from .metrics import TOTAL
+
+TRADE_COLUMNS = ["date", "asset", "side", "qty", "price", "value", "reason"]
+SUMMARY_COLUMNS = ["invested", "proceeds", "final_value", "profit", "return_pct", "hold_return_pct",
+                   "max_drawdown", "buys", "sells"]
+
+def _take_profit_days(cum_cost: np.ndarray, cum_qty: np.ndarray, price: np.ndarray, profit_pct: float, fee: float):
+    """
+    Replays profit_take_signal on one asset. The position since the last take-profit has cost
+    cum_cost - base_cost and size cum_qty - base_qty; the first day its gain reaches profit_pct,
+    enough is sold to return that cost and the rest rides free. Each step is one vectorized scan
+    of the remaining days, so the loop runs once per trade, not once per day.
+    Returns [(day, sell_qty), ...].
+    """
+    out = []
+    start, base_cost, base_qty = 0, 0.0, 0.0
+    target = 1.0 + profit_pct / 100.0
+    while start < len(price):
+        cost = cum_cost[start:] - base_cost
+        qty = cum_qty[start:] - base_qty
+        with np.errstate(invalid="ignore"):
+            hit = (cost > 0) & (qty * price[start:] >= cost * target)
+        i = int(np.argmax(hit))
+        if not hit[i]:
+            break
+        t = start + i
+        out.append((t, min(cost[i] / (price[t] * (1.0 - fee)), qty[i])))
+        start, base_cost, base_qty = t + 1, cum_cost[t], cum_qty[t]
+    return out
+
+def backtest(prices: pd.DataFrame, fng: pd.Series | None = None, profit_pct: float = PROFIT_PCT_DEFAULT,
+             fear_threshold: float = FEAR_BUY_THRESHOLD, buy_amount: float = BACKTEST_BUY_AMOUNT,
+             initial: float = 0.0, fee_pct: float = BACKTEST_FEE_PCT, custom_thresholds: dict | None = None) -> dict:
+    """
+    Replays the fear-buy and take-profit rules over a daily close matrix (price_history_frame).
+      fng            daily Fear & Greed values (a Series on the same day index); on days at or
+                     below fear_threshold, buy_amount of quote buys each listed asset
+      initial        quote spent on each asset on its first priced day
+      profit_pct     take-profit threshold (custom_thresholds {ASSET: pct} overrides per asset)
+      fee_pct        charged on every fill
+    Buys are fresh contributions (no cash constraint); sale proceeds are held as cash.
+    Returns {'equity': dates x assets+TOTAL (holdings + proceeds), 'invested': same shape,
+             'trades': DataFrame[TRADE_COLUMNS], 'summary': DataFrame[SUMMARY_COLUMNS] by asset+TOTAL}.
+    """
+    if prices is None or prices.empty:
+        return {"equity": pd.DataFrame(), "invested": pd.DataFrame(),
+                "trades": pd.DataFrame(columns=TRADE_COLUMNS), "summary": pd.DataFrame(columns=SUMMARY_COLUMNS)}
+    custom_thresholds = custom_thresholds or {}
+    prices = prices.ffill()
+    dates, assets = prices.index, list(prices.columns)
+    p = prices.to_numpy(dtype=float)
+    listed = np.isfinite(p) & (p > 0)
+    fee = fee_pct / 100.0
+
+    spend = np.zeros_like(p)
+    seeded = np.zeros(p.shape, dtype=bool)
+    if fng is not None and len(fng):
+        fear = fng.reindex(dates).ffill().to_numpy(dtype=float) <= fear_threshold
+        spend[fear] = buy_amount
+    if initial > 0:
+        first = np.argmax(listed, axis=0)
+        has = listed.any(axis=0)
+        seeded[first[has], np.flatnonzero(has)] = True
+        spend[seeded] += initial
+    spend[~listed] = 0.0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bought = np.where(listed, spend * (1.0 - fee) / p, 0.0)
+    cum_cost = np.cumsum(spend, axis=0)
+    cum_qty = np.cumsum(bought, axis=0)
+
+    sold = np.zeros_like(p)
+    safe_p = np.where(listed, p, 0.0)
+    for j, sym in enumerate(assets):
+        for t, q in _take_profit_days(cum_cost[:, j], cum_qty[:, j], safe_p[:, j],
+                                      custom_thresholds.get(sym, profit_pct), fee):
+            sold[t, j] = q
+    proceeds = sold * safe_p * (1.0 - fee)
+
+    held = cum_qty - np.cumsum(sold, axis=0)
+    equity = held * safe_p + np.cumsum(proceeds, axis=0)
+    equity = np.column_stack([equity, equity.sum(axis=1)])
+    invested = np.column_stack([cum_cost, cum_cost.sum(axis=1)])
+    flows = np.column_stack([spend, spend.sum(axis=1)])
+    hold_value = np.append(cum_qty[-1] * safe_p[-1], (cum_qty[-1] * safe_p[-1]).sum())
+
+    # Drawdown on a time-weighted basis, so new contributions do not read as gains.
+    prev = np.vstack([np.zeros((1, equity.shape[1])), equity[:-1]])
+    denom = prev + flows
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = np.where(denom > 0, equity / denom, 1.0)
+        wealth = np.cumprod(growth, axis=0)
+        max_dd = (wealth / np.maximum.accumulate(wealth, axis=0) - 1.0).min(axis=0)
+
+    n_buys = (spend > 0).sum(axis=0)
+    n_sells = (sold > 0).sum(axis=0)
+    total_in = invested[-1]
+    total_out = np.append(proceeds.sum(axis=0), proceeds.sum())
+    final = np.append(held[-1] * safe_p[-1], (held[-1] * safe_p[-1]).sum())
+    profit = final + total_out - total_in
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ret = np.where(total_in > 0, profit / total_in * 100.0, np.nan)
+        hold_ret = np.where(total_in > 0, (hold_value - total_in) / total_in * 100.0, np.nan)
+    columns = assets + [TOTAL]
+    summary = pd.DataFrame({
+        "invested": total_in, "proceeds": total_out, "final_value": final, "profit": profit,
+        "return_pct": ret, "hold_return_pct": hold_ret, "max_drawdown": max_dd,
+        "buys": np.append(n_buys, n_buys.sum()), "sells": np.append(n_sells, n_sells.sum()),
+    }, index=columns)
+
+    t_buy, a_buy = np.nonzero(spend > 0)
+    t_sell, a_sell = np.nonzero(sold > 0)
+    t_all = np.concatenate([t_buy, t_sell])
+    a_all = np.concatenate([a_buy, a_sell])
+    is_buy = np.arange(len(t_all)) < len(t_buy)
+    qty = np.where(is_buy, bought[t_all, a_all], sold[t_all, a_all])
+    trades = pd.DataFrame({
+        "date": dates[t_all], "asset": np.asarray(assets, dtype=object)[a_all],
+        "side": np.where(is_buy, "buy", "sell"), "qty": qty, "price": safe_p[t_all, a_all],
+        "value": np.where(is_buy, spend[t_all, a_all], proceeds[t_all, a_all]),
+        "reason": np.where(is_buy, np.where(seeded[t_all, a_all], "initial", "fear_buy"), "take_profit"),
+    }, columns=TRADE_COLUMNS).sort_values(["date", "side", "asset"], kind="stable").reset_index(drop=True)
+
+    return {"equity": pd.DataFrame(equity, index=dates, columns=columns),
+            "invested": pd.DataFrame(invested, index=dates, columns=columns),
+            "trades": trades, "summary": summary[SUMMARY_COLUMNS]}
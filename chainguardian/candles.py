@@ -0,0 +1,120 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from .config import APP_DIRNAME, CANDLE_DIRNAME, CANDLE_RESOLUTIONS, CANDLE_CAPACITY
+
+# Fixed-width bar: 44 bytes. start == 0 marks an empty slot.
+CANDLE_DTYPE = np.dtype([("start", "<f8"), ("open", "<f8"), ("high", "<f8"), ("low", "<f8"),
+                         ("close", "<f8"), ("samples", "<u4")], align=False)
+CANDLE_COLUMNS = ["open", "high", "low", "close", "samples"]
+
+def _default_dir():
+    return os.path.join(os.path.expanduser("~"), APP_DIRNAME, CANDLE_DIRNAME)
+
+class CandleStore:
+    """
+    OHLC bars per asset and resolution, built from the prices the app fetches anyway.
+    Each (asset, resolution) is a fixed-size ring of CANDLE_DTYPE records in its own file,
+    <dir>/<ASSET>_<res>.bin, memory-mapped: the bar starting at t lives in slot
+    (t // seconds) % capacity, so a sample touches one record per resolution, files never grow,
+    and the oldest bars are overwritten in place without a head pointer to keep consistent.
+    """
+
+    def __init__(self, path: str | None = None, resolutions: dict | None = None, capacity: dict | None = None):
+        self.path = path or _default_dir()
+        self.resolutions = dict(resolutions or CANDLE_RESOLUTIONS)
+        self.capacity = dict(capacity or CANDLE_CAPACITY)
+        self._maps = {}  # (ASSET, res) -> np.memmap
+
+    def _file(self, asset: str, res: str) -> str:
+        return os.path.join(self.path, f"{asset}_{res}.bin")
+
+    def _ring(self, asset: str, res: str, create: bool = False):
+        key = (asset, res)
+        ring = self._maps.get(key)
+        if ring is not None:
+            return ring
+        path, cap = self._file(asset, res), self.capacity[res]
+        if os.path.exists(path) and os.path.getsize(path) == cap * CANDLE_DTYPE.itemsize:
+            ring = np.memmap(path, dtype=CANDLE_DTYPE, mode="r+", shape=(cap,))
+        elif create:
+            # Missing, or written with another capacity: start the ring over.
+            os.makedirs(self.path, exist_ok=True)
+            ring = np.memmap(path, dtype=CANDLE_DTYPE, mode="w+", shape=(cap,))
+        else:
+            return None
+        self._maps[key] = ring
+        return ring
+
+    def add(self, asset: str, price: float, ts: float | None = None):
+        """
+        Fold one price sample into every resolution's current bar. Samples older than the bar
+        already in their slot (i.e. beyond the ring's span) are ignored.
+        """
+        if not price or price <= 0:
+            return
+        asset, ts = asset.upper(), time.time() if ts is None else ts
+        for res, seconds in self.resolutions.items():
+            ring = self._ring(asset, res, create=True)
+            bucket = ts // seconds
+            rec = ring[int(bucket) % len(ring)]
+            start = bucket * seconds
+            if rec["start"] == start:
+                rec["high"] = max(rec["high"], price)
+                rec["low"] = min(rec["low"], price)
+                rec["close"] = price
+                rec["samples"] += 1
+            elif rec["start"] < start:
+                ring[int(bucket) % len(ring)] = (start, price, price, price, price, 1)
+
+    def record(self, prices: dict, ts: float | None = None) -> dict:
+        """
+        Add a prices_coingecko result ({sym: {'price': ...}}) and flush it to disk.
+        Returns `prices` unchanged, so it can wrap a price fetch inline.
+        """
+        ts = time.time() if ts is None else ts
+        for sym, q in prices.items():
+            self.add(sym, (q or {}).get("price") or 0.0, ts)
+        for ring in self._maps.values():
+            ring.flush()
+        return prices
+
+    def _bars(self, asset: str, res: str, since: float | None) -> np.ndarray:
+        ring = self._ring(asset.upper(), res)
+        if ring is None:
+            return np.zeros(0, dtype=CANDLE_DTYPE)
+        bars = np.array(ring)  # snapshot: the ring may be written while we read
+        bars = bars[bars["start"] > 0]
+        if since is not None:
+            bars = bars[bars["start"] >= since]
+        return np.sort(bars, order="start")
+
+    def candles(self, asset: str, res: str, since: float | None = None) -> pd.DataFrame:
+        """
+        Bars of one asset at one resolution, oldest first, indexed by bar start (UTC).
+        """
+        bars = self._bars(asset, res, since)
+        return pd.DataFrame({c: bars[c] for c in CANDLE_COLUMNS},
+                            index=pd.to_datetime(bars["start"], unit="s", utc=True).rename("start"))
+
+    def history(self, asset: str, res: str, since: float | None = None, contiguous: bool = False) -> list:
+        """
+        Closes as [[timestamp_ms, price], ...], the shape of historical_prices_coingecko, so
+        indicators_for and the chart helpers can run on local bars.
+        Bars only exist for periods the app was sampling prices; with contiguous=True only the
+        latest unbroken run is returned, for indicators that assume consecutive bars.
+        """
+        bars = self._bars(asset, res, since)
+        if contiguous and len(bars):
+            breaks = np.flatnonzero(np.diff(bars["start"]) != self.resolutions[res]) + 1
+            bars = bars[breaks[-1]:] if len(breaks) else bars
+        return [[int(s * 1000), float(c)] for s, c in zip(bars["start"], bars["close"])]
+
+_store = None
+
+def candle_store() -> CandleStore:
+    global _store
+    if _store is None:
+        _store = CandleStore()
+    return _store
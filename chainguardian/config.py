@@ -3,7 +3,108 @@ import os
 APP_DIRNAME = ".chainguardian"
 KEY_FILENAME = "fernet.key"
 STORE_FILENAME = "store.enc"
+DEFAULT_PROFILE = "default"  # other profiles are stored as store-<profile>.enc
 
 REFRESH_SECONDS_DEFAULT = 60
 DEFAULT_QUOTE = "USD"
 PROFIT_PCT_DEFAULT = 300.0  # default profit-take threshold
+PROFIT_PCT_MIN = 10.0  # smallest profit-take threshold the settings accept
+PROFIT_PCT_MAX = 1000.0  # largest profit-take threshold the settings accept
+
+# Valuation: prices are fetched once in VALUATION_BASE and cross-converted for reporting.
+VALUATION_BASE = "USD"
+REPORT_QUOTES = ("USD", "EUR", "BTC")
+FX_CACHE_SECONDS = 3600
+
+# Rebalancing defaults (fee as a fraction, min notional in quote units, band in % of equity)
+REBALANCE_FEE_DEFAULT = 0.001
+REBALANCE_MIN_NOTIONAL_DEFAULT = 10.0
+REBALANCE_BAND_PCT_DEFAULT = 1.0
+
+# In-process cache lifetime for CoinGecko price history
+HISTORY_CACHE_SECONDS = 900
+METRICS_CACHE_SIZE = 64
+
+# Whale balance fetching: max in-flight requests per provider and the page-level deadline (s)
+PROVIDER_CONCURRENCY = {"etherscan": 4, "blockchair": 8}
+WHALE_FETCH_DEADLINE = 8.0
+# Balances that answer after a fetch's deadline are handed to the next fetch if no older than this (s)
+WHALE_LATE_RESULT_MAX_AGE = 300
+
+# Whale balance snapshots (under APP_DIRNAME); unchanged balances are re-recorded at most this often
+SNAPSHOT_DIRNAME = "snapshots"
+SNAPSHOT_HEARTBEAT_SECONDS = 3600
+
+# Size of the cached top-wallets leaderboard shown on the Status tab
+LEADERBOARD_SIZE = 10
+
+# Whale flow anomaly detection: rolling window (refreshes), |z| threshold, history needed before scoring
+WHALE_ZSCORE_WINDOW = 24
+WHALE_ZSCORE_THRESHOLD = 3.0
+WHALE_ZSCORE_MIN_PERIODS = 5
+
+# Change-driven whale polling (s): changed wallets are re-polled after POLL_HOT_SECONDS, and each
+# unchanged poll doubles the interval up to POLL_COLD_SECONDS; failures back off the same way
+POLL_HOT_SECONDS = 60
+POLL_COLD_SECONDS = 6 * 3600
+
+# Rich-list discovery cache (under APP_DIRNAME): rankings are refreshed in the background once stale
+DISCOVERY_DIRNAME = "discovery"
+DISCOVERY_TTL_SECONDS = 86400
+DISCOVERY_PAGE_SIZE = 100
+
+# Headless whale daemon: seconds between scheduler ticks, and how old its last poll may be
+# before the UIs stop trusting it and poll in-page again
+DAEMON_TICK_SECONDS = 30
+DAEMON_STALE_SECONDS = 180
+
+# Rows per page in the wallet and order tables
+PAGE_SIZE_DEFAULT = 50
+
+# Alert rules: how many fired alerts each engine keeps for display
+ALERT_HISTORY_SIZE = 200
+
+# Alert delivery: per-rule cooldown (s), how long a burst is collected into one batch (s),
+# queue bound before alerts are dropped, and per-sink delivery timeout (s)
+ALERT_COOLDOWN_SECONDS = 900
+ALERT_BATCH_SECONDS = 2.0
+ALERT_QUEUE_SIZE = 1000
+ALERT_SINK_TIMEOUT = 10.0
+
+# Fear & Greed value at or below which fear_buy_signal fires (Extreme Fear)
+FEAR_BUY_THRESHOLD = 25
+
+# Backtests: quote spent per asset on each fear-buy day, and trading fee per fill (%)
+BACKTEST_BUY_AMOUNT = 100.0
+BACKTEST_FEE_PCT = 0.1
+
+# Parameter sweeps: default grids, and worker processes (None = one per CPU core)
+SWEEP_PROFIT_PCTS = (50.0, 100.0, 150.0, 200.0, 300.0, 400.0, 500.0, 750.0, 1000.0)
+SWEEP_FEAR_THRESHOLDS = (10, 15, 20, 25, 30, 40)
+SWEEP_WORKERS = None
+
+# Incremental indicator states kept in-process (one per asset/quote/parameter set)
+INDICATOR_CACHE_SIZE = 256
+
+# Market screener: coins pulled from CoinGecko's bulk markets endpoint (per_page max is 250),
+# and how long the on-disk copy (under APP_DIRNAME) is served before a background refresh
+SCREENER_DIRNAME = "markets"
+SCREENER_SIZE = 500
+SCREENER_PAGE_SIZE = 250
+SCREENER_TTL_SECONDS = 300
+
+# Rolling window (days) for the return correlation/covariance in the risk view
+RISK_WINDOW_DAYS = 90
+
+# Per-asset price refresh: each asset is re-fetched when its expected move since the last price
+# reaches PRICE_MOVE_PCT (or half the distance to its nearest take-profit/alert level), clamped
+# to [PRICE_REFRESH_MIN_SECONDS, PRICE_REFRESH_MAX_SECONDS]
+PRICE_MOVE_PCT = 0.5
+PRICE_REFRESH_MIN_SECONDS = 15
+PRICE_REFRESH_MAX_SECONDS = 900
+
+# Local OHLC candles built from every fetched price (under APP_DIRNAME): bar size (s) and how many
+# bars each resolution's ring buffer keeps (1 day of 1m, 1 week of 5m, 90 days of 1h, 5 years of 1d)
+CANDLE_DIRNAME = "candles"
+CANDLE_RESOLUTIONS = {"1m": 60, "5m": 300, "1h": 3600, "1d": 86400}
+CANDLE_CAPACITY = {"1m": 1440, "5m": 2016, "1h": 2160, "1d": 1825}
@@ -0,0 +1,146 @@
+import json
+import os
+import threading
+import time
+import requests
+from typing import List
+from .config import APP_DIRNAME, DISCOVERY_DIRNAME, DISCOVERY_TTL_SECONDS, DISCOVERY_PAGE_SIZE
+from .top_wallets import BLOCKCHAIR_API, BLOCKCHAIR_CHAINS
+
+def _default_dir():
+    return os.path.join(os.path.expanduser("~"), APP_DIRNAME, DISCOVERY_DIRNAME)
+
+def fetch_rich_list(chain: str, n: int, page_size: int = DISCOVERY_PAGE_SIZE) -> List[dict]:
+    """
+    Top n addresses by balance from Blockchair's address listing, page_size per request.
+    Returns: [{'rank': 1, 'address': '...', 'balance': 12345.6}, ...] (balance in whole coins);
+    stops early (returning what it has) when a page fails or comes back short.
+    """
+    slug, decimals, _ = BLOCKCHAIR_CHAINS[chain]
+    out = []
+    for offset in range(0, n, page_size):
+        limit = min(page_size, n - offset)
+        try:
+            r = requests.get(f"{BLOCKCHAIR_API}/{slug}/addresses",
+                             params={"s": "balance(desc)", "limit": limit, "offset": offset}, timeout=15)
+            r.raise_for_status()
+            rows = r.json().get("data", []) or []
+        except Exception:
+            break
+        for row in rows:
+            addr = row.get("address")
+            if addr:
+                out.append({"rank": len(out) + 1, "address": addr, "balance": int(row.get("balance", 0) or 0) / 10 ** decimals})
+        if len(rows) < limit:
+            break
+    return out
+
+class DiscoveryCache:
+    """
+    Per-chain rich-list rankings kept on disk as <dir>/<chain>.json:
+      { "chain": "btc", "fetched_at": 1700000000.0, "entries": [{rank, address, balance}, ...] }
+    Fresh rankings (younger than ttl, deep enough) are served straight from disk. Stale ones are
+    still served, while a background thread refreshes them; only a missing or too-short list
+    is fetched inline.
+    """
+
+    def __init__(self, path: str | None = None, ttl: float = DISCOVERY_TTL_SECONDS, fetch=fetch_rich_list):
+        self.path = path or _default_dir()
+        self.ttl = ttl
+        self.fetch = fetch
+        self._lock = threading.Lock()
+        self._refreshing = {}  # chain -> Thread
+
+    def _file(self, chain: str) -> str:
+        return os.path.join(self.path, f"{chain}.json")
+
+    def load(self, chain: str) -> dict | None:
+        try:
+            with open(self._file(chain), "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def mtime(self, chain: str) -> float | None:
+        """
+        When the chain's file was last written, or None if there is none (cheap freshness check).
+        """
+        try:
+            return os.path.getmtime(self._file(chain))
+        except OSError:
+            return None
+
+    def _save(self, chain: str, entries: List[dict], fetched_at: float):
+        os.makedirs(self.path, exist_ok=True)
+        tmp = self._file(chain) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"chain": chain, "fetched_at": fetched_at, "entries": entries}, fh)
+        os.replace(tmp, self._file(chain))  # readers never see a half-written file
+
+    def refresh(self, chain: str, n: int) -> List[dict]:
+        """
+        Fetch the top n now and store them (an empty or failed fetch keeps the old list).
+        """
+        entries = self.fetch(chain, n)
+        if entries:
+            self._save(chain, entries, time.time())
+            return entries
+        cached = self.load(chain)
+        return cached["entries"] if cached else []
+
+    def refresh_async(self, chain: str, n: int) -> bool:
+        """
+        Start a background refresh unless one is already running for the chain.
+        """
+        with self._lock:
+            running = self._refreshing.get(chain)
+            if running is not None and running.is_alive():
+                return False
+            t = threading.Thread(target=self.refresh, args=(chain, n), name=f"cg-discovery-{chain}", daemon=True)
+            self._refreshing[chain] = t
+            t.start()
+            return True
+
+    def top(self, chain: str, n: int = 100) -> List[dict]:
+        """
+        Ranked entries for the top n addresses of a chain (see class docstring for freshness).
+        """
+        cached = self.load(chain)
+        if cached is None:
+            return self.refresh(chain, n)[:n]
+        age = time.time() - cached.get("fetched_at", 0)
+        if len(cached["entries"]) < n and age >= 60:
+            # Deeper list than we have; a list that came back short just now is taken as complete.
+            return self.refresh(chain, n)[:n]
+        if age >= self.ttl:
+            self.refresh_async(chain, max(n, len(cached["entries"])))
+        return cached["entries"][:n]
+
+    def addresses(self, chain: str, n: int = 100) -> List[str]:
+        return [e["address"] for e in self.top(chain, n)]
+
+_cache = None
+
+def discovery_cache() -> DiscoveryCache:
+    global _cache
+    if _cache is None:
+        _cache = DiscoveryCache()
+    return _cache
+
+def get_top_btc_addresses(n: int = 100) -> List[str]:
+    """
+    Top n BTC addresses by balance, from the discovery cache.
+    """
+    return discovery_cache().addresses("btc", n)
+
+def get_top_eth_addresses(n: int = 100) -> List[str]:
+    return discovery_cache().addresses("eth", n)
+
+def get_top_xrp_addresses(n: int = 100) -> List[str]:
+    return discovery_cache().addresses("xrp", n)
+
+def get_top_bnb_addresses(n: int = 100) -> List[str]:
+    return discovery_cache().addresses("bnb", n)
+
+def get_top_ada_addresses(n: int = 100) -> List[str]:
+    return discovery_cache().addresses("ada", n)
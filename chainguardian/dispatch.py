@@ -0,0 +1,263 @@
+import asyncio
+import json
+import smtplib
+import threading
+import time
+from collections import deque
+from email.message import EmailMessage
+import requests
+from .config import ALERT_COOLDOWN_SECONDS, ALERT_BATCH_SECONDS, ALERT_QUEUE_SIZE, ALERT_SINK_TIMEOUT
+
+def _payload(batch: list) -> list:
+    return [{"ts": e.get("ts"), "message": e.get("message"), "value": e.get("value"),
+             "rule": e.get("rule"), "key": list(e["key"]) if isinstance(e.get("key"), tuple) else e.get("key")}
+            for e in batch]
+
+class WebhookSink:
+    """
+    POSTs {"alerts": [...]} as JSON to a URL (Slack/Discord-style incoming webhooks, ntfy, etc.).
+    """
+    def __init__(self, url: str, timeout: float = ALERT_SINK_TIMEOUT):
+        self.name = "webhook"
+        self.url = url
+        self.timeout = timeout
+
+    def _post(self, batch):
+        r = requests.post(self.url, json={"alerts": _payload(batch)}, timeout=self.timeout)
+        r.raise_for_status()
+
+    async def send(self, batch: list):
+        await asyncio.get_running_loop().run_in_executor(None, self._post, batch)
+
+class SmtpSink:
+    """
+    One email per batch, one line per alert.
+    """
+    def __init__(self, host: str, port: int, sender: str, recipients, username: str | None = None,
+                 password: str | None = None, starttls: bool = True, timeout: float = ALERT_SINK_TIMEOUT):
+        self.name = "smtp"
+        self.host, self.port = host, int(port)
+        self.sender = sender
+        self.recipients = [recipients] if isinstance(recipients, str) else list(recipients)
+        self.username, self.password = username, password
+        self.starttls = starttls
+        self.timeout = timeout
+
+    def _mail(self, batch):
+        msg = EmailMessage()
+        msg["Subject"] = f"Chain Guardian: {len(batch)} alert(s)" if len(batch) > 1 else f"Chain Guardian: {batch[0]['message']}"
+        msg["From"] = self.sender
+        msg["To"] = ", ".join(self.recipients)
+        msg.set_content("\n".join(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(e['ts']))}  {e['message']}" for e in batch))
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+            smtp.send_message(msg)
+
+    async def send(self, batch: list):
+        await asyncio.get_running_loop().run_in_executor(None, self._mail, batch)
+
+class FileSink:
+    """
+    Appends one JSON line per alert to a local file.
+    """
+    def __init__(self, path: str):
+        self.name = "file"
+        self.path = path
+
+    def _write(self, batch):
+        with open(self.path, "a", encoding="utf-8") as fh:
+            fh.write("".join(json.dumps(p, default=str) + "\n" for p in _payload(batch)))
+
+    async def send(self, batch: list):
+        await asyncio.get_running_loop().run_in_executor(None, self._write, batch)
+
+class SocketSink:
+    """
+    Writes one JSON line per alert to a TCP listener (e.g. a local notifier, or a test server).
+    """
+    def __init__(self, host: str, port: int):
+        self.name = "socket"
+        self.host, self.port = host, int(port)
+
+    async def send(self, batch: list):
+        _, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            writer.write("".join(json.dumps(p, default=str) + "\n" for p in _payload(batch)).encode("utf-8"))
+            await writer.drain()
+        finally:
+            writer.close()
+            await writer.wait_closed()
+
+SINK_TYPES = {"webhook": WebhookSink, "smtp": SmtpSink, "file": FileSink, "socket": SocketSink}
+
+def sinks_from_settings(configs) -> list:
+    """
+    [{'type': 'webhook', 'url': ...}, {'type': 'file', 'path': ...}, ...] -> sink objects.
+    Entries with an unknown type or missing fields are skipped.
+    """
+    sinks = []
+    for cfg in configs or []:
+        cls = SINK_TYPES.get(cfg.get("type"))
+        if cls is None:
+            continue
+        try:
+            sinks.append(cls(**{k: v for k, v in cfg.items() if k != "type"}))
+        except TypeError:
+            continue
+    return sinks
+
+class AlertDispatcher:
+    """
+    Delivers alerts in the background. submit() never blocks: it applies per-rule dedup
+    (the same rule within `cooldown` seconds is suppressed) and hands the alert to an asyncio
+    queue running on its own thread. The worker collects bursts for `batch_window` seconds,
+    then sends each batch to every sink concurrently with a per-sink timeout, so a slow or
+    dead sink only delays itself.
+    stats() reports submitted/deduped/dropped counts, per-sink delivered/failed counts and
+    submit-to-delivery latency percentiles.
+    """
+
+    def __init__(self, sinks, cooldown: float = ALERT_COOLDOWN_SECONDS, batch_window: float = ALERT_BATCH_SECONDS,
+                 max_queue: int = ALERT_QUEUE_SIZE, sink_timeout: float = ALERT_SINK_TIMEOUT):
+        self.sinks = list(sinks)
+        self.cooldown = cooldown
+        self.batch_window = batch_window
+        self.sink_timeout = sink_timeout
+        self.counts = {"submitted": 0, "deduped": 0, "dropped": 0, "batches": 0}
+        # One counter per sink, even for two sinks of a type: webhook, webhook#2, ...
+        self.sink_labels = []
+        for sink in self.sinks:
+            n = sum(1 for s in self.sinks[:len(self.sink_labels)] if s.name == sink.name)
+            self.sink_labels.append(sink.name if n == 0 else f"{sink.name}#{n + 1}")
+        self.sink_counts = {label: {"delivered": 0, "failed": 0} for label in self.sink_labels}
+        self.latencies = deque(maxlen=1000)
+        self._last_sent = {}  # dedup key -> monotonic time it was accepted
+        self._lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._queue = None
+        self._ready = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._pending = 0
+        self._max_queue = max_queue
+        self._thread = threading.Thread(target=self._run, name="cg-alerts", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue(maxsize=self._max_queue)
+        self._loop.create_task(self._worker())
+        self._ready.set()
+        self._loop.run_forever()
+        pending = asyncio.all_tasks(self._loop)
+        for task in pending:
+            task.cancel()
+        self._loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+        self._loop.close()
+
+    @staticmethod
+    def _dedup_key(event: dict):
+        rule = event.get("rule") or {}
+        return rule.get("id", event.get("message"))
+
+    def submit(self, event: dict) -> bool:
+        """
+        Queue an alert for delivery. Returns False if the rule is still cooling down;
+        alerts lost to a full queue are counted in stats()['dropped'].
+        """
+        now = time.monotonic()
+        key = self._dedup_key(event)
+        with self._lock:
+            self.counts["submitted"] += 1
+            last = self._last_sent.get(key)
+            if last is not None and now - last < self.cooldown:
+                self.counts["deduped"] += 1
+                return False
+            self._last_sent[key] = now
+            self._pending += 1
+            self._idle.clear()
+        self._loop.call_soon_threadsafe(self._enqueue, (now, event))
+        return True
+
+    def _enqueue(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self._done(1, dropped=True)
+
+    def _done(self, n: int, dropped: bool = False):
+        with self._lock:
+            if dropped:
+                self.counts["dropped"] += n
+            self._pending -= n
+            if self._pending == 0:
+                self._idle.set()
+
+    async def _worker(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self.batch_window
+            while True:
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            # Deliver in its own task so the next burst is collected while slow sinks finish.
+            self._loop.create_task(self._deliver(batch))
+
+    async def _deliver(self, batch: list):
+        events = [e for _, e in batch]
+        results = await asyncio.gather(*(asyncio.wait_for(s.send(events), self.sink_timeout) for s in self.sinks),
+                                       return_exceptions=True)
+        done_at = time.monotonic()
+        with self._lock:
+            self.counts["batches"] += 1
+            for label, res in zip(self.sink_labels, results):
+                self.sink_counts[label]["failed" if isinstance(res, BaseException) else "delivered"] += len(events)
+            if any(not isinstance(r, BaseException) for r in results):
+                self.latencies.extend(done_at - t for t, _ in batch)
+        self._done(len(batch))
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """
+        Wait until everything submitted so far has been delivered (or failed).
+        """
+        return self._idle.wait(timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lat = sorted(self.latencies)
+            pct = lambda q: lat[min(len(lat) - 1, int(q * len(lat)))] if lat else None
+            return {**self.counts, "queued": self._pending, "sinks": {k: dict(v) for k, v in self.sink_counts.items()},
+                    "latency_p50": pct(0.5), "latency_p95": pct(0.95)}
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+_dispatchers = {}
+
+def dispatcher_for(key: str, sink_configs) -> AlertDispatcher:
+    """
+    Process-wide dispatcher per key (e.g. profile), rebuilt only when its sink settings change.
+    """
+    sig = json.dumps(sink_configs or [], sort_keys=True)
+    hit = _dispatchers.get(key)
+    if hit is None or hit[0] != sig:
+        if hit is not None:
+            hit[1].close()
+        hit = _dispatchers[key] = (sig, AlertDispatcher(sinks_from_settings(sink_configs)))
+    return hit[1]
+
+def flush_dispatchers(timeout: float | None = None) -> bool:
+    """
+    Wait for every process-wide dispatcher to deliver what it has queued (e.g. before exiting).
+    """
+    return all(d.flush(timeout) for _, d in list(_dispatchers.values()))
@@ -1,4 +1,5 @@
 import plotly.express as px
+import plotly.graph_objects as go
 import pandas as pd
 
 def _stats_to_df(stats: dict) -> pd.DataFrame:
@@ -27,3 +28,16 @@ def fig_unrealized_bar(stats: dict):
     if df.empty:
         return px.bar(x=["No data"], y=[0], title="% Unrealized by asset")
     return px.bar(df, x="asset", y="unrealized_pct", title="% Unrealized by asset")
+
+def fig_correlation_heatmap(corr: pd.DataFrame, title: str = "Return correlation"):
+    if corr is None or corr.empty:
+        return px.imshow([[0.0]], x=["No data"], y=["No data"], title=title)
+    return px.imshow(corr, x=list(corr.columns), y=list(corr.index), zmin=-1, zmax=1,
+                     color_continuous_scale="RdBu", text_auto=".2f", title=title)
+
+def fig_candles(bars: pd.DataFrame, title: str = "Price"):
+    if bars is None or bars.empty:
+        return px.line(x=["No data"], y=[0], title=title)
+    fig = go.Figure(go.Candlestick(x=bars.index, open=bars["open"], high=bars["high"], low=bars["low"], close=bars["close"]))
+    fig.update_layout(title=title, xaxis_rangeslider_visible=False)
+    return fig
@@ -0,0 +1,202 @@
+import threading
+from collections import deque
+from .config import INDICATOR_CACHE_SIZE
+
+# The same recurrences as calculate_ema / calculate_rsi / calculate_macd / calculate_sma in
+# market_data, kept as running state: push() commits one closed candle in O(1), peek() reads the
+# value as if one more (live, still-changing) price were appended, without committing it.
+
+class SMA:
+    __slots__ = ("period", "window", "total")
+
+    def __init__(self, period: int):
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+
+    def push(self, x: float):
+        if len(self.window) == self.period:
+            self.total -= self.window[0]
+        self.window.append(x)
+        self.total += x
+
+    def peek(self, x: float):
+        if len(self.window) + 1 < self.period:
+            return None
+        drop = self.window[0] if len(self.window) == self.period else 0.0
+        return (self.total - drop + x) / self.period
+
+class EMA:
+    """
+    Seeded with the SMA of the first `period` values, like _ema_series.
+    """
+    __slots__ = ("period", "k", "n", "value")
+
+    def __init__(self, period: int):
+        self.period = period
+        self.k = 2.0 / (period + 1)
+        self.n = 0
+        self.value = 0.0  # running sum until seeded
+
+    def _next(self, x: float) -> float:
+        if self.n + 1 < self.period:
+            return self.value + x
+        if self.n + 1 == self.period:
+            return (self.value + x) / self.period
+        return x * self.k + self.value * (1 - self.k)
+
+    def push(self, x: float):
+        self.value = self._next(x)
+        self.n += 1
+
+    def peek(self, x: float):
+        return self._next(x) if self.n + 1 >= self.period else None
+
+    @property
+    def ready(self) -> bool:
+        return self.n >= self.period
+
+class RSI:
+    """
+    Wilder's RSI: the first `period` deltas seed simple averages, later ones are smoothed.
+    """
+    __slots__ = ("period", "n", "prev", "gain", "loss")
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.n = 0  # deltas seen
+        self.prev = None
+        self.gain = self.loss = 0.0
+
+    def _next(self, x: float):
+        d = x - self.prev
+        up, down = max(d, 0.0), max(-d, 0.0)
+        if self.n < self.period:
+            gain, loss = self.gain + up, self.loss + down
+            if self.n + 1 == self.period:
+                gain, loss = gain / self.period, loss / self.period
+            return gain, loss
+        return ((self.gain * (self.period - 1) + up) / self.period,
+                (self.loss * (self.period - 1) + down) / self.period)
+
+    def push(self, x: float):
+        if self.prev is not None:
+            self.gain, self.loss = self._next(x)
+            self.n += 1
+        self.prev = x
+
+    def peek(self, x: float):
+        if self.prev is None or self.n + 1 < self.period:
+            return None
+        gain, loss = self._next(x)
+        return 100.0 if loss == 0 else 100.0 - 100.0 / (1.0 + gain / loss)
+
+class MACD:
+    __slots__ = ("fast", "slow", "signal")
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast, self.slow, self.signal = EMA(fast), EMA(slow), EMA(signal)
+
+    def push(self, x: float):
+        self.fast.push(x)
+        self.slow.push(x)
+        if self.slow.ready:
+            self.signal.push(self.fast.value - self.slow.value)
+
+    def peek(self, x: float):
+        """
+        (macd, signal_line, histogram) once a full signal window of MACD values exists.
+        """
+        if not self.signal.ready:
+            return (None, None, None)
+        line = self.fast.peek(x) - self.slow.peek(x)
+        sig = self.signal.peek(line)
+        return (line, sig, line - sig)
+
+class IndicatorState:
+    """
+    Running RSI, MACD, SMA and EMA over one asset's closed daily candles, plus the timestamp of
+    the last candle committed.
+    """
+
+    def __init__(self, rsi_period=14, fast=12, slow=26, signal=9, sma_period=20, ema_period=20):
+        self.rsi = RSI(rsi_period)
+        self.macd = MACD(fast, slow, signal)
+        self.sma = SMA(sma_period)
+        self.ema = EMA(ema_period)
+        self.last_ts = None
+        self.pushed = 0
+        self.memo = None  # ((ts, price), values) for the last peek
+
+    def push(self, ts, price: float):
+        for ind in (self.rsi, self.macd, self.sma, self.ema):
+            ind.push(price)
+        self.last_ts = ts
+        self.pushed += 1
+
+    def values(self, ts, price: float) -> dict:
+        if self.memo is not None and self.memo[0] == (ts, price):
+            return self.memo[1]
+        macd, signal, hist = self.macd.peek(price)
+        out = {"rsi": self.rsi.peek(price), "macd": macd, "signal": signal, "histogram": hist,
+               "sma": self.sma.peek(price), "ema": self.ema.peek(price)}
+        self.memo = ((ts, price), out)
+        return out
+
+_states = {}
+_locks = {}  # key -> threading.Lock serializing pushes to that key's state
+_lock = threading.Lock()  # guards the two dicts themselves
+
+def _key_lock(key) -> threading.Lock:
+    with _lock:
+        lock = _locks.get(key)
+        if lock is None:
+            lock = _locks[key] = threading.Lock()
+        return lock
+
+def _new_state(key, params) -> IndicatorState:
+    with _lock:
+        if key not in _states and len(_states) >= INDICATOR_CACHE_SIZE:
+            old = next(iter(_states))
+            _states.pop(old)
+            if old != key:
+                _locks.pop(old, None)  # a holder keeps its reference; later callers get a new lock
+        state = _states[key] = IndicatorState(*params)
+        return state
+
+def indicators_for(asset: str, quote: str, history, rsi_period=14, fast=12, slow=26, signal=9,
+                   sma_period=20, ema_period=20) -> dict:
+    """
+    Indicators for a [[ts_ms, price], ...] history (oldest first), as of its last point.
+    All but the last point are treated as closed candles and committed to a cached state keyed by
+    (asset, quote, params); the last point is the live price and is only peeked. A rerun with the
+    same history is a dict lookup, one new candle is one O(1) push. A history that no longer
+    contains the last committed candle rebuilds the state from scratch.
+    Once the history window slides, values keep the seed from the first build instead of
+    re-seeding on the window; the difference decays away with the smoothing.
+    The cache is shared by every session and thread, so each key's walk-back and pushes run
+    under that key's lock: two concurrent reruns can't both push the same candle.
+    Returns {'rsi', 'macd', 'signal', 'histogram', 'sma', 'ema'} (None where there is too little data).
+    """
+    params = (rsi_period, fast, slow, signal, sma_period, ema_period)
+    key = (str(asset).upper(), str(quote).upper(), params)
+    if not history:
+        return {"rsi": None, "macd": None, "signal": None, "histogram": None, "sma": None, "ema": None}
+    with _key_lock(key):
+        state = _states.get(key)
+        closed = len(history) - 1
+        start = 0
+        if state is not None and state.last_ts is not None:
+            # Walk back from the end: normally zero or one new candle.
+            start = closed
+            while start > 0 and history[start - 1][0] > state.last_ts:
+                start -= 1
+            if start == 0 or history[start - 1][0] != state.last_ts:
+                state = None
+                start = 0
+        if state is None:
+            state = _new_state(key, params)
+        for ts, price in history[start:closed]:
+            state.push(ts, float(price))
+        ts, price = history[-1]
+        return state.values(ts, float(price))
@@ -0,0 +1,99 @@
+import heapq
+from .config import LEADERBOARD_SIZE
+
+class Leaderboard:
+    """
+    Top-n tracked wallets by latest balance, kept in a bounded min-heap.
+    Fed incrementally from balance refreshes (update) or from new snapshot records
+    (catch_up); reading the top n never touches the network.
+    Balances are compared in native units, as the Status tab always has.
+    With `addresses` ({(chain, address)}), wallets outside that set are ignored.
+    """
+
+    def __init__(self, n: int = LEADERBOARD_SIZE, addresses=None):
+        self.n = n
+        self.addresses = None if addresses is None else frozenset(addresses)
+        self.balances = {}  # (chain, addr) -> latest balance
+        self.offset = 0     # snapshot records already consumed by catch_up
+        self._heap = []     # (balance, chain, addr), smallest of the top n at [0]
+        self._members = set()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def _rebuild(self):
+        self._heap = [(b, c, a) for (c, a), b in self.balances.items() if b > 0]
+        self._heap = heapq.nlargest(self.n, self._heap)
+        heapq.heapify(self._heap)
+        self._members = {(c, a) for _, c, a in self._heap}
+
+    def update(self, balances: dict):
+        """
+        Apply a { chain: { addr: balance } } refresh. Non-numeric entries (None, pending)
+        are ignored. Outsiders enter via one heap push/pop; a change to a current member
+        triggers a single rebuild over the known balances at the end of the batch.
+        """
+        dirty = False
+        for chain, bals in balances.items():
+            for addr, bal in bals.items():
+                if not isinstance(bal, (int, float)) or isinstance(bal, bool):
+                    continue
+                key = (chain, addr)
+                if self.addresses is not None and key not in self.addresses:
+                    continue
+                bal = float(bal)
+                if self.balances.get(key) == bal:
+                    continue
+                self.balances[key] = bal
+                if key in self._members:
+                    dirty = True
+                elif dirty or bal <= 0:
+                    continue
+                elif len(self._heap) < self.n:
+                    heapq.heappush(self._heap, (bal, chain, addr))
+                    self._members.add(key)
+                elif bal > self._heap[0][0]:
+                    _, c, a = heapq.heappushpop(self._heap, (bal, chain, addr))
+                    self._members.discard((c, a))
+                    self._members.add(key)
+        if dirty:
+            self._rebuild()
+
+    def catch_up(self, store) -> int:
+        """
+        Apply snapshot records written to `store` (a SnapshotStore) since the last call.
+        Returns the number of records read.
+        """
+        recs, self.offset = store.tail(self.offset)
+        if not len(recs):
+            return 0
+        balances = {}
+        for addr_id, bal in zip(recs["addr"].tolist(), recs["balance"].tolist()):
+            chain, addr = store.address(addr_id)
+            balances.setdefault(chain, {})[addr] = bal  # file order is time order: last wins
+        self.update(balances)
+        return len(recs)
+
+    def top(self, k: int | None = None) -> list:
+        """
+        [(chain, addr, balance), ...] largest first, at most k (default n) entries.
+        """
+        ranked = sorted(self._heap, reverse=True)[:k or self.n]
+        return [(c, a, b) for b, c, a in ranked]
+
+_boards = {}
+
+def leaderboard_for(store, n: int = LEADERBOARD_SIZE, addresses=None) -> Leaderboard:
+    """
+    Process-wide leaderboard for a snapshot directory, built from its history on first use
+    and brought up to date with only the newly appended records on later calls.
+    The snapshot directory is shared by every profile and account, so pass the account's
+    tracked (chain, address) pairs as `addresses` to rank only those wallets.
+    """
+    addresses = None if addresses is None else frozenset(addresses)
+    key = (store.path, n, addresses)
+    board = _boards.get(key)
+    if board is None:
+        board = _boards[key] = Leaderboard(n, addresses)
+    board.catch_up(store)
+    return board
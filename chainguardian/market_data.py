@@ -1,4 +1,8 @@
+import time
 import requests
+from .config import HISTORY_CACHE_SECONDS, SCREENER_PAGE_SIZE
+
+_history_cache = {}
 
 def prices_coingecko(symbols_lower, quote="USD"):
     """
@@ -30,6 +34,31 @@ def prices_coingecko(symbols_lower, quote="USD"):
             out[sym] = {"price": 0.0, "change_24h": None}
     return out
 
+def fetch_markets(quote="usd", n=250, page_size=SCREENER_PAGE_SIZE):
+    """
+    Top n coins by market cap via CoinGecko /coins/markets, page_size per request, with 1h/24h/
+    7d/30d/1y changes and the 7-day hourly sparkline.
+    Returns the API rows ([{'id', 'symbol', 'current_price', 'total_volume', ...}, ...]);
+    stops early (returning what it has) when a page fails or comes back short.
+    """
+    out = []
+    for page in range(1, -(-n // page_size) + 1):
+        try:
+            r = requests.get(
+                "https://api.coingecko.com/api/v3/coins/markets",
+                params={"vs_currency": str(quote).lower(), "order": "market_cap_desc", "per_page": page_size,
+                        "page": page, "sparkline": "true", "price_change_percentage": "1h,24h,7d,30d,1y"},
+                timeout=15
+            )
+            r.raise_for_status()
+            rows = r.json() or []
+        except Exception:
+            break
+        out.extend(rows)
+        if len(rows) < page_size:
+            break
+    return out[:n]
+
 def fetch_fear_greed():
     """
     Fear & Greed Index via alternative.me API.
@@ -44,3 +73,105 @@ def fetch_fear_greed():
     except Exception:
         pass
     return {"value": "—", "classification": "Unavailable"}
+
+def fear_greed_history(days=365, max_age=HISTORY_CACHE_SECONDS):
+    """
+    Daily Fear & Greed values via alternative.me (days=0 for the full history).
+    Returns: [[timestamp_ms, value], ...] oldest first, the same shape as historical_prices_coingecko,
+    or [] on error. Cached in-process like the price histories.
+    """
+    key = ("fng", int(days), "")
+    hit = _history_cache.get(key)
+    now = time.time()
+    if hit and now - hit[0] < max_age:
+        return hit[1]
+    try:
+        r = requests.get("https://api.alternative.me/fng/", params={"limit": key[1]}, timeout=10)
+        r.raise_for_status()
+        values = [[int(item["timestamp"]) * 1000, float(item["value"])] for item in r.json().get("data", [])
+                  if item.get("timestamp") and item.get("value") is not None]
+        values.sort()
+        _history_cache[key] = (now, values)
+        return values
+    except Exception:
+        pass
+    return hit[1] if hit else []
+
+def historical_prices_coingecko(symbol, days=30, quote="usd", max_age=HISTORY_CACHE_SECONDS):
+    """
+    Price history via CoinGecko market_chart (symbol used as coin ID, like prices_coingecko).
+    Returns: [[timestamp_ms, price], ...] oldest first, or [] on error.
+    Results are cached in-process per (symbol, days, quote) for max_age seconds.
+    """
+    key = (str(symbol).lower(), int(days), str(quote).lower())
+    hit = _history_cache.get(key)
+    now = time.time()
+    if hit and now - hit[0] < max_age:
+        return hit[1]
+    try:
+        r = requests.get(
+            f"https://api.coingecko.com/api/v3/coins/{key[0]}/market_chart",
+            params={"vs_currency": key[2], "days": key[1]},
+            timeout=10
+        )
+        r.raise_for_status()
+        prices = [[int(ts), float(p)] for ts, p in r.json().get("prices", []) if p is not None]
+        _history_cache[key] = (now, prices)
+        return prices
+    except Exception:
+        pass
+    return hit[1] if hit else []
+
+def calculate_sma(prices, period=20):
+    """
+    Simple moving average of the last `period` prices, or None if there are not enough.
+    """
+    if len(prices) < period or period <= 0:
+        return None
+    return sum(prices[-period:]) / period
+
+def _ema_series(prices, period):
+    k = 2.0 / (period + 1)
+    ema = sum(prices[:period]) / period
+    out = [ema]
+    for p in prices[period:]:
+        ema = p * k + ema * (1 - k)
+        out.append(ema)
+    return out
+
+def calculate_ema(prices, period=20):
+    """
+    Exponential moving average seeded with the SMA of the first `period` prices.
+    """
+    if len(prices) < period or period <= 0:
+        return None
+    return _ema_series(prices, period)[-1]
+
+def calculate_rsi(prices, period=14):
+    """
+    Wilder's RSI over the whole series; None if there are not enough prices.
+    """
+    if len(prices) <= period:
+        return None
+    deltas = [b - a for a, b in zip(prices[:-1], prices[1:])]
+    avg_gain = sum(d for d in deltas[:period] if d > 0) / period
+    avg_loss = sum(-d for d in deltas[:period] if d < 0) / period
+    for d in deltas[period:]:
+        avg_gain = (avg_gain * (period - 1) + max(d, 0.0)) / period
+        avg_loss = (avg_loss * (period - 1) + max(-d, 0.0)) / period
+    if avg_loss == 0:
+        return 100.0
+    rs = avg_gain / avg_loss
+    return 100.0 - 100.0 / (1.0 + rs)
+
+def calculate_macd(prices, fast=12, slow=26, signal=9):
+    """
+    Returns (macd, signal_line, histogram) for the latest point, or (None, None, None).
+    """
+    if len(prices) < slow + signal:
+        return (None, None, None)
+    fast_ema = _ema_series(prices, fast)[slow - fast:]
+    slow_ema = _ema_series(prices, slow)
+    macd_line = [f - s for f, s in zip(fast_ema, slow_ema)]
+    signal_line = _ema_series(macd_line, signal)[-1]
+    return (macd_line[-1], signal_line, macd_line[-1] - signal_line)
@@ -0,0 +1,160 @@
+import numpy as np
+import pandas as pd
+from .config import DEFAULT_QUOTE, METRICS_CACHE_SIZE
+from .valuation import split_pair, fetch_exchange_rates, cross_rate_matrix
+
+PERIODS_PER_YEAR = 365  # crypto trades every day
+TOTAL = "PORTFOLIO"
+METRIC_COLUMNS = ["twr", "xirr", "max_drawdown", "drawdown", "volatility", "sharpe", "sortino"]
+
+_metrics_cache = {}
+
+def price_history_frame(histories: dict) -> pd.DataFrame:
+    """
+    { 'BTC': [[ts_ms, price], ...], ... } -> daily close matrix (index: UTC day, columns: symbol).
+    Gaps are forward-filled; days before an asset's first price stay NaN.
+    """
+    cols = {}
+    for sym, hist in histories.items():
+        if not hist:
+            continue
+        arr = np.asarray(hist, dtype=float)
+        s = pd.Series(arr[:, 1], index=pd.to_datetime(arr[:, 0], unit="ms").normalize())
+        cols[sym.upper()] = s.groupby(level=0).last()
+    if not cols:
+        return pd.DataFrame()
+    return pd.DataFrame(cols).sort_index().ffill()
+
+def _ledger_matrices(orders, prices: pd.DataFrame, default_quote: str, rates: dict | None = None):
+    """
+    Align the order ledger to the price calendar.
+    Returns (qty, flows): holdings after each day and net cash put into each asset that day
+    (buys positive, sells negative), both dates x assets. Orders dated before the first price
+    day are booked on it. Each order's cash is converted from its own quote into default_quote
+    through the cross-rate matrix, as valuation does; orders whose quote has no known rate are
+    left out (unpriced), not counted at face value.
+    """
+    dates, assets = prices.index, prices.columns
+    ledger = []
+    for o in orders:
+        base, quote = split_pair(o.get("asset", ""), default_quote)
+        side = str(o.get("side", "")).lower()
+        if base in assets and side in ("buy", "sell"):
+            ledger.append((o, base, quote, 1.0 if side == "buy" else -1.0))
+    quotes = {q for _, _, q, _ in ledger}
+    to_default = {default_quote.upper(): 1.0}
+    if quotes - set(to_default):
+        fx = cross_rate_matrix(quotes, fetch_exchange_rates() if rates is None else rates, base=default_quote)
+        to_default = fx[default_quote.upper()].to_dict()
+    rows = []
+    for o, base, quote, sign in ledger:
+        rate = to_default.get(quote, np.nan)
+        if rate != rate:
+            continue
+        amount = float(o.get("amount", 0.0) or 0.0)
+        rows.append((o.get("timestamp"), base, sign * amount, sign * amount * float(o.get("price", 0.0) or 0.0) * rate))
+    zero = pd.DataFrame(0.0, index=dates, columns=assets)
+    if not rows:
+        return zero, zero.copy()
+    led = pd.DataFrame(rows, columns=["ts", "asset", "qty", "flow"])
+    ts = pd.to_datetime(led["ts"], errors="coerce", utc=True, format="mixed").dt.tz_localize(None).dt.normalize()
+    pos = np.clip(dates.searchsorted(ts.fillna(dates[0]).to_numpy()), 0, len(dates) - 1)
+    led["day"] = dates[pos]
+    qty = led.pivot_table(index="day", columns="asset", values="qty", aggfunc="sum")
+    flows = led.pivot_table(index="day", columns="asset", values="flow", aggfunc="sum")
+    qty = qty.reindex(index=dates, columns=assets, fill_value=0.0).fillna(0.0).cumsum()
+    flows = flows.reindex(index=dates, columns=assets, fill_value=0.0).fillna(0.0)
+    return qty, flows
+
+def _xirr(cash: np.ndarray, years: np.ndarray, iters: int = 60) -> np.ndarray:
+    """
+    Newton's method on NPV(r) = sum c_t (1+r)^-t for every column at once.
+    cash: dates x series in investor sign (contributions negative). NaN where no root exists.
+    """
+    n = cash.shape[1]
+    has_both = (cash < 0).any(axis=0) & (cash > 0).any(axis=0)
+    r = np.full(n, 0.1)
+    t = years[:, None]
+    with np.errstate(all="ignore"):
+        for _ in range(iters):
+            disc = (1.0 + r) ** -t
+            npv = (cash * disc).sum(axis=0)
+            d_npv = (-t * cash * disc / (1.0 + r)).sum(axis=0)
+            step = np.where(d_npv != 0, npv / d_npv, 0.0)
+            r = np.clip(r - step, -0.9999, 1e6)
+            if np.all(np.abs(step[has_both]) < 1e-10):
+                break
+    return np.where(has_both & np.isfinite(r), r, np.nan)
+
+def performance_metrics(orders, prices: pd.DataFrame, default_quote: str = DEFAULT_QUOTE,
+                        risk_free: float = 0.0, rates: dict | None = None) -> pd.DataFrame:
+    """
+    TWR, money-weighted XIRR, max drawdown, current drawdown (last day vs its running peak),
+    annualized volatility, Sharpe and Sortino per asset plus a PORTFOLIO row, computed
+    column-wise over the dates x assets matrix.
+
+    prices: daily close matrix as built by price_history_frame (quoted in default_quote).
+    rates: exchange-rate table for orders in other quotes (default: the cached fetch).
+    Daily returns treat each day's cash flow as arriving at the start of the day:
+    r_t = V_t / (V_{t-1} + F_t) - 1. Days before the first order are ignored.
+    """
+    if prices is None or prices.empty or not orders:
+        return pd.DataFrame(columns=METRIC_COLUMNS)
+    prices = prices.ffill()
+    qty, flows = _ledger_matrices(orders, prices, default_quote, rates)
+    value = qty * prices.fillna(0.0)
+    value[TOTAL] = value.sum(axis=1)
+    flows[TOTAL] = flows.sum(axis=1)
+
+    v = value.to_numpy()
+    f = flows.to_numpy()
+    prev = np.vstack([np.zeros((1, v.shape[1])), v[:-1]])
+    denom = prev + f
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = np.where(denom > 0, v / denom - 1.0, np.nan)
+    active = np.cumsum(np.abs(f) > 0, axis=0) > 0
+    r[~active] = np.nan
+
+    growth = np.nan_to_num(r) + 1.0
+    twr = np.where(active.any(axis=0), growth.prod(axis=0) - 1.0, np.nan)
+    wealth = np.cumprod(growth, axis=0)
+    underwater = wealth / np.maximum.accumulate(wealth, axis=0) - 1.0
+    max_dd = underwater.min(axis=0)
+    cur_dd = underwater[-1]  # where the last day stands against its running peak
+
+    with np.errstate(all="ignore"):
+        mean = np.nanmean(r, axis=0)
+        vol = np.nanstd(r, axis=0, ddof=1) * np.sqrt(PERIODS_PER_YEAR)
+        downside = np.sqrt(np.nanmean(np.minimum(r, 0.0) ** 2, axis=0)) * np.sqrt(PERIODS_PER_YEAR)
+        excess = mean * PERIODS_PER_YEAR - risk_free
+        sharpe = np.where(vol > 0, excess / vol, np.nan)
+        sortino = np.where(downside > 0, excess / downside, np.nan)
+
+    # Money-weighted: contributions negative, withdrawals positive, final value closes the position.
+    cash = -f.copy()
+    cash[-1] += v[-1]
+    years = (prices.index - prices.index[0]).days.to_numpy(dtype=float) / 365.0
+    xirr = _xirr(cash, years)
+
+    return pd.DataFrame({
+        "twr": twr, "xirr": xirr, "max_drawdown": max_dd, "drawdown": cur_dd,
+        "volatility": vol, "sharpe": sharpe, "sortino": sortino,
+    }, index=value.columns)
+
+def cached_performance_metrics(account: str, orders, prices: pd.DataFrame,
+                               default_quote: str = DEFAULT_QUOTE, risk_free: float = 0.0) -> pd.DataFrame:
+    """
+    performance_metrics memoized on (account, last order id, order count, last price date),
+    so re-rendering the same view costs a dict lookup.
+    """
+    last_id = orders[-1].get("id") if orders else None
+    last_day = prices.index[-1] if prices is not None and not prices.empty else None
+    key = (account, last_id, len(orders), last_day, default_quote, risk_free)
+    hit = _metrics_cache.get(key)
+    if hit is not None:
+        return hit
+    result = performance_metrics(orders, prices, default_quote=default_quote, risk_free=risk_free)
+    if len(_metrics_cache) >= METRICS_CACHE_SIZE:
+        _metrics_cache.pop(next(iter(_metrics_cache)))
+    _metrics_cache[key] = result
+    return result
@@ -0,0 +1,262 @@
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+
+# One fixed-width row per order; strings live once in the intern table and rows hold codes.
+ORDER_DTYPE = np.dtype([
+    ("id", "i8"),         # integer id, or the value of an integer-like text id (sort key); 0 otherwise
+    ("id_ref", "u4"),     # intern code of a text id (kept verbatim), 0 for an int id
+    ("ts", "f8"),         # epoch seconds, NaN if unknown
+    ("asset", "u4"),      # original asset text, e.g. 'XRP/USDT'
+    ("base", "u4"),       # 'XRP'
+    ("quote", "u4"),      # 'USDT'; 0 means "not given, use the default quote"
+    ("side", "i1"),       # +1 buy, -1 sell, 0 other
+    ("exchange", "u4"),
+    ("status", "u4"),
+    ("note", "u4"),
+    ("amount", "f8"),
+    ("price", "f8"),
+])
+SIDE_CODES = {"buy": 1, "sell": -1}
+SIDE_NAMES = {1: "buy", -1: "sell", 0: ""}
+ORDER_FIELDS = ["id", "asset", "side", "amount", "price", "exchange", "timestamp", "note", "status"]
+_I8 = np.iinfo(np.int64)
+
+class Interner:
+    """
+    Bidirectional string <-> code table. Code 0 is always the empty string.
+    """
+    __slots__ = ("strings", "codes")
+
+    def __init__(self):
+        self.strings = [""]
+        self.codes = {"": 0}
+
+    def code(self, s) -> int:
+        c = self.codes.get(s)
+        if c is not None:
+            return c
+        s = "" if s is None else str(s)
+        c = self.codes.get(s)
+        if c is None:
+            c = self.codes[s] = len(self.strings)
+            self.strings.append(s)
+        return c
+
+    def lookup(self, codes: np.ndarray) -> np.ndarray:
+        return np.asarray(self.strings, dtype=object)[codes]
+
+def _to_float(v) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return 0.0
+
+def _int_id(v):
+    """
+    v as an int64 if it is an int, or text that round-trips through int exactly ('123', not
+    '007' or '+5'); None otherwise.
+    """
+    if isinstance(v, str):
+        try:
+            i = int(v)
+        except ValueError:
+            return None
+        if str(i) != v:
+            return None
+    elif type(v) is int or isinstance(v, np.integer):
+        i = int(v)
+    else:
+        return None
+    return i if _I8.min <= i <= _I8.max else None
+
+def _to_epoch(v) -> float:
+    if v is None or v == "":
+        return np.nan
+    if isinstance(v, (int, float)):
+        return float(v) / 1000.0 if v > 1e11 else float(v)
+    try:
+        dt = datetime.fromisoformat(str(v).replace("Z", "+00:00"))
+    except ValueError:
+        return np.nan
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+def _to_iso(t: float):
+    return datetime.fromtimestamp(t, tz=timezone.utc).isoformat() if t == t else None
+
+class OrderTable:
+    """
+    Compact, typed view of a store's orders: a NumPy structured array (ORDER_DTYPE) plus one
+    shared intern table. About 50 bytes per order instead of a dict of Python objects.
+    Converts to and from the list-of-dicts on-disk format with from_records / to_records.
+    Ids come back as they were given: text ids are interned verbatim, and anything that is
+    neither text nor an int64 (floats, None, huge ints) is kept as-is in `extras`, with any
+    keys outside ORDER_FIELDS. So are a side or timestamp the packed row would not reproduce
+    ('BUY', a naive or millisecond timestamp): the row keeps the code for sorting and filtering,
+    and to_records / frame return the original value.
+    """
+    __slots__ = ("rows", "size", "strings", "extras", "_frame")
+
+    def __init__(self, capacity: int = 0, strings: Interner | None = None):
+        self.rows = np.zeros(max(capacity, 16), dtype=ORDER_DTYPE)
+        self.size = 0
+        self.strings = strings or Interner()
+        self.extras = {}  # row -> {key: original value} for what the packed row cannot hold
+        self._frame = None
+
+    @classmethod
+    def from_records(cls, orders) -> "OrderTable":
+        table = cls(capacity=len(orders))
+        table.extend(orders)
+        return table
+
+    def __len__(self):
+        return self.size
+
+    @property
+    def data(self) -> np.ndarray:
+        return self.rows[:self.size]
+
+    def _pair_codes(self, asset: str, cache: dict) -> tuple:
+        hit = cache.get(asset)
+        if hit is None:
+            code = self.strings.code
+            base, _, quote = asset.upper().strip().partition("/")
+            base = base.split()[0] if base.split() else ""
+            quote = quote.split()[0] if quote.split() else ""
+            hit = cache[asset] = (code(asset), code(base), code(quote))
+        return hit
+
+    def extend(self, orders):
+        if not orders:
+            return
+        n = self.size + len(orders)
+        if n > len(self.rows):
+            grown = np.zeros(max(n, 2 * len(self.rows)), dtype=ORDER_DTYPE)
+            grown[:self.size] = self.data
+            self.rows = grown
+        code = self.strings.code
+        pairs = {}
+        encoded = []
+        for row, o in enumerate(orders, start=self.size):
+            raw_id = o.get("id")
+            num_id = _int_id(raw_id)
+            id_ref = code(raw_id) if isinstance(raw_id, str) else 0
+            extra = {k: v for k, v in o.items() if k not in ORDER_FIELDS}
+            if num_id is None:
+                num_id = 0
+                if not id_ref:
+                    extra["id"] = raw_id
+            raw_ts, raw_side = o.get("timestamp"), o.get("side", "")
+            ts = _to_epoch(raw_ts)
+            side = SIDE_CODES.get(str(raw_side).lower(), 0)
+            if raw_ts != _to_iso(ts):
+                extra["timestamp"] = raw_ts
+            if raw_side != SIDE_NAMES[side]:
+                extra["side"] = raw_side
+            if extra:
+                self.extras[row] = extra
+            asset, base, quote = self._pair_codes(str(o.get("asset", "") or ""), pairs)
+            encoded.append((num_id, id_ref, ts, asset, base, quote, side, code(o.get("exchange") or ""),
+                            code(o.get("status") or ""), code(o.get("note") or ""),
+                            _to_float(o.get("amount", 0.0)), _to_float(o.get("price", 0.0))))
+        self.rows[self.size:n] = encoded
+        self.size = n
+        self._frame = None
+
+    def append(self, order: dict):
+        self.extend([order])
+
+    def base_codes(self):
+        """
+        Returns (codes, symbols): dense 0..k-1 base codes per row and the k base symbols.
+        """
+        uniq, dense = np.unique(self.data["base"], return_inverse=True)
+        return dense, [self.strings.strings[c] for c in uniq]
+
+    def quotes(self, default_quote: str) -> np.ndarray:
+        q = self.strings.lookup(self.data["quote"])
+        q[q == ""] = default_quote.upper()
+        return q
+
+    def lots_frame(self, default_quote: str) -> pd.DataFrame:
+        """
+        Columns valuation needs (base, quote, side, amount, price, exchange), decoded in bulk.
+        """
+        d = self.data
+        exch = self.strings.lookup(d["exchange"])
+        exch[exch == ""] = None
+        frame = pd.DataFrame({
+            "base": self.strings.lookup(d["base"]),
+            "quote": self.quotes(default_quote),
+            "side": np.vectorize(SIDE_NAMES.get, otypes=[object])(d["side"]) if len(d) else np.array([], dtype=object),
+            "amount": d["amount"],
+            "price": d["price"],
+            "exchange": exch,
+        })
+        return frame[frame["base"] != ""]
+
+    def _ids(self, d: np.ndarray | None = None) -> list:
+        d = self.data if d is None else d
+        text = self.strings.lookup(d["id_ref"])
+        return [t if r else int(i) for i, r, t in zip(d["id"], d["id_ref"], text)]
+
+    def _timestamps(self, d: np.ndarray | None = None) -> list:
+        d = self.data if d is None else d
+        return [_to_iso(t) for t in d["ts"]]
+
+    def to_records(self) -> list:
+        """
+        Back to the on-disk list-of-dicts format. Amount/price come back as floats; ids, sides,
+        timestamps and extra keys as they were given.
+        """
+        d = self.data
+        lk = self.strings.lookup
+        cols = zip(self._ids(), lk(d["asset"]), d["side"], d["amount"], d["price"], lk(d["exchange"]),
+                   self._timestamps(), lk(d["note"]), lk(d["status"]))
+        recs = [dict(zip(ORDER_FIELDS, (i, a, SIDE_NAMES[int(s)], float(amt), float(px), e, ts, n, st)))
+                for i, a, s, amt, px, e, ts, n, st in cols]
+        for row, extra in self.extras.items():
+            recs[row].update(extra)
+        return recs
+
+    def _decode(self, idx: np.ndarray) -> pd.DataFrame:
+        d = self.data[idx]
+        lk = self.strings.lookup
+        cols = {"id": self._ids(d), "side": [SIDE_NAMES[int(s)] for s in d["side"]],
+                "timestamp": self._timestamps(d)}
+        extras = [self.extras.get(int(i)) for i in idx] if self.extras else []
+        for pos, e in enumerate(extras):
+            for k in e or ():
+                if k in cols:
+                    cols[k][pos] = e[k]
+        frame = pd.DataFrame({
+            "id": cols["id"],
+            "asset": lk(d["asset"]),
+            "side": cols["side"],
+            "amount": d["amount"],
+            "price": d["price"],
+            "exchange": lk(d["exchange"]),
+            "timestamp": cols["timestamp"],
+            "note": lk(d["note"]),
+            "status": lk(d["status"]),
+        }, columns=ORDER_FIELDS)
+        for k in dict.fromkeys(k for e in extras if e for k in e if k not in cols):
+            frame[k] = [e.get(k) if e else None for e in extras]
+        return frame
+
+    def frame(self) -> pd.DataFrame:
+        """
+        pandas view for display (built once per table state, then reused).
+        """
+        if self._frame is None:
+            self._frame = self._decode(np.arange(self.size))
+        return self._frame
+
+    def take(self, idx) -> pd.DataFrame:
+        """
+        pandas view of just the rows at positions idx (in that order), e.g. one table page.
+        """
+        return self._decode(np.asarray(idx, dtype=np.intp))
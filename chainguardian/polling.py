@@ -0,0 +1,308 @@
+import math
+import time
+from .config import (POLL_HOT_SECONDS, POLL_COLD_SECONDS, WHALE_FETCH_DEADLINE, PRICE_MOVE_PCT,
+                     PRICE_REFRESH_MIN_SECONDS, PRICE_REFRESH_MAX_SECONDS)
+from .top_wallets import PENDING, HEIGHT_PROBE_CHAINS, batch_size, chain_height, fetch_balances
+
+class PollScheduler:
+    """
+    Decides which tracked wallets are worth re-querying. Per address it keeps
+      balance      last balance seen (None until the first successful poll)
+      changed_at   when that balance last changed
+      interval     seconds until the next poll; reset to `hot` on a change, doubled on
+                   every unchanged poll up to `cold`, and backed off the same way on errors
+      next_due     epoch seconds of the next poll
+      failures     consecutive failed lookups
+    and per chain the block height seen at the last probe.
+    """
+
+    def __init__(self, hot: float = POLL_HOT_SECONDS, cold: float = POLL_COLD_SECONDS):
+        self.hot = hot
+        self.cold = cold
+        self.state = {}    # (chain, addr) -> dict as above
+        self.heights = {}  # chain -> last probed block height
+
+    def _entry(self, chain: str, addr: str) -> dict:
+        return self.state.setdefault((chain, addr), {"balance": None, "changed_at": None, "interval": self.hot,
+                                                     "next_due": 0.0, "failures": 0})
+
+    def seed(self, latest: dict, now: float | None = None):
+        """
+        Start from SnapshotStore.latest() ({(chain, addr): (ts, balance)}) so a restart does not
+        re-poll everything: each known wallet is next due one hot interval after its last snapshot.
+        """
+        now = time.time() if now is None else now
+        for (chain, addr), (ts, bal) in latest.items():
+            e = self._entry(chain, addr)
+            if e["balance"] is None:
+                e.update(balance=bal, changed_at=ts, next_due=min(ts + self.hot, now + self.hot))
+
+    def due(self, tracked: dict, now: float | None = None) -> dict:
+        """
+        { chain: [addr, ...] } of tracked wallets whose next poll is due (new ones always are).
+        """
+        now = time.time() if now is None else now
+        out = {}
+        for chain, addrs in tracked.items():
+            ready = [a for a in dict.fromkeys(addrs) if self._entry(chain, a)["next_due"] <= now]
+            if ready:
+                out[chain] = ready
+        return out
+
+    def _unchanged(self, e: dict, now: float):
+        e["interval"] = min(e["interval"] * 2, self.cold)
+        e["next_due"] = now + e["interval"]
+
+    def record(self, balances: dict, now: float | None = None) -> dict:
+        """
+        Apply a fetch_balances result. Returns { chain: { addr: balance } } for wallets whose
+        balance changed (or was seen for the first time).
+        """
+        now = time.time() if now is None else now
+        changed = {}
+        for chain, bals in balances.items():
+            for addr, bal in bals.items():
+                e = self._entry(chain, addr)
+                if bal == PENDING:
+                    e["next_due"] = now  # still in flight: ask again on the next refresh
+                elif bal is None:
+                    e["failures"] += 1
+                    e["interval"] = min(self.hot * 2 ** e["failures"], self.cold)
+                    e["next_due"] = now + e["interval"]
+                else:
+                    e["failures"] = 0
+                    if e["balance"] is None or not math.isclose(e["balance"], bal, rel_tol=0.0, abs_tol=1e-12):
+                        e.update(balance=float(bal), changed_at=now, interval=self.hot, next_due=now + self.hot)
+                        changed.setdefault(chain, {})[addr] = float(bal)
+                    else:
+                        self._unchanged(e, now)
+        return changed
+
+    def defer(self, chain: str, addrs, now: float | None = None):
+        """
+        Treat addrs as polled and unchanged (e.g. the chain has no new block since last time).
+        """
+        now = time.time() if now is None else now
+        for a in addrs:
+            self._unchanged(self._entry(chain, a), now)
+
+    def balances(self, tracked: dict) -> dict:
+        """
+        Last known balance of every tracked wallet, PENDING where none has been seen yet.
+        Same shape as fetch_balances, so it can be handed to get_whale_activity.
+        """
+        out = {}
+        for chain, addrs in tracked.items():
+            out[chain] = {}
+            for a in dict.fromkeys(addrs):
+                bal = self.state.get((chain, a), {}).get("balance")
+                out[chain][a] = PENDING if bal is None else bal
+        return out
+
+def poll_balances(scheduler: PollScheduler, tracked: dict, api_keys: dict | None = None,
+                  deadline: float = WHALE_FETCH_DEADLINE, now: float | None = None):
+    """
+    One change-driven refresh: only due wallets are queried, and for chains in
+    HEIGHT_PROBE_CHAINS a single block-height probe replaces the balance requests when no block
+    was produced since the last poll (only tried when it saves requests).
+    Returns (balances, fetched): last known balance of every tracked wallet, and the raw
+    fetch_balances result for the wallets actually queried (what snapshots should record).
+    """
+    now = time.time() if now is None else now
+    due = scheduler.due(tracked, now)
+    probed = {}  # chain -> new height, committed once that chain's due wallets have all answered
+    for chain in [c for c in due if c in HEIGHT_PROBE_CHAINS]:
+        if math.ceil(len(due[chain]) / batch_size(chain, api_keys)) < 2:
+            continue
+        height = chain_height(chain)
+        if height is not None and height == scheduler.heights.get(chain):
+            # Only wallets with a known balance can be skipped; new ones still need a first look.
+            unseen = [a for a in due[chain] if scheduler.state[(chain, a)]["balance"] is None]
+            scheduler.defer(chain, [a for a in due[chain] if scheduler.state[(chain, a)]["balance"] is not None], now)
+            if unseen:
+                due[chain] = unseen
+            else:
+                del due[chain]
+        elif height is not None:
+            probed[chain] = height
+    fetched = fetch_balances(due, api_keys, deadline=deadline) if due else {}
+    scheduler.record(fetched, now)
+    for chain, height in probed.items():
+        # A wallet still pending (or failed) has not been read at this height; recording it now
+        # would let the next tick defer that wallet as unchanged and lose its change.
+        bals = fetched.get(chain, {})
+        if all(isinstance(bals.get(a), (int, float)) for a in due[chain]):
+            scheduler.heights[chain] = height
+    balances = scheduler.balances(tracked)
+    for chain, bals in fetched.items():
+        for a, bal in bals.items():
+            if bal is None and scheduler.state[(chain, a)]["balance"] is None:
+                balances[chain][a] = None  # failed and never seen: unavailable, not pending
+    return balances, fetched
+
+_schedulers = {}
+
+def scheduler_for(key: str, latest: dict | None = None) -> PollScheduler:
+    """
+    Process-wide PollScheduler per key (e.g. profile/account), seeded from snapshots on first use.
+    """
+    sched = _schedulers.get(key)
+    if sched is None:
+        sched = _schedulers[key] = PollScheduler()
+        if latest:
+            sched.seed(latest)
+    return sched
+
+def realized_volatility(history) -> float | None:
+    """
+    Daily volatility (std of log returns, scaled to one day) of a [[ts_ms, price], ...] history
+    of any granularity; None if there are fewer than 3 usable points.
+    """
+    pts = [(t, p) for t, p in history or [] if p and p > 0]
+    if len(pts) < 3:
+        return None
+    rets = [math.log(b[1] / a[1]) for a, b in zip(pts[:-1], pts[1:])]
+    step_days = (pts[-1][0] - pts[0][0]) / 86_400_000 / len(rets)
+    if step_days <= 0:
+        return None
+    mean = sum(rets) / len(rets)
+    var = sum((r - mean) ** 2 for r in rets) / (len(rets) - 1)
+    return math.sqrt(var / step_days)
+
+class PriceScheduler:
+    """
+    Per-asset price refresh intervals. An asset with daily volatility σ is expected to move
+    σ * sqrt(t / 1 day) in t seconds, so it is re-fetched after the t at which that reaches its
+    target move: move_pct, or half the distance to its nearest trigger price (take-profit or
+    alert level) when that is closer. Quiet assets and stablecoins drift out to max_interval,
+    volatile ones and those about to cross a level come in towards min_interval; assets with no
+    volatility estimate yet use `default`. Per symbol it keeps
+      price, change_24h   last fetched quote
+      fetched_at          when it was fetched
+      vol                 daily volatility: seeded from history, then updated (EWMA) from the
+                          moves seen between fetches
+      distance            % from the price to the nearest trigger (None if there is none)
+      next_due            epoch seconds of the next fetch
+    """
+
+    def __init__(self, default: float = PRICE_REFRESH_MAX_SECONDS, min_interval: float = PRICE_REFRESH_MIN_SECONDS,
+                 max_interval: float = PRICE_REFRESH_MAX_SECONDS, move_pct: float = PRICE_MOVE_PCT):
+        self.default = default
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.move_pct = move_pct
+        self.state = {}
+
+    def _entry(self, sym: str) -> dict:
+        return self.state.setdefault(sym.lower(), {"price": None, "change_24h": None, "fetched_at": None,
+                                                   "vol": None, "distance": None, "next_due": 0.0})
+
+    def interval(self, sym: str) -> float:
+        e = self._entry(sym)
+        if e["vol"] is None:
+            return min(max(self.default, self.min_interval), self.max_interval)
+        target = self.move_pct
+        if e["distance"] is not None:
+            target = min(target, e["distance"] / 2.0)
+        if e["vol"] <= 0:
+            return self.max_interval
+        t = 86400.0 * (target / 100.0 / e["vol"]) ** 2
+        return min(max(t, self.min_interval), self.max_interval)
+
+    def _reschedule(self, e: dict, sym: str):
+        if e["fetched_at"] is not None:
+            e["next_due"] = e["fetched_at"] + self.interval(sym)
+
+    def set_volatility(self, vols: dict):
+        """
+        Seed daily volatilities ({sym: σ}, e.g. realized_volatility of a recent history) for the
+        assets without an estimate yet; once there is one, record's EWMA keeps it current, so a
+        later seed must not overwrite it.
+        """
+        for sym, vol in vols.items():
+            e = self._entry(sym)
+            if vol is not None and e["vol"] is None:
+                e["vol"] = float(vol)
+                self._reschedule(e, sym)
+
+    def set_triggers(self, levels: dict):
+        """
+        Price levels that matter per asset ({sym: [price, ...]}, in the same quote as the fetched
+        prices); the nearest one tightens the asset's interval as the price approaches it.
+        """
+        for sym, e in self.state.items():
+            lv = [l for l in levels.get(sym, levels.get(sym.upper(), [])) or [] if l and l > 0]
+            if e["price"] and lv:
+                e["distance"] = min(abs(l / e["price"] - 1.0) * 100.0 for l in lv)
+            else:
+                e["distance"] = None
+            self._reschedule(e, sym)
+
+    def due(self, symbols, now: float | None = None) -> list:
+        """
+        Symbols to fetch now: the ones that are due, plus, if any are, those past half their
+        interval, since they ride along in the same batched request for free.
+        """
+        now = time.time() if now is None else now
+        syms = [s.lower() for s in dict.fromkeys(symbols)]
+        due = [s for s in syms if self._entry(s)["next_due"] <= now]
+        if not due:
+            return []
+        early = [s for s in syms if s not in due and self.state[s]["fetched_at"] is not None
+                 and now - self.state[s]["fetched_at"] >= self.interval(s) / 2.0]
+        return due + early
+
+    def record(self, prices: dict, now: float | None = None):
+        """
+        Apply a prices_coingecko result. A zero price counts as a failed lookup: the last good
+        quote is kept and the asset is retried after min_interval.
+        """
+        now = time.time() if now is None else now
+        for sym, q in prices.items():
+            e = self._entry(sym)
+            price = (q or {}).get("price") or 0.0
+            if price <= 0:
+                e["next_due"] = now + self.min_interval
+                continue
+            if e["price"] and e["fetched_at"] is not None and now > e["fetched_at"]:
+                r2 = math.log(price / e["price"]) ** 2 * 86400.0 / (now - e["fetched_at"])
+                e["vol"] = math.sqrt(r2) if e["vol"] is None else math.sqrt(0.9 * e["vol"] ** 2 + 0.1 * r2)
+            e.update(price=float(price), change_24h=q.get("change_24h"), fetched_at=now)
+            self._reschedule(e, sym)
+
+    def next_due(self, symbols) -> float | None:
+        """
+        Earliest next fetch among symbols (epoch seconds), None if there are none.
+        """
+        return min((self._entry(s)["next_due"] for s in symbols), default=None)
+
+    def prices(self, symbols) -> dict:
+        """
+        Last known quotes in the prices_coingecko shape ({'price': 0.0, 'change_24h': None} if never fetched).
+        """
+        return {s.lower(): {"price": self._entry(s)["price"] or 0.0, "change_24h": self._entry(s)["change_24h"]}
+                for s in symbols}
+
+def scheduled_prices(scheduler: PriceScheduler, provider, symbols, now: float | None = None) -> dict:
+    """
+    Drop-in price_provider: fetches only the symbols the scheduler says are due, in one batched
+    provider call, and answers the rest from the last quotes.
+    """
+    now = time.time() if now is None else now
+    due = scheduler.due(symbols, now)
+    if due:
+        scheduler.record(provider(due), now)
+    return scheduler.prices(symbols)
+
+_price_schedulers = {}
+
+def price_scheduler_for(key: str, default: float = PRICE_REFRESH_MAX_SECONDS) -> PriceScheduler:
+    """
+    Process-wide PriceScheduler per key; `default` follows the refresh setting. Trigger levels
+    belong to one account, so callers that set them key the scheduler per profile and account.
+    """
+    sched = _price_schedulers.get(key)
+    if sched is None:
+        sched = _price_schedulers[key] = PriceScheduler(default=default)
+    sched.default = default
+    return sched
@@ -1,18 +1,36 @@
+import numpy as np
 import pandas as pd
-from collections import defaultdict
+from .config import VALUATION_BASE, REPORT_QUOTES
+from .orders import OrderTable
+from .valuation import STABLECOIN_PEGS, fetch_exchange_rates, cross_rate_matrix, stats_by_quote
 
 class Portfolio:
     def __init__(self, store: dict):
         self.store = store
+        self.orders = None
+        self._source = None
         self._reload()
 
     def _reload(self):
-        self.df = pd.DataFrame(self.store.get("orders", []))
-        if not self.df.empty and "asset" in self.df.columns:
-            self.df["asset"] = self.df["asset"].astype(str)
+        """
+        Sync the compact order table with store['orders'].
+        If the store still holds the same list we last read and it only grew, just the new
+        tail is encoded; otherwise the table is rebuilt once from the records.
+        """
+        src = self.store.get("orders", [])
+        if self.orders is not None and src is self._source and len(src) >= len(self.orders):
+            self.orders.extend(src[len(self.orders):])
+        else:
+            self.orders = OrderTable.from_records(src)
+            self._source = src
+
+    @property
+    def df(self) -> pd.DataFrame:
+        return self.orders.frame()
 
     def add_order(self, order: dict):
         self.store.setdefault("orders", []).append(order)
+        self._reload()
 
     def compute_stats(self, price_provider, default_quote="USD"):
         """
@@ -27,32 +45,35 @@ class Portfolio:
           'exchange': str|None
         }
         """
-        if self.df.empty:
+        self._reload()
+        d = self.orders.data
+        if not len(d):
             return {}
 
-        # Aggregate by base (XRP/USDT -> XRP)
-        agg = defaultdict(lambda: {"buys_qty": 0.0, "buys_cost": 0.0, "sells_qty": 0.0, "exchange": None})
-        for _, row in self.df.iterrows():
-            asset = str(row.get("asset","")).upper()
-            base = asset.split("/")[0] if "/" in asset else asset
-            side = str(row.get("side","")).lower()
-            qty = float(row.get("amount", 0.0))
-            price = float(row.get("price", 0.0))
-            if side == "buy":
-                agg[base]["buys_qty"] += qty
-                agg[base]["buys_cost"] += qty * price
-            elif side == "sell":
-                agg[base]["sells_qty"] += qty
-            if not agg[base]["exchange"] and row.get("exchange"):
-                agg[base]["exchange"] = row.get("exchange")
+        # Aggregate by base (XRP/USDT -> XRP) with one bincount per column
+        codes, bases = self.orders.base_codes()
+        k = len(bases)
+        buy = d["side"] == 1
+        sell = d["side"] == -1
+        buys_qty = np.bincount(codes, weights=np.where(buy, d["amount"], 0.0), minlength=k)
+        buys_cost = np.bincount(codes, weights=np.where(buy, d["amount"] * d["price"], 0.0), minlength=k)
+        sells_qty = np.bincount(codes, weights=np.where(sell, d["amount"], 0.0), minlength=k)
+        # First exchange seen per base, in ledger order
+        has_exch = np.flatnonzero(d["exchange"] != 0)
+        first_base, first_row = np.unique(codes[has_exch], return_index=True)
+        exchange = [None] * k
+        for b, row in zip(first_base, has_exch[first_row]):
+            exchange[b] = self.orders.strings.strings[d["exchange"][row]]
 
-        symbols = [s.lower() for s in agg.keys()]
+        live = [i for i, b in enumerate(bases) if b]
+        symbols = [bases[i].lower() for i in live]
         price_data = price_provider(symbols)
 
         stats = {}
-        for base, a in agg.items():
-            remaining_qty = max(0.0, a["buys_qty"] - a["sells_qty"])
-            avg_buy = (a["buys_cost"] / a["buys_qty"]) if a["buys_qty"] > 0 else 0.0
+        for i in live:
+            base = bases[i]
+            remaining_qty = max(0.0, float(buys_qty[i] - sells_qty[i]))
+            avg_buy = float(buys_cost[i] / buys_qty[i]) if buys_qty[i] > 0 else 0.0
             cur_price = float(price_data.get(base.lower(), {}).get("price", 0.0))
             chg_24h = price_data.get(base.lower(), {}).get("change_24h")
             unrealized_value = remaining_qty * (cur_price - avg_buy)
@@ -65,6 +86,29 @@ class Portfolio:
                 "unrealized_value": unrealized_value,
                 "unrealized_pct": unrealized_pct,
                 "change_24h": chg_24h,
-                "exchange": a["exchange"]
+                "exchange": exchange[i]
             }
         return stats
+
+    def compute_stats_multi(self, price_provider, quotes=REPORT_QUOTES, default_quote="USD",
+                            base=VALUATION_BASE, rates=None):
+        """
+        Like compute_stats, but values each lot in its own quote and reports in several quotes at once.
+        price_provider must return prices in `base`; it is called exactly once. FX comes from the
+        cached exchange-rate table (pass `rates` to skip it entirely).
+        Returns { quote: { BASE: stat } }.
+        """
+        self._reload()
+        quotes = [q.upper() for q in quotes]
+        if not len(self.orders):
+            return {q: {} for q in quotes}
+        _, bases = self.orders.base_codes()
+        bases = {b for b in bases if b}
+        order_quotes = set(np.unique(self.orders.quotes(default_quote)).tolist())
+        # Stablecoin quotes ride along in the same coin fetch so their live peg is known.
+        symbols = sorted(b.lower() for b in bases | (order_quotes & set(STABLECOIN_PEGS)))
+        coin_prices = price_provider(symbols) if symbols else {}
+        if rates is None:
+            rates = fetch_exchange_rates()
+        matrix = cross_rate_matrix(order_quotes | set(quotes), rates, coin_prices, base=base)
+        return stats_by_quote(self.orders, coin_prices, matrix, quotes, base=base, default_quote=default_quote)
@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+from .config import REBALANCE_FEE_DEFAULT, REBALANCE_MIN_NOTIONAL_DEFAULT, REBALANCE_BAND_PCT_DEFAULT
+
+TRADE_COLUMNS = ["account", "asset", "exchange", "side", "qty", "price", "notional", "fee"]
+
+def positions_from_stats(stats: dict, account: str = "main") -> pd.DataFrame:
+    """
+    Portfolio.compute_stats output -> positions frame (account, asset, exchange, qty, price).
+    """
+    rows = [{
+        "account": account,
+        "asset": sym,
+        "exchange": s.get("exchange") or "",
+        "qty": s.get("remaining_qty", 0.0) or 0.0,
+        "price": s.get("current_price", 0.0) or 0.0,
+    } for sym, s in stats.items()]
+    return pd.DataFrame(rows, columns=["account", "asset", "exchange", "qty", "price"])
+
+def _target_weights(df: pd.DataFrame, targets) -> pd.Series:
+    """
+    targets is either {asset: pct} (same targets in every account) or
+    {account: {asset: pct}}. Assets without a target are held as-is (NaN).
+    """
+    if targets and all(isinstance(v, dict) for v in targets.values()):
+        keys = list(zip(df["account"], df["asset"]))
+        flat = {(acct, a): pct for acct, t in targets.items() for a, pct in t.items()}
+        return pd.Series([flat.get(k, np.nan) for k in keys], index=df.index, dtype=float) / 100.0
+    return df["asset"].map(targets or {}).astype(float) / 100.0
+
+def _round_lots(notional: np.ndarray, price: np.ndarray, step: np.ndarray, cap) -> np.ndarray:
+    """
+    Trade quantity for a notional, rounded down to the lot step and capped at `cap`.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        q = np.where(price > 0, notional / price, 0.0)
+    q = np.where(step > 0, np.floor(q / np.where(step > 0, step, 1.0)) * step, q)
+    return np.minimum(q, cap)
+
+def plan_rebalance(positions: pd.DataFrame, targets, cash=0.0, fees=None, min_notional=None,
+                   lot_size=None, band_pct: float = REBALANCE_BAND_PCT_DEFAULT,
+                   default_fee: float = REBALANCE_FEE_DEFAULT,
+                   default_min_notional: float = REBALANCE_MIN_NOTIONAL_DEFAULT) -> pd.DataFrame:
+    """
+    Solve for the trades that move every account to its target weights in one vectorized pass.
+
+    positions: frame with asset, qty, price and optionally account / exchange columns
+    targets:   {asset: pct} or {account: {asset: pct}}; pct of account equity (holdings + cash)
+    cash:      quote cash available, a float or {account: float}
+    fees:      {exchange: fee_rate} (taker fee as a fraction, e.g. 0.001)
+    min_notional: {exchange: smallest order value the venue accepts}
+    lot_size:  {asset: qty step}; quantities are rounded down to the step
+    band_pct:  drift tolerance in % of account equity; smaller drifts are left alone
+
+    Sells fund buys: buy orders are scaled down per account when cash plus the net proceeds
+    of the sells that are kept cannot cover them including fees. Trades that end up under
+    the venue's minimum notional after lot rounding are dropped.
+    Returns one row per trade with TRADE_COLUMNS.
+    """
+    if positions is None or positions.empty:
+        return pd.DataFrame(columns=TRADE_COLUMNS)
+    df = positions.copy()
+    if "account" not in df.columns:
+        df["account"] = "main"
+    if "exchange" not in df.columns:
+        df["exchange"] = ""
+    df["exchange"] = df["exchange"].fillna("").astype(str)
+    qty = pd.to_numeric(df["qty"], errors="coerce").fillna(0.0).to_numpy()
+    price = pd.to_numeric(df["price"], errors="coerce").fillna(0.0).to_numpy()
+    value = qty * price
+
+    cash_by_acct = cash if isinstance(cash, dict) else {a: float(cash) for a in df["account"].unique()}
+    acct_cash = df["account"].map(cash_by_acct).fillna(0.0).to_numpy()
+    # Cash is per account, not per row: count it once when summing equity.
+    equity = pd.Series(value, index=df.index).groupby(df["account"]).transform("sum").to_numpy() + acct_cash
+
+    weight = _target_weights(df, targets).to_numpy()
+    held = np.isnan(weight) | (price <= 0)
+    diff = np.where(held, 0.0, np.nan_to_num(weight) * equity - value)
+    diff[np.abs(diff) < band_pct / 100.0 * equity] = 0.0
+    diff = np.maximum(diff, -value)  # cannot sell more than we hold
+
+    fee = df["exchange"].map(fees or {}).fillna(default_fee).to_numpy(dtype=float)
+    floor = df["exchange"].map(min_notional or {}).fillna(default_min_notional).to_numpy(dtype=float)
+
+    step = df["asset"].map(lot_size or {}).fillna(0.0).to_numpy(dtype=float)
+    by_acct = df["account"]
+
+    # Sells first: round to lots and drop the ones under the venue floor, so only proceeds
+    # that will actually arrive can fund buys.
+    sell_qty = _round_lots(np.where(diff < 0, -diff, 0.0), price, step, qty)
+    sell_qty[sell_qty * price < floor] = 0.0
+    sell_notional = sell_qty * price
+
+    buy_notional = np.where(diff > 0, diff, 0.0)
+    proceeds = pd.Series(sell_notional * (1.0 - fee), index=df.index).groupby(by_acct).transform("sum").to_numpy()
+    buy_cost = pd.Series(buy_notional * (1.0 + fee), index=df.index).groupby(by_acct).transform("sum").to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scale = np.where(buy_cost > 0, np.minimum(1.0, (acct_cash + proceeds) / buy_cost), 1.0)
+    # Rounding down and dropping small buys only lowers their cost, so the funding still holds.
+    buy_qty = _round_lots(buy_notional * np.clip(scale, 0.0, 1.0), price, step, np.inf)
+    buy_qty[buy_qty * price < floor] = 0.0
+
+    trade_qty = np.where(diff < 0, sell_qty, buy_qty)
+    notional = trade_qty * price
+    keep = trade_qty > 0
+    out = pd.DataFrame({
+        "account": df["account"].to_numpy(),
+        "asset": df["asset"].to_numpy(),
+        "exchange": df["exchange"].to_numpy(),
+        "side": np.where(diff < 0, "sell", "buy"),
+        "qty": trade_qty,
+        "price": price,
+        "notional": notional,
+        "fee": notional * fee,
+    })[keep]
+    return out.sort_values(["account", "side", "notional"], ascending=[True, False, False]).reset_index(drop=True)
@@ -0,0 +1,158 @@
+import threading
+import numpy as np
+import pandas as pd
+from .config import RISK_WINDOW_DAYS
+from .metrics import PERIODS_PER_YEAR, TOTAL
+
+CONTRIBUTION_COLUMNS = ["weight", "volatility", "contribution", "contribution_pct"]
+
+def _sums(block: np.ndarray):
+    """
+    Pairwise-complete sums over a days x assets block of returns (NaN = no price that day):
+    counts[i, j]  days where both i and j have a return
+    cross[i, j]   sum of r_i over those days
+    prod[i, j]    sum of r_i * r_j over those days
+    sq[i, j]      sum of r_i ** 2 over those days
+    """
+    valid = np.isfinite(block).astype(float)
+    r = np.where(valid > 0, block, 0.0)
+    return valid.T @ valid, r.T @ valid, r.T @ r, (r * r).T @ valid
+
+class RiskModel:
+    """
+    Rolling covariance/correlation of daily returns over the last `window` days, kept as running
+    pairwise sums: appending days adds their sums and subtracts those of the days that fall out of
+    the window, so an update costs O(new days x assets^2) instead of a pass over the whole history.
+    The last row of a price frame is today's still-moving price: its return is held apart as
+    provisional and recomputed on every update, and only committed once a later day arrives.
+    """
+
+    def __init__(self, window: int = RISK_WINDOW_DAYS):
+        self.window = window
+        self.assets = []
+        self.dates = pd.DatetimeIndex([])  # committed days
+        self.returns = np.empty((0, 0))
+        self.sums = None  # (counts, cross, prod, sq) of the committed days, see _sums
+        self._last_close = None  # last committed price row, for the next day's return
+        self._live = None  # (date, 1 x assets returns) of the provisional last day
+        # risk_model_for shares one model between every session: updates and reads of the
+        # running sums are serialized, so two reruns can't add the same days twice.
+        self._lock = threading.RLock()
+
+    def _reset(self, assets):
+        k = len(assets)
+        self.assets = list(assets)
+        self.dates = pd.DatetimeIndex([])
+        self.returns = np.empty((0, k))
+        self.sums = tuple(np.zeros((k, k)) for _ in range(4))
+        self._last_close = None
+        self._live = None
+
+    def _returns(self, closes: np.ndarray) -> np.ndarray:
+        prev = np.vstack([self._last_close if self._last_close is not None else np.full(len(self.assets), np.nan),
+                          closes[:-1]])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(prev > 0, closes / prev - 1.0, np.nan)
+
+    def update(self, prices: pd.DataFrame) -> "RiskModel":
+        """
+        Fold in the closed days of a price_history_frame that are newer than the last one
+        committed, and re-read the provisional last day. A frame with different assets, or one
+        that no longer reaches back to the last committed day, rebuilds.
+        """
+        if prices is None or prices.empty:
+            return self
+        with self._lock:
+            self._update(prices.ffill())
+        return self
+
+    def _update(self, prices: pd.DataFrame):
+        last = self.dates[-1] if len(self.dates) else None
+        if list(prices.columns) != self.assets or (last is not None and last not in prices.index):
+            self._reset(prices.columns)
+            last = None
+        closed, today = prices.iloc[:-1], prices.iloc[-1:]
+        new = closed if last is None else closed.loc[closed.index > last]
+        if not new.empty:
+            closes = new.to_numpy(dtype=float)
+            rets = self._returns(closes)
+            self._last_close = closes[-1]
+            for a, b in zip(self.sums, _sums(rets)):
+                a += b
+            self.returns = np.vstack([self.returns, rets])
+            self.dates = self.dates.append(new.index)
+            # Keep room for the provisional day, so committed + live spans `window` days.
+            excess = len(self.returns) - (self.window - 1)
+            if excess > 0:
+                for a, b in zip(self.sums, _sums(self.returns[:excess])):
+                    a -= b
+                self.returns = self.returns[excess:]
+                self.dates = self.dates[excess:]
+        if last is not None and today.index[0] <= last:
+            self._live = None
+        else:
+            self._live = (today.index[0], self._returns(today.to_numpy(dtype=float)))
+
+    def _moments(self):
+        n, cross, prod, sq = self.sums
+        if self._live is not None:
+            n, cross, prod, sq = (a + b for a, b in zip(self.sums, _sums(self._live[1])))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            cov = (prod - cross * cross.T / n) / (n - 1)
+            var = (sq - cross * cross / n) / (n - 1)  # var of i over the days shared with j
+        ok = n >= 2
+        return np.where(ok, cov, np.nan), np.where(ok, var, np.nan)
+
+    def covariance(self) -> pd.DataFrame:
+        """
+        Daily return covariance (pairwise-complete); NaN for pairs with fewer than 2 shared days.
+        """
+        with self._lock:
+            return pd.DataFrame(self._moments()[0], index=self.assets, columns=self.assets)
+
+    def correlation(self) -> pd.DataFrame:
+        """
+        Pairwise-complete correlation of daily returns over the window.
+        """
+        with self._lock:
+            cov, var = self._moments()
+            assets = self.assets
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = np.clip(cov / np.sqrt(var * var.T), -1.0, 1.0)
+        return pd.DataFrame(corr, index=assets, columns=assets)
+
+    def contributions(self, weights: dict) -> pd.DataFrame:
+        """
+        Annualized volatility and each asset's share of portfolio volatility for value weights
+        ({ASSET: value}, normalized here): contribution_i = w_i (Σw)_i / σ_p, which sums to σ_p.
+        Returns DataFrame[CONTRIBUTION_COLUMNS] by asset plus a TOTAL row.
+        """
+        cov = self.covariance()
+        assets = list(cov.index)
+        w = np.array([max(float(weights.get(a, 0.0) or 0.0), 0.0) for a in assets])
+        if w.sum() > 0:
+            w = w / w.sum()
+        cov = np.nan_to_num(cov.to_numpy()) * PERIODS_PER_YEAR
+        marginal = cov @ w
+        port_vol = float(np.sqrt(max(w @ marginal, 0.0)))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            contrib = np.where(port_vol > 0, w * marginal / port_vol, 0.0)
+            pct = np.where(port_vol > 0, contrib / port_vol, 0.0)
+        frame = pd.DataFrame({"weight": w, "volatility": np.sqrt(np.clip(np.diag(cov), 0.0, None)),
+                              "contribution": contrib, "contribution_pct": pct}, index=assets)
+        frame.loc[TOTAL] = [w.sum(), port_vol, contrib.sum(), pct.sum()]
+        return frame[CONTRIBUTION_COLUMNS]
+
+_models = {}
+_lock = threading.Lock()  # guards _models itself; each model serializes its own updates
+
+def risk_model_for(key: str, prices: pd.DataFrame, window: int = RISK_WINDOW_DAYS) -> RiskModel:
+    """
+    Process-wide RiskModel per key (e.g. account), brought up to date with `prices`.
+    Safe to call from concurrent sessions: each key's update runs under that model's lock.
+    """
+    with _lock:
+        model = _models.get((key, window))
+        if model is None:
+            model = _models[(key, window)] = RiskModel(window)
+    return model.update(prices)
@@ -0,0 +1,138 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+from .config import APP_DIRNAME, SCREENER_DIRNAME, SCREENER_SIZE, SCREENER_TTL_SECONDS
+from .discovery import DiscoveryCache
+from .market_data import fetch_markets
+
+SCREENER_COLUMNS = ["rank", "symbol", "name", "price", "market_cap", "volume", "change_1h", "change_24h",
+                    "change_7d", "change_30d", "change_1y", "turnover", "volume_spike", "rsi", "sma_gap"]
+MOVER_WINDOWS = {"1h": "change_1h", "24h": "change_24h", "7d": "change_7d", "30d": "change_30d", "1y": "change_1y"}
+
+_API_FIELDS = {"rank": "market_cap_rank", "price": "current_price", "market_cap": "market_cap", "volume": "total_volume",
+               "change_1h": "price_change_percentage_1h_in_currency",
+               "change_24h": "price_change_percentage_24h_in_currency",
+               "change_7d": "price_change_percentage_7d_in_currency",
+               "change_30d": "price_change_percentage_30d_in_currency",
+               "change_1y": "price_change_percentage_1y_in_currency"}
+
+def _sparkline_matrix(rows) -> np.ndarray:
+    """
+    Coins x hours matrix of the 7-day sparklines, right-aligned (latest hour last), NaN-padded.
+    """
+    lines = [((r.get("sparkline_in_7d") or {}).get("price") or []) for r in rows]
+    width = max((len(l) for l in lines), default=0)
+    m = np.full((len(lines), width), np.nan)
+    for i, l in enumerate(lines):
+        if l:
+            m[i, width - len(l):] = np.asarray(l, dtype=float)
+    return m
+
+def rsi_matrix(prices: np.ndarray, period: int = 14) -> np.ndarray:
+    """
+    Wilder's RSI of every row's last value at once (NaN where a row has <= period prices).
+    Rows may start with NaN padding; each row's seed is its first `period` deltas.
+    """
+    n, width = prices.shape
+    out = np.full(n, np.nan)
+    if width <= period:
+        return out
+    d = np.diff(prices, axis=1)
+    gain, loss = np.maximum(d, 0.0), np.maximum(-d, 0.0)
+    first = np.argmax(np.isfinite(d), axis=1)  # first real delta per row
+    avg_g = np.full(n, np.nan)
+    avg_l = np.full(n, np.nan)
+    for t in range(d.shape[1]):
+        seed = t == first + period - 1
+        if seed.any():
+            avg_g[seed] = gain[seed, t - period + 1:t + 1].mean(axis=1)
+            avg_l[seed] = loss[seed, t - period + 1:t + 1].mean(axis=1)
+        late = t > first + period - 1
+        avg_g[late] = (avg_g[late] * (period - 1) + gain[late, t]) / period
+        avg_l[late] = (avg_l[late] * (period - 1) + loss[late, t]) / period
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = np.where(avg_l == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_g / avg_l))
+    return np.where(np.isfinite(avg_g), rsi, out)
+
+def market_frame(rows) -> pd.DataFrame:
+    """
+    fetch_markets rows -> DataFrame[SCREENER_COLUMNS] indexed by CoinGecko id, with derived columns:
+      turnover      24h volume / market cap
+      volume_spike  turnover relative to the median coin's (a cross-section, since the bulk
+                    endpoint has no volume history)
+      rsi           RSI(14) on the 7-day hourly sparkline
+      sma_gap       % distance of the price from the sparkline's 7-day mean
+    """
+    if not rows:
+        return pd.DataFrame(columns=SCREENER_COLUMNS)
+    cols = {k: pd.to_numeric(pd.Series([r.get(f) for r in rows]), errors="coerce").to_numpy(dtype=float)
+            for k, f in _API_FIELDS.items()}
+    with np.errstate(divide="ignore", invalid="ignore"):
+        turnover = np.where(cols["market_cap"] > 0, cols["volume"] / cols["market_cap"], np.nan)
+        spike = turnover / np.nanmedian(turnover) if np.isfinite(turnover).any() else turnover
+        spark = _sparkline_matrix(rows)
+        mean = np.nanmean(spark, axis=1) if spark.shape[1] else np.full(len(rows), np.nan)
+        sma_gap = (cols["price"] / mean - 1.0) * 100.0
+    frame = pd.DataFrame({
+        **cols, "symbol": [str(r.get("symbol") or "").upper() for r in rows], "name": [r.get("name") or "" for r in rows],
+        "turnover": turnover, "volume_spike": spike, "rsi": rsi_matrix(spark), "sma_gap": sma_gap,
+    }, index=pd.Index([r.get("id") for r in rows], name="id"))
+    return frame[SCREENER_COLUMNS]
+
+def screen(frame: pd.DataFrame, sort_by: str = "change_24h", descending: bool = True, text: str = "",
+           min_market_cap: float | None = None, min_volume: float | None = None, min_volume_spike: float | None = None,
+           rsi_below: float | None = None, rsi_above: float | None = None, limit: int | None = None) -> pd.DataFrame:
+    """
+    Filter and sort a market_frame with column masks; `text` matches symbol or name.
+    """
+    if sort_by not in SCREENER_COLUMNS:
+        raise ValueError(f"cannot sort the screener by {sort_by!r}")
+    mask = np.ones(len(frame), dtype=bool)
+    if text:
+        t = text.strip().lower()
+        mask &= frame["symbol"].str.lower().str.contains(t, regex=False).to_numpy() \
+            | frame["name"].str.lower().str.contains(t, regex=False).to_numpy()
+    for col, bound, above in (("market_cap", min_market_cap, True), ("volume", min_volume, True),
+                              ("volume_spike", min_volume_spike, True), ("rsi", rsi_above, True), ("rsi", rsi_below, False)):
+        if bound is not None:
+            v = frame[col].to_numpy()
+            mask &= (v >= bound) if above else (v <= bound)
+    out = frame[mask].sort_values(sort_by, ascending=not descending, na_position="last", kind="stable")
+    return out.head(limit) if limit else out
+
+def movers(frame: pd.DataFrame, window: str = "24h", n: int = 10, min_market_cap: float | None = None):
+    """
+    (gainers, losers): the n biggest moves either way over a MOVER_WINDOWS window.
+    """
+    col = MOVER_WINDOWS[window]
+    ranked = screen(frame, sort_by=col, min_market_cap=min_market_cap).dropna(subset=[col])
+    return ranked.head(n), ranked.tail(n).iloc[::-1]
+
+_cache = None
+_frames = {}  # (cache dir, quote) -> (file mtime, n, frame)
+
+def market_cache() -> DiscoveryCache:
+    global _cache
+    if _cache is None:
+        _cache = DiscoveryCache(os.path.join(os.path.expanduser("~"), APP_DIRNAME, SCREENER_DIRNAME),
+                                ttl=SCREENER_TTL_SECONDS, fetch=lambda quote, n: fetch_markets(quote, n))
+    return _cache
+
+def screener_frame(quote: str = "usd", n: int = SCREENER_SIZE, cache: DiscoveryCache | None = None) -> pd.DataFrame:
+    """
+    market_frame for the top n coins, served from the on-disk market cache. The built frame is
+    kept in-process until the cache file changes, so a rerun neither re-reads nor re-derives it;
+    once the file is older than the cache's ttl, a background refresh replaces it.
+    """
+    cache = cache or market_cache()
+    quote = quote.lower()
+    mtime = cache.mtime(quote)
+    hit = _frames.get((cache.path, quote))
+    if hit is not None and mtime is not None and hit[0] == mtime and hit[1] >= n:
+        if time.time() - mtime >= cache.ttl:
+            cache.refresh_async(quote, hit[1])
+        return hit[2] if hit[1] == n else hit[2].head(n)
+    frame = market_frame(cache.top(quote, n))
+    _frames[(cache.path, quote)] = (cache.mtime(quote), n, frame)
+    return frame
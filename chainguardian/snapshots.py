@@ -0,0 +1,294 @@
+import os
+import time
+from contextlib import contextmanager
+import numpy as np
+import pandas as pd
+from .config import APP_DIRNAME, SNAPSHOT_DIRNAME, SNAPSHOT_HEARTBEAT_SECONDS
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Fixed-width, append-only record: 21 bytes per (timestamp, chain, address, balance).
+SNAPSHOT_DTYPE = np.dtype([("ts", "<f8"), ("chain", "u1"), ("addr", "<u4"), ("balance", "<f8")], align=False)
+CHAIN_CODES = {"btc": 1, "eth": 2, "xrp": 3, "bnb": 4, "ada": 5}
+CHAIN_NAMES = {v: k for k, v in CHAIN_CODES.items()}
+
+def _default_dir():
+    return os.path.join(os.path.expanduser("~"), APP_DIRNAME, SNAPSHOT_DIRNAME)
+
+@contextmanager
+def _file_lock(path: str):
+    """
+    Exclusive lock on `path` (created if missing) for the duration of the block; it is taken
+    per open file, so it also serializes threads of one process.
+    """
+    with open(path, "a+b") as fh:
+        if fcntl is not None:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        else:
+            fh.seek(0)
+            msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+            else:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+
+class SnapshotStore:
+    """
+    Time series of whale balances kept as two append-only files:
+      snapshots.bin   packed SNAPSHOT_DTYPE records in time order, read back with np.fromfile
+      addresses.txt   one 'chain:address' per line; the line number is the record's addr id
+    Writers only ever append, so a reader (the UI) can open the files while a poller writes.
+    Several writers (the app and the whale daemon) may share a directory: append holds an
+    exclusive lock on store.lock and catches up on the other writers' addresses and records
+    before assigning ids, so an id always means the same address.
+    Unchanged balances are written at most once per SNAPSHOT_HEARTBEAT_SECONDS.
+    """
+
+    def __init__(self, path: str | None = None, heartbeat: float = SNAPSHOT_HEARTBEAT_SECONDS):
+        self.path = path or _default_dir()
+        self.heartbeat = heartbeat
+        self._keys = []      # addr id -> 'chain:address'
+        self._ids = {}       # 'chain:address' -> addr id
+        self._latest = None  # addr id -> (ts, balance), built lazily from the file
+        self._offset = 0     # records folded into _latest
+
+    @property
+    def _records_path(self):
+        return os.path.join(self.path, "snapshots.bin")
+
+    @property
+    def _addresses_path(self):
+        return os.path.join(self.path, "addresses.txt")
+
+    @property
+    def _lock_path(self):
+        return os.path.join(self.path, "store.lock")
+
+    def _load_addresses(self):
+        if not os.path.exists(self._addresses_path):
+            return
+        with open(self._addresses_path, "r", encoding="utf-8") as fh:
+            lines = fh.read().split("\n")[:-1]  # the last piece is empty or still being written
+        for key in lines[len(self._keys):]:
+            self._ids[key] = len(self._keys)
+            self._keys.append(key)
+
+    def _addr_id(self, chain: str, addr: str, new_keys: list) -> int:
+        key = f"{chain}:{addr}"
+        i = self._ids.get(key)
+        if i is None:
+            i = self._ids[key] = len(self._keys)
+            self._keys.append(key)
+            new_keys.append(key)
+        return i
+
+    def _usable(self) -> int:
+        """
+        Complete records in the file (a torn trailing record from a crashed writer is not one).
+        """
+        if not os.path.exists(self._records_path):
+            return 0
+        return os.path.getsize(self._records_path) // SNAPSHOT_DTYPE.itemsize
+
+    def _first_at(self, since: float, usable: int) -> int:
+        """
+        Position of the first record with ts >= since: records are appended in time order, so a
+        binary search over the memory-mapped file touches a few pages instead of reading it all.
+        """
+        ts = np.memmap(self._records_path, dtype=SNAPSHOT_DTYPE, mode="r", shape=(usable,))["ts"]
+        lo, hi = 0, usable
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if ts[mid] < since:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def records(self, since: float | None = None, addresses=None) -> np.ndarray:
+        """
+        All snapshot records as a structured array, optionally only ts >= since and only
+        the wallets in `addresses` ({(chain, address)}, e.g. one account's tracked wallets).
+        With `since`, only the part of the file from that time on is read.
+        """
+        usable = self._usable()
+        if not usable:
+            return np.zeros(0, dtype=SNAPSHOT_DTYPE)
+        start = self._first_at(since, usable) if since is not None else 0
+        recs = np.fromfile(self._records_path, dtype=SNAPSHOT_DTYPE, count=usable - start,
+                           offset=start * SNAPSHOT_DTYPE.itemsize)
+        if len(recs) and recs["addr"].max() >= len(self._keys):
+            self._load_addresses()
+        if addresses is not None:
+            ids = [self._ids[k] for k in (f"{c}:{a}" for c, a in addresses) if k in self._ids]
+            recs = recs[np.isin(recs["addr"], np.asarray(ids, dtype=SNAPSHOT_DTYPE["addr"]))]
+        return recs
+
+    def tail(self, offset: int = 0):
+        """
+        Records appended after the first `offset` ones, read from that file position only.
+        Returns (records, new_offset) so a caller can poll for new snapshots cheaply.
+        """
+        usable = self._usable()
+        if usable <= offset:
+            return np.zeros(0, dtype=SNAPSHOT_DTYPE), offset
+        recs = np.fromfile(self._records_path, dtype=SNAPSHOT_DTYPE, count=usable - offset,
+                           offset=offset * SNAPSHOT_DTYPE.itemsize)
+        if recs["addr"].max() >= len(self._keys):
+            self._load_addresses()
+        return recs, usable
+
+    def address(self, addr_id: int):
+        """
+        (chain, address) for a record's addr id.
+        """
+        chain, _, addr = self._keys[addr_id].partition(":")
+        return chain, addr
+
+    def latest(self) -> dict:
+        """
+        { (chain, address): (ts, balance) } for the most recent snapshot of every address.
+        """
+        self._ensure_latest()
+        self._sync()
+        out = {}
+        for i, (ts, bal) in self._latest.items():
+            chain, _, addr = self._keys[i].partition(":")
+            out[(chain, addr)] = (ts, bal)
+        return out
+
+    def _ensure_latest(self):
+        if self._latest is not None:
+            return
+        self._load_addresses()
+        self._latest = {}
+        self._offset = 0
+        self._sync()
+
+    def _sync(self):
+        """
+        Fold records appended since the last look (by any writer) into _latest.
+        """
+        recs, self._offset = self.tail(self._offset)
+        if len(recs):
+            order = np.lexsort((recs["ts"], recs["addr"]))
+            last = np.r_[recs["addr"][order][1:] != recs["addr"][order][:-1], True]
+            for r in recs[order][last]:
+                i, ts = int(r["addr"]), float(r["ts"])
+                prev = self._latest.get(i)
+                if prev is None or ts >= prev[0]:
+                    self._latest[i] = (ts, float(r["balance"]))
+
+    def append(self, balances: dict, ts: float | None = None) -> int:
+        """
+        Record one refresh: balances is { chain: { addr: balance } } as returned by
+        top_wallets.fetch_balances. Non-numeric entries (None, pending) are skipped, as are
+        balances identical to the last stored value younger than the heartbeat.
+        Returns the number of records written. Records stay in time order on disk (records()
+        relies on it): a ts older than the last record's is moved up to it.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        with _file_lock(self._lock_path):
+            ts = time.time() if ts is None else float(ts)
+            usable = self._usable()
+            if os.path.exists(self._records_path) and os.path.getsize(self._records_path) != usable * SNAPSHOT_DTYPE.itemsize:
+                # A writer died mid-record: drop the torn bytes so what follows stays aligned.
+                os.truncate(self._records_path, usable * SNAPSHOT_DTYPE.itemsize)
+            if usable:
+                last = np.fromfile(self._records_path, dtype=SNAPSHOT_DTYPE, count=1,
+                                   offset=(usable - 1) * SNAPSHOT_DTYPE.itemsize)
+                ts = max(ts, float(last["ts"][0]))
+            # Ids come from the file, not just this process: pick up other writers' lines first.
+            self._load_addresses()
+            self._ensure_latest()
+            self._sync()
+            new_keys, rows = [], []
+            for chain, bals in balances.items():
+                code = CHAIN_CODES.get(chain)
+                if code is None:
+                    continue
+                for addr, bal in bals.items():
+                    if not isinstance(bal, (int, float)) or isinstance(bal, bool):
+                        continue
+                    i = self._addr_id(chain, addr, new_keys)
+                    prev = self._latest.get(i)
+                    if prev and prev[1] == bal and ts - prev[0] < self.heartbeat:
+                        continue
+                    rows.append((ts, code, i, float(bal)))
+                    self._latest[i] = (ts, float(bal))
+            if not rows:
+                return 0
+            # Addresses first, so every record on disk refers to a known line.
+            if new_keys:
+                with open(self._addresses_path, "a", encoding="utf-8") as fh:
+                    fh.write("".join(k + "\n" for k in new_keys))
+            with open(self._records_path, "ab") as fh:
+                fh.write(np.array(rows, dtype=SNAPSHOT_DTYPE).tobytes())
+            self._offset += len(rows)
+        return len(rows)
+
+    def frame(self, since: float | None = None, addresses=None) -> pd.DataFrame:
+        recs = self.records(since, addresses)
+        keys = np.asarray(self._keys, dtype=object)
+        return pd.DataFrame({
+            "ts": pd.to_datetime(recs["ts"], unit="s", utc=True),
+            "chain": [CHAIN_NAMES.get(int(c), "?") for c in recs["chain"]],
+            "address": [k.partition(":")[2] for k in keys[recs["addr"]]] if len(recs) else [],
+            "balance": recs["balance"],
+        })
+
+    def deltas(self, since: float | None = None, addresses=None) -> pd.DataFrame:
+        """
+        Balance change between consecutive snapshots of the same address, computed in one
+        sort + diff over the record array. Columns: ts, chain, address, balance, delta.
+        The first snapshot of an address (in the window) has no delta and is dropped.
+        `addresses` limits it to those (chain, address) pairs, as in records.
+        """
+        recs = self.records(since, addresses)
+        if len(recs) < 2:
+            return pd.DataFrame(columns=["ts", "chain", "address", "balance", "delta"])
+        recs = recs[np.lexsort((recs["ts"], recs["addr"]))]
+        same = recs["addr"][1:] == recs["addr"][:-1]
+        cur = recs[1:][same]
+        delta = (recs["balance"][1:] - recs["balance"][:-1])[same]
+        keys = np.asarray(self._keys, dtype=object)[cur["addr"]] if len(cur) else np.array([], dtype=object)
+        return pd.DataFrame({
+            "ts": pd.to_datetime(cur["ts"], unit="s", utc=True),
+            "chain": [CHAIN_NAMES.get(int(c), "?") for c in cur["chain"]],
+            "address": [k.partition(":")[2] for k in keys],
+            "balance": cur["balance"],
+            "delta": delta,
+        })
+
+    def net_flows(self, since: float | None = None, addresses=None) -> pd.DataFrame:
+        """
+        Per-chain aggregate inflow, outflow and net flow (in native units) over the window.
+        """
+        d = self.deltas(since, addresses)
+        if d.empty:
+            return pd.DataFrame(columns=["inflow", "outflow", "net"])
+        return pd.DataFrame({
+            "inflow": d["delta"].clip(lower=0).groupby(d["chain"]).sum(),
+            "outflow": (-d["delta"].clip(upper=0)).groupby(d["chain"]).sum(),
+            "net": d["delta"].groupby(d["chain"]).sum(),
+        })
+
+    def top_movers(self, n: int = 10, since: float | None = None, addresses=None) -> pd.DataFrame:
+        """
+        Addresses with the largest absolute change at their most recent snapshot,
+        i.e. the biggest movers since the previous refresh that saw them.
+        """
+        d = self.deltas(since, addresses)
+        if d.empty:
+            return d
+        last = d.sort_values("ts").groupby(["chain", "address"], sort=False).tail(1)
+        last = last[last["delta"] != 0]
+        return last.reindex(last["delta"].abs().sort_values(ascending=False).index).head(n).reset_index(drop=True)
@@ -1,7 +1,8 @@
 import os
+import re
 import json
 from cryptography.fernet import Fernet
-from .config import APP_DIRNAME, KEY_FILENAME, STORE_FILENAME
+from .config import APP_DIRNAME, KEY_FILENAME, STORE_FILENAME, DEFAULT_PROFILE
 
 def _app_dir():
     return os.path.join(os.path.expanduser("~"), APP_DIRNAME)
@@ -9,8 +10,21 @@ def _app_dir():
 def _key_path():
     return os.path.join(_app_dir(), KEY_FILENAME)
 
-def _store_path():
-    return os.path.join(_app_dir(), STORE_FILENAME)
+def _store_path(profile: str | None = None):
+    if not profile or profile == DEFAULT_PROFILE:
+        return os.path.join(_app_dir(), STORE_FILENAME)
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", profile)
+    return os.path.join(_app_dir(), f"store-{safe}.enc")
+
+def list_profiles():
+    """
+    Profiles with a saved store; the default profile is the original store.enc.
+    """
+    d = _app_dir()
+    names = [DEFAULT_PROFILE] if os.path.exists(os.path.join(d, STORE_FILENAME)) else []
+    if os.path.isdir(d):
+        names += sorted(f[len("store-"):-len(".enc")] for f in os.listdir(d) if f.startswith("store-") and f.endswith(".enc"))
+    return names
 
 def _ensure_app_dir():
     d = _app_dir()
@@ -28,11 +42,11 @@ def _load_or_create_key():
         f.write(key)
     return key
 
-def load_store():
+def load_store(profile: str | None = None):
     _ensure_app_dir()
     key = _load_or_create_key()
     f = Fernet(key)
-    sp = _store_path()
+    sp = _store_path(profile)
     if not os.path.exists(sp):
         return {"settings": {}, "api_keys": {}, "orders": [], "tracked_addresses": {"btc": [], "eth": []}}
     with open(sp, "rb") as fh:
@@ -45,11 +59,11 @@ def load_store():
         # If corruption or key mismatch, do not crash; start fresh.
         return {"settings": {}, "api_keys": {}, "orders": [], "tracked_addresses": {"btc": [], "eth": []}}
 
-def save_store(store: dict):
+def save_store(store: dict, profile: str | None = None):
     _ensure_app_dir()
     key = _load_or_create_key()
     f = Fernet(key)
     raw = json.dumps(store, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
     enc = f.encrypt(raw)
-    with open(_store_path(), "wb") as fh:
+    with open(_store_path(profile), "wb") as fh:
         fh.write(enc)
@@ -0,0 +1,104 @@
+import itertools
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+from .backtest import backtest, SUMMARY_COLUMNS
+from .config import SWEEP_PROFIT_PCTS, SWEEP_FEAR_THRESHOLDS, SWEEP_WORKERS
+from .metrics import TOTAL
+
+PARAM_COLUMNS = ["profit_pct", "fear_threshold", "thresholds"]
+
+# Per-process inputs: set once by _attach in each pool worker (or directly for inline runs),
+# so tasks only carry their parameters.
+_inputs = {}
+
+def _attach(name: str, shape, dates, columns, has_fng: bool, fixed: dict):
+    """
+    Pool initializer: map the shared price block (dates x assets, plus a Fear & Greed column)
+    without copying it.
+    """
+    shm = shared_memory.SharedMemory(name=name)
+    block = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+    _inputs.update(shm=shm, prices=pd.DataFrame(block[:, :-1], index=dates, columns=columns, copy=False),
+                   fng=pd.Series(block[:, -1], index=dates, copy=False) if has_fng else None, fixed=fixed)
+
+def _run(tasks):
+    """
+    Backtest each (profit_pct, fear_threshold, custom_thresholds) task; returns their summaries.
+    """
+    prices, fng, fixed = _inputs["prices"], _inputs["fng"], _inputs["fixed"]
+    return [backtest(prices, fng, profit_pct=pct, fear_threshold=fear, custom_thresholds=custom, **fixed)["summary"]
+            for pct, fear, custom in tasks]
+
+def _chunks(tasks: list, n: int) -> list:
+    size = max(1, math.ceil(len(tasks) / n))
+    return [tasks[i:i + size] for i in range(0, len(tasks), size)]
+
+def _map(tasks: list, pool, workers: int) -> list:
+    if pool is None:
+        return _run(tasks)
+    # A few chunks per worker keeps the cores busy without paying a round trip per task.
+    return [s for chunk in pool.map(_run, _chunks(tasks, workers * 4)) for s in chunk]
+
+def sweep(prices: pd.DataFrame, fng: pd.Series | None = None, profit_pcts=SWEEP_PROFIT_PCTS,
+          fear_thresholds=SWEEP_FEAR_THRESHOLDS, rank_by: str = "return_pct", workers: int | None = SWEEP_WORKERS,
+          **fixed) -> dict:
+    """
+    Backtests every profit_pct x fear_threshold pair, plus, for each fear threshold, the
+    per-asset custom_thresholds that did best for each asset on its own (take-profits are
+    independent per asset, so one grid run scores every asset's threshold at once).
+    `fixed` is passed through to backtest (buy_amount, initial, fee_pct).
+
+    Work fans out over a process pool; the price matrix is copied once into shared memory and
+    mapped by each worker instead of being pickled per task. workers=1 runs inline.
+    Returns {'ranked': PARAM_COLUMNS + SUMMARY_COLUMNS for the portfolio, best rank_by first,
+             'per_asset': (profit_pct, fear_threshold, asset) -> SUMMARY_COLUMNS}.
+    """
+    if prices is None or prices.empty:
+        return {"ranked": pd.DataFrame(columns=PARAM_COLUMNS + SUMMARY_COLUMNS), "per_asset": pd.DataFrame(columns=SUMMARY_COLUMNS)}
+    if rank_by not in SUMMARY_COLUMNS:
+        raise ValueError(f"cannot rank sweeps by {rank_by!r}")
+    grid = [(float(p), f, None) for p, f in itertools.product(profit_pcts, fear_thresholds)]
+    workers = min(workers or os.cpu_count() or 1, len(grid))
+    has_fng = fng is not None and len(fng) > 0
+    shm = pool = None
+    try:
+        if workers > 1:
+            block = np.empty((len(prices), prices.shape[1] + 1))
+            block[:, :-1] = prices.to_numpy(dtype=float)
+            block[:, -1] = fng.reindex(prices.index).to_numpy(dtype=float) if has_fng else np.nan
+            shm = shared_memory.SharedMemory(create=True, size=block.nbytes)
+            np.ndarray(block.shape, dtype=block.dtype, buffer=shm.buf)[:] = block
+            pool = ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                       initargs=(shm.name, block.shape, prices.index, list(prices.columns), has_fng, fixed))
+        else:
+            _inputs.update(prices=prices, fng=fng if has_fng else None, fixed=fixed)
+
+        summaries = _map(grid, pool, workers)
+        per_asset = pd.concat(summaries, keys=[(p, f) for p, f, _ in grid], names=["profit_pct", "fear_threshold", "asset"])
+        assets = per_asset.drop(index=TOTAL, level="asset")
+        tuned = []
+        for f in fear_thresholds:
+            scores = assets.xs(f, level="fear_threshold")[rank_by].unstack("asset")
+            # Assets no threshold scored (never bought, or listed too late) keep the best uniform one.
+            totals = per_asset.xs((f, TOTAL), level=("fear_threshold", "asset"))[rank_by]
+            uniform = float(totals.idxmax()) if totals.notna().any() else float(profit_pcts[0])
+            tuned.append((None, f, {a: float(scores[a].idxmax()) if a in scores and scores[a].notna().any() else uniform
+                                    for a in prices.columns}))
+        summaries += _map(tuned, pool, workers)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+        _inputs.clear()
+
+    rows = [{"profit_pct": p, "fear_threshold": f, "thresholds": custom or {}, **s.loc[TOTAL].to_dict()}
+            for (p, f, custom), s in zip(grid + tuned, summaries)]
+    ranked = pd.DataFrame(rows, columns=PARAM_COLUMNS + SUMMARY_COLUMNS)
+    ranked = ranked.sort_values(list(dict.fromkeys([rank_by, "max_drawdown"])), ascending=False, kind="stable", na_position="last")
+    return {"ranked": ranked.reset_index(drop=True), "per_asset": per_asset}
@@ -0,0 +1,102 @@
+import math
+import numpy as np
+import pandas as pd
+from .config import PAGE_SIZE_DEFAULT
+from .orders import OrderTable, SIDE_CODES
+
+ORDER_SORT_KEYS = ("timestamp", "asset", "side", "amount", "price", "value", "exchange", "id")
+WALLET_COLUMNS = ["chain", "address", "label", "balance", "added_at", "last_seen"]
+
+def page_bounds(total: int, page: int, page_size: int = PAGE_SIZE_DEFAULT):
+    """
+    (start, stop, pages) for a 1-based page number, clamped to the available pages.
+    """
+    pages = max(1, math.ceil(total / page_size))
+    page = min(max(1, int(page)), pages)
+    start = (page - 1) * page_size
+    return start, min(start + page_size, total), pages
+
+def _matching_codes(table: OrderTable, text: str) -> np.ndarray:
+    """
+    Intern codes whose string contains text (case-insensitive). Scans the distinct strings
+    once, not the rows.
+    """
+    text = text.lower()
+    return np.array([c for c, s in enumerate(table.strings.strings) if s and text in s.lower()], dtype=np.uint32)
+
+def _string_rank(table: OrderTable, codes: np.ndarray) -> np.ndarray:
+    """
+    Sort key for interned string columns: each code's position in the sorted string table.
+    """
+    strings = table.strings.strings
+    rank = np.empty(len(strings), dtype=np.int64)
+    rank[np.argsort(np.array([s.lower() for s in strings], dtype=object), kind="stable")] = np.arange(len(strings))
+    return rank[codes]
+
+def order_page(table: OrderTable, page: int = 1, page_size: int = PAGE_SIZE_DEFAULT, sort_by: str = "timestamp",
+               descending: bool = True, base: str | None = None, side: str | None = None, text: str = ""):
+    """
+    One page of an OrderTable, filtered and sorted on the packed columns; only the rows on
+    the page are decoded into a DataFrame.
+      base   only orders for this base asset ('XRP')
+      side   'buy' or 'sell'
+      text   substring of asset, exchange, note or status
+    Returns (page_frame, matching_rows, pages).
+    """
+    d = table.data
+    mask = np.ones(len(d), dtype=bool)
+    if base:
+        code = table.strings.codes.get(base.upper())
+        mask &= (d["base"] == code) if code is not None else False
+    if side:
+        mask &= d["side"] == SIDE_CODES.get(side.lower(), 0)
+    if text:
+        codes = _matching_codes(table, text)
+        mask &= (np.isin(d["asset"], codes) | np.isin(d["exchange"], codes)
+                 | np.isin(d["note"], codes) | np.isin(d["status"], codes))
+    idx = np.flatnonzero(mask)
+    sel = d[idx]
+    if sort_by == "timestamp":
+        key = np.nan_to_num(sel["ts"], nan=-np.inf)
+    elif sort_by == "value":
+        key = sel["amount"] * sel["price"]
+    elif sort_by in ("amount", "price", "side", "id"):
+        key = sel[sort_by]
+    elif sort_by in ("asset", "exchange"):
+        key = _string_rank(table, sel[sort_by])
+    else:
+        raise ValueError(f"cannot sort orders by {sort_by!r}")
+    order = np.argsort(-key if descending else key, kind="stable")
+    start, stop, pages = page_bounds(len(idx), 1 if not len(idx) else page, page_size)
+    return table.take(idx[order[start:stop]]), len(idx), pages
+
+def wallet_page(tracked, balances: dict | None = None, chain: str | None = None, search: str = "",
+                page: int = 1, page_size: int = PAGE_SIZE_DEFAULT, sort_by: str = "balance", descending: bool = True):
+    """
+    One page of tracked wallets (a TrackedAddresses) as a DataFrame with WALLET_COLUMNS.
+    search is an address prefix looked up through each chain's AddressIndex; balance comes from
+    `balances` ({chain: {addr: balance}}), falling back to the index's last recorded balance.
+    Returns (page_frame, matching_rows, pages).
+    """
+    balances = balances or {}
+    rows = []
+    for c, idx in tracked:
+        if chain and c != chain:
+            continue
+        addrs = idx.search(search) if search.strip() else idx.addresses()
+        live = balances.get(c, {})
+        for a in addrs:
+            m = idx.entries[a]
+            bal = live.get(a)
+            if not isinstance(bal, (int, float)):
+                bal = m.get("last_balance")
+            rows.append((c, a, m.get("label") or "", bal, m.get("added_at"), m.get("last_seen")))
+    frame = pd.DataFrame(rows, columns=WALLET_COLUMNS)
+    if sort_by not in WALLET_COLUMNS:
+        raise ValueError(f"cannot sort wallets by {sort_by!r}")
+    frame = frame.sort_values(sort_by, ascending=not descending, na_position="last", kind="stable")
+    start, stop, pages = page_bounds(len(frame), page, page_size)
+    out = frame.iloc[start:stop].reset_index(drop=True)
+    for col in ("added_at", "last_seen"):
+        out[col] = pd.to_datetime(out[col], unit="s", utc=True, errors="coerce")
+    return out, len(frame), pages
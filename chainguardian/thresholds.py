@@ -1,4 +1,10 @@
 from typing import Tuple
+import numpy as np
+import pandas as pd
+from .config import PROFIT_PCT_DEFAULT, FEAR_BUY_THRESHOLD
+
+TAKE_PROFIT_COLUMNS = ["qty", "avg_buy", "current_price", "threshold", "gain_pct", "signal", "sell_qty",
+                       "proceeds", "principal", "profit", "keep_qty", "keep_value"]
 
 def profit_take_signal(stat: dict, profit_pct: float = 300.0) -> Tuple[bool, float]:
     """
@@ -20,12 +26,90 @@ def profit_take_signal(stat: dict, profit_pct: float = 300.0) -> Tuple[bool, flo
         return (True, qty_to_sell)
     return (False, 0.0)
 
-def fear_buy_signal(fng_value: str | int) -> bool:
+def profit_take_batch(qty, avg, cur, threshold) -> dict:
+    """
+    profit_take_signal over whole arrays at once (NaN/None treated as 0).
+    Returns a dict of arrays: gain_pct, signal, sell_qty, and the breakdown of the suggested
+    sale: proceeds (sell_qty * cur), principal (sell_qty * avg, the cost recovered),
+    profit (proceeds - principal), keep_qty and keep_value.
+    """
+    qty, avg, cur, threshold = (np.nan_to_num(np.asarray(x, dtype=float)) for x in (qty, avg, cur, threshold))
+    valid = (avg > 0) & (qty > 0) & (cur > 0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        gain_pct = np.where(valid, (cur - avg) / avg * 100.0, 0.0)
+        # Sell enough that the proceeds return the whole cost basis: qty * avg / cur.
+        sell_qty = np.where(valid, np.minimum(qty * avg / cur, qty), 0.0)
+    signal = valid & (gain_pct >= threshold)
+    sell_qty = np.where(signal, sell_qty, 0.0)
+    proceeds = sell_qty * cur
+    principal = sell_qty * avg
+    keep_qty = np.where(signal, qty - sell_qty, qty)
+    return {"gain_pct": gain_pct, "signal": signal, "sell_qty": sell_qty, "proceeds": proceeds,
+            "principal": principal, "profit": proceeds - principal, "keep_qty": keep_qty, "keep_value": keep_qty * cur}
+
+def profit_take_table(stats: dict, profit_pct: float = PROFIT_PCT_DEFAULT, custom_thresholds: dict | None = None) -> pd.DataFrame:
+    """
+    Take-profit evaluation for every asset in a compute_stats result, in one vectorized pass.
+    custom_thresholds ({asset: pct}) overrides profit_pct per asset.
+    Returns a DataFrame indexed by asset with TAKE_PROFIT_COLUMNS.
+    """
+    if not stats:
+        return pd.DataFrame(columns=TAKE_PROFIT_COLUMNS)
+    return profit_take_accounts({None: stats}, profit_pct, {None: custom_thresholds or {}}).droplevel(0)
+
+def profit_take_accounts(stats_by_account: dict, profit_pct: float = PROFIT_PCT_DEFAULT,
+                         thresholds_by_account: dict | None = None) -> pd.DataFrame:
     """
-    Simple heuristic: buy when FNG <= 25 (Extreme Fear).
+    profit_take_table for several accounts ({account: stats}) with a single batch evaluation.
+    Returns a DataFrame indexed by (account, asset).
+    """
+    thresholds_by_account = thresholds_by_account or {}
+    keys, cols = [], {"qty": [], "avg_buy": [], "current_price": [], "threshold": []}
+    for account, stats in stats_by_account.items():
+        custom = thresholds_by_account.get(account) or {}
+        for sym, s in stats.items():
+            keys.append((account, sym))
+            cols["qty"].append(s.get("remaining_qty") or 0.0)
+            cols["avg_buy"].append(s.get("avg_buy") or 0.0)
+            cols["current_price"].append(s.get("current_price") or 0.0)
+            cols["threshold"].append(custom.get(sym, profit_pct))
+    out = profit_take_batch(cols["qty"], cols["avg_buy"], cols["current_price"], cols["threshold"])
+    frame = pd.DataFrame({**{k: np.asarray(v, dtype=float) for k, v in cols.items()}, **out},
+                         index=pd.MultiIndex.from_tuples(keys, names=["account", "asset"]) if keys else None)
+    return frame[TAKE_PROFIT_COLUMNS]
+
+def fear_buy_signal(fng_value: str | int, threshold: int = FEAR_BUY_THRESHOLD) -> bool:
+    """
+    Simple heuristic: buy when FNG <= threshold (default 25, Extreme Fear).
     """
     try:
         v = int(fng_value)
-        return v <= 25
+        return v <= threshold
     except Exception:
         return False
+
+def whale_flow_signal(anomalies) -> dict:
+    """
+    Per-chain lean from detected whale-flow anomalies (see anomalies.detect_anomalies).
+    Unusual exchange deposits count as bearish (coins moving to be sold), unusual exchange
+    withdrawals and chain-wide accumulation surges as bullish, chain-wide outflow surges as bearish.
+    A chain surge in the same refresh as an exchange row is that same flow seen in aggregate,
+    so it is not counted again.
+    Returns: { 'btc': 'bearish' | 'bullish' | 'mixed', ... } for chains with anomalies.
+    """
+    exchange_rows = {(row.chain, row.ts) for row in anomalies.itertuples(index=False)
+                     if row.kind in ("exchange_inflow", "exchange_outflow")}
+    votes = {}
+    for row in anomalies.itertuples(index=False):
+        if row.kind == "exchange_inflow":
+            v = -1
+        elif row.kind == "exchange_outflow":
+            v = 1
+        elif row.kind == "chain_surge":
+            if (row.chain, row.ts) in exchange_rows:
+                continue
+            v = 1 if row.delta > 0 else -1
+        else:
+            continue
+        votes[row.chain] = votes.get(row.chain, 0) + v
+    return {c: ("bullish" if v > 0 else "bearish" if v < 0 else "mixed") for c, v in votes.items()}
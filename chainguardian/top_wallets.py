@@ -1,60 +1,296 @@
+import threading
+import time
 import requests
-from typing import List
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List
+from .config import PROVIDER_CONCURRENCY, WHALE_FETCH_DEADLINE, WHALE_LATE_RESULT_MAX_AGE
+
+ETHERSCAN_API = "https://api.etherscan.io/api"
+BLOCKCHAIR_API = "https://api.blockchair.com"
+
+# Largest address batch each provider accepts per request.
+ETHERSCAN_BATCH = 20    # account/balancemulti
+BLOCKCHAIR_BATCH = 100  # {chain}/dashboards/addresses/a,b,c (bitcoin-like chains only)
+
+# chain -> (blockchair slug, unit decimals, supports multi-address dashboards)
+BLOCKCHAIR_CHAINS = {
+    "btc": ("bitcoin", 8, True),
+    "eth": ("ethereum", 18, False),
+    "xrp": ("ripple", 6, False),
+    "bnb": ("bnb", 8, False),
+    "ada": ("cardano", 6, False),
+}
+
+# Chains where one cheap /stats call (latest block height) can stand in for a balance poll:
+# no new block since the last poll means no tracked balance can have changed.
+HEIGHT_PROBE_CHAINS = ("btc",)
+
+def _chunks(seq, n):
+    for i in range(0, len(seq), n):
+        yield seq[i:i + n]
+
+def _etherscan_balances(addrs: List[str], api_key: str) -> Dict[str, float | None]:
+    """
+    ETH balances (in ETH) for many addresses, ETHERSCAN_BATCH per request.
+    Addresses missing from a response (or in a failed batch) map to None.
+    """
+    out = {a: None for a in addrs}
+    for batch in _chunks(list(addrs), ETHERSCAN_BATCH):
+        try:
+            r = requests.get(
+                ETHERSCAN_API,
+                params={"module":"account","action":"balancemulti","address":",".join(batch),"tag":"latest","apikey":api_key},
+                timeout=10
+            )
+            r.raise_for_status()
+            data = r.json()
+            if data.get("status") == "1":
+                # Etherscan echoes addresses lowercased; map back to what the caller passed in.
+                by_lower = {a.lower(): a for a in batch}
+                for item in data.get("result", []):
+                    addr = by_lower.get(str(item.get("account", "")).lower())
+                    if addr is not None:
+                        out[addr] = int(item.get("balance", "0")) / 1e18
+        except Exception:
+            pass
+    return out
 
 def _etherscan_balance(addr: str, api_key: str) -> float | None:
     """
     Returns ETH balance (in ETH) for an address using Etherscan, or None on error.
     """
+    return _etherscan_balances([addr], api_key)[addr]
+
+def _blockchair_parse(chain: str, addr: str, info: dict) -> float | None:
+    """
+    Pulls the raw balance out of one address entry of a Blockchair response, in whole coins.
+    """
+    _, decimals, _ = BLOCKCHAIR_CHAINS[chain]
+    if chain == "xrp":
+        raw = info.get("account", {}).get("account_data", {}).get("Balance")
+    elif chain == "ada":
+        raw = info.get("address", {}).get("caddr_balance", {}).get("getCoin")
+    elif chain == "bnb":
+        bals = info.get("account", {}).get("balances", [])
+        raw = next((b.get("free") for b in bals if b.get("symbol") == "BNB"), None)
+        return float(raw) if raw is not None else None
+    else:
+        raw = info.get("address", {}).get("balance")
+    if raw is None:
+        return None
+    return int(raw) / 10 ** decimals
+
+def _blockchair_url(chain: str, addrs: List[str]) -> str:
+    slug, _, multi = BLOCKCHAIR_CHAINS[chain]
+    if multi:
+        return f"{BLOCKCHAIR_API}/{slug}/dashboards/addresses/{','.join(addrs)}"
+    if chain in ("xrp", "bnb"):
+        return f"{BLOCKCHAIR_API}/{slug}/raw/account/{addrs[0]}"
+    if chain == "ada":
+        return f"{BLOCKCHAIR_API}/{slug}/raw/address/{addrs[0]}"
+    return f"{BLOCKCHAIR_API}/{slug}/dashboards/address/{addrs[0]}"
+
+def _blockchair_balances(chain: str, addrs: List[str]) -> Dict[str, float | None]:
+    """
+    Balances (in whole coins) via Blockchair (no key required for basic lookups).
+    Bitcoin-like chains go BLOCKCHAIR_BATCH addresses per request through the multi-address
+    dashboard and are split back out per address; other chains fall back to one call each.
+    """
+    _, _, multi = BLOCKCHAIR_CHAINS[chain]
+    out = {a: None for a in addrs}
+    for batch in _chunks(list(addrs), BLOCKCHAIR_BATCH if multi else 1):
+        try:
+            r = requests.get(_blockchair_url(chain, batch), timeout=10)
+            r.raise_for_status()
+            data = r.json().get("data", {}) or {}
+            if multi:
+                per_addr = data.get("addresses", {}) or {}
+                for addr in batch:
+                    if addr in per_addr:
+                        out[addr] = int(per_addr[addr].get("balance", 0)) / 1e8
+            else:
+                out[batch[0]] = _blockchair_parse(chain, batch[0], data.get(batch[0], {}))
+        except Exception:
+            pass
+    return out
+
+def chain_height(chain: str) -> int | None:
+    """
+    Latest block height for a chain via Blockchair /stats, or None on error.
+    """
+    slug, _, _ = BLOCKCHAIR_CHAINS[chain]
     try:
-        r = requests.get(
-            "https://api.etherscan.io/api",
-            params={"module":"account","action":"balance","address":addr,"tag":"latest","apikey":api_key},
-            timeout=10
-        )
+        r = requests.get(f"{BLOCKCHAIR_API}/{slug}/stats", timeout=10)
         r.raise_for_status()
-        data = r.json()
-        if data.get("status") == "1":
-            wei = int(data.get("result", "0"))
-            return wei / 1e18
+        data = r.json().get("data", {}) or {}
+        height = data.get("best_block_height", data.get("blocks"))
+        return int(height) if height is not None else None
     except Exception:
-        pass
-    return None
+        return None
+
+def batch_size(chain: str, api_keys: dict | None = None) -> int:
+    """
+    Addresses per balance request for a chain with the provider get_balances will use.
+    """
+    if chain == "eth" and (api_keys or {}).get("etherscan"):
+        return ETHERSCAN_BATCH
+    return BLOCKCHAIR_BATCH if BLOCKCHAIR_CHAINS[chain][2] else 1
+
+def get_balances(chain: str, addrs: List[str], api_keys: dict | None = None) -> Dict[str, float | None]:
+    """
+    Balances for one chain's addresses, using the provider with the biggest batches available:
+    Etherscan balancemulti for ETH when a key is set, Blockchair otherwise.
+    """
+    addrs = list(dict.fromkeys(addrs))
+    if not addrs or chain not in BLOCKCHAIR_CHAINS:
+        return {a: None for a in addrs}
+    etherscan_key = (api_keys or {}).get("etherscan")
+    if chain == "eth" and etherscan_key:
+        return _etherscan_balances(addrs, etherscan_key)
+    return _blockchair_balances(chain, addrs)
+
+# Marker for addresses whose lookup had not answered when the deadline passed.
+PENDING = "pending"
+
+_pools = {}
+_pool_lock = threading.Lock()
+# (source, chain, addr) -> Future of the batch it was sent in, until a fetch collects its answer.
+# A batch still running at one fetch's deadline is picked up by the next instead of being resent.
+# source is (provider, API key), so one profile's key never answers for another's lookups.
+_in_flight = {}
+
+def _executor(provider: str) -> ThreadPoolExecutor:
+    """
+    One pool per provider, sized to PROVIDER_CONCURRENCY[provider]: the pool is the limit, so a
+    busy provider queues its own batches without holding workers another provider could use.
+    """
+    with _pool_lock:
+        pool = _pools.get(provider)
+        if pool is None:
+            pool = _pools[provider] = ThreadPoolExecutor(max_workers=PROVIDER_CONCURRENCY[provider],
+                                                         thread_name_prefix=f"cg-{provider}")
+    return pool
+
+def _provider(chain: str, api_keys: dict | None) -> str:
+    return "etherscan" if chain == "eth" and (api_keys or {}).get("etherscan") else "blockchair"
+
+def _source(provider: str, api_keys: dict | None) -> tuple:
+    return provider, (api_keys or {}).get(provider)
+
+def _fetch_batch(chain: str, batch: List[str], api_keys: dict | None):
+    return time.time(), get_balances(chain, batch, api_keys)
+
+def _fresh(future, now: float) -> bool:
+    """
+    An in-flight batch is worth waiting on again unless it finished too long ago to trust.
+    """
+    if not future.done():
+        return True
+    if future.cancelled() or future.exception() is not None:
+        return False
+    return now - future.result()[0] <= WHALE_LATE_RESULT_MAX_AGE
+
+def fetch_balances(tracked: dict, api_keys: dict | None = None, deadline: float = WHALE_FETCH_DEADLINE,
+                   chains=None) -> Dict[str, Dict[str, float | None | str]]:
+    """
+    Concurrently fetch balances for every tracked chain and return whatever answered in time.
+    Work is split into provider-sized batches (one request each) and run on each provider's own
+    thread pool, so at most PROVIDER_CONCURRENCY[provider] requests are in flight per provider.
+    Batches that miss the deadline keep running; their answers are returned by the next call
+    that asks for those addresses (within WHALE_LATE_RESULT_MAX_AGE) rather than refetched.
+    Returns { chain: { addr: balance | None | PENDING } }: None means the provider failed,
+    PENDING means the request had not finished by `deadline` seconds.
+    """
+    chains = [c for c in (chains or tracked.keys()) if c in BLOCKCHAIR_CHAINS]
+    out = {c: {a: PENDING for a in dict.fromkeys(tracked.get(c, []))} for c in chains}
+    now = time.time()
+    sources = {c: _source(_provider(c, api_keys), api_keys) for c in chains}
+    futures = {}  # future -> chain
+    with _pool_lock:
+        # Finished answers nobody can use any more: too old, or for wallets this source's caller
+        # no longer tracks (removed, or the profile switched).
+        for key, f in list(_in_flight.items()):
+            source, chain, a = key
+            if f.done() and (not _fresh(f, now) or (sources.get(chain) == source and a not in out[chain])):
+                del _in_flight[key]
+        known = dict(_in_flight)
+    for chain in chains:
+        source = sources[chain]
+        fresh = []
+        for a in out[chain]:
+            f = known.get((source, chain, a))
+            if f is not None and _fresh(f, now):
+                futures[f] = chain
+            else:
+                fresh.append(a)
+        pool = _executor(source[0])
+        for batch in _chunks(fresh, batch_size(chain, api_keys)):
+            f = pool.submit(_fetch_batch, chain, batch, api_keys)
+            futures[f] = chain
+            with _pool_lock:
+                _in_flight.update(((source, chain, a), f) for a in batch)
+    done, _ = wait(futures, timeout=deadline)
+    with _pool_lock:
+        for f in done:
+            chain = futures[f]
+            try:
+                _, result = f.result()
+            except Exception:
+                result = {}
+            for a in out[chain]:
+                if a in result:
+                    out[chain][a] = result[a]
+                    if _in_flight.get((sources[chain], chain, a)) is f:
+                        del _in_flight[(sources[chain], chain, a)]
+    return out
 
 def _blockchair_balance_btc(addr: str) -> float | None:
     """
     Returns BTC balance (in BTC) via Blockchair (no key required for basic lookups).
     """
-    try:
-        r = requests.get(f"https://api.blockchair.com/bitcoin/dashboards/address/{addr}", timeout=10)
-        r.raise_for_status()
-        data = r.json()
-        info = data.get("data", {}).get(addr, {}).get("address", {})
-        sat = int(info.get("balance", 0))
-        return sat / 1e8
-    except Exception:
-        pass
-    return None
+    return _blockchair_balances("btc", [addr])[addr]
 
-def get_whale_activity(store: dict) -> List[str]:
+def _blockchair_balance_eth(addr: str) -> float | None:
+    return _blockchair_balances("eth", [addr])[addr]
+
+def _blockchair_balance_xrp(addr: str) -> float | None:
+    return _blockchair_balances("xrp", [addr])[addr]
+
+def _blockchair_balance_bnb(addr: str) -> float | None:
+    return _blockchair_balances("bnb", [addr])[addr]
+
+def _blockchair_balance_ada(addr: str) -> float | None:
+    return _blockchair_balances("ada", [addr])[addr]
+
+def get_whale_activity(store: dict, balances: dict | None = None, deadline: float = WHALE_FETCH_DEADLINE) -> List[str]:
     """
     Produces lines describing balances for tracked BTC/ETH addresses.
-    Uses Etherscan if api_keys['etherscan'] present; Blockchair for BTC.
+    ETH goes through Etherscan if api_keys['etherscan'] is present, Blockchair otherwise; BTC through Blockchair.
+    Pass `balances` from fetch_balances to reuse a fetch; otherwise one is made with `deadline`,
+    and addresses that have not answered by then are listed as pending.
     """
     lines = []
     tracked = store.get("tracked_addresses", {})
     api_keys = store.get("api_keys", {})
     etherscan_key = api_keys.get("etherscan")
 
+    if balances is None:
+        balances = fetch_balances(tracked, api_keys, deadline=deadline, chains=["btc", "eth"])
+
     for addr in tracked.get("eth", []):
-        bal = _etherscan_balance(addr, etherscan_key) if etherscan_key else None
-        if bal is None:
-            lines.append(f"ETH {addr[:8]}…: balance unavailable (add Etherscan key)")
+        bal = balances.get("eth", {}).get(addr)
+        if bal == PENDING:
+            lines.append(f"ETH {addr[:8]}…: balance pending")
+        elif bal is None:
+            lines.append(f"ETH {addr[:8]}…: balance unavailable" + ("" if etherscan_key else " (add Etherscan key)"))
         else:
             lines.append(f"ETH {addr[:8]}…: {bal:.4f} ETH")
 
     for addr in tracked.get("btc", []):
-        bal = _blockchair_balance_btc(addr)
-        if bal is None:
+        bal = balances.get("btc", {}).get(addr)
+        if bal == PENDING:
+            lines.append(f"BTC {addr[:8]}…: balance pending")
+        elif bal is None:
             lines.append(f"BTC {addr[:8]}…: balance unavailable")
         else:
             lines.append(f"BTC {addr[:8]}…: {bal:.6f} BTC")
@@ -0,0 +1,179 @@
+import time
+import requests
+import numpy as np
+import pandas as pd
+from .config import DEFAULT_QUOTE, FX_CACHE_SECONDS
+
+# Stablecoins are valued at their peg unless the coin fetch returned a live price for them.
+STABLECOIN_PEGS = {
+    "USDT": "USD", "USDC": "USD", "BUSD": "USD", "DAI": "USD", "TUSD": "USD", "FDUSD": "USD",
+    "EURT": "EUR", "EURC": "EUR",
+}
+
+_fx_cache = {"fetched_at": 0.0, "rates": {}}
+
+def fetch_exchange_rates(max_age: float = FX_CACHE_SECONDS) -> dict:
+    """
+    BTC-denominated exchange rates via CoinGecko, cached in-process for max_age seconds.
+    Returns: { 'usd': 65000.0, 'eur': 60000.0, 'btc': 1.0, ... } (units of currency per 1 BTC)
+    On error the last good rates are returned (empty dict if there never were any).
+    """
+    now = time.time()
+    if _fx_cache["rates"] and now - _fx_cache["fetched_at"] < max_age:
+        return _fx_cache["rates"]
+    try:
+        r = requests.get("https://api.coingecko.com/api/v3/exchange_rates", timeout=10)
+        r.raise_for_status()
+        data = r.json().get("rates", {})
+        rates = {code.lower(): float(info["value"]) for code, info in data.items() if info.get("value")}
+        if rates:
+            _fx_cache["fetched_at"] = now
+            _fx_cache["rates"] = rates
+    except Exception:
+        pass
+    return _fx_cache["rates"]
+
+def split_pair(asset: str, default_quote: str = DEFAULT_QUOTE):
+    """
+    'XRP/USDT' -> ('XRP', 'USDT'); 'BTC' -> ('BTC', default_quote).
+    """
+    asset = str(asset or "").upper().strip()
+    if "/" in asset:
+        base, quote = asset.split("/", 1)
+    else:
+        base, quote = asset, ""
+    base = base.split()[0] if base.split() else ""
+    quote = quote.split()[0] if quote.split() else default_quote.upper()
+    return base, quote
+
+def _unit_values(currencies, rates: dict, coin_prices: dict, base: str) -> pd.Series:
+    """
+    Value of one unit of each currency expressed in `base` (NaN when unknown).
+    Fiat/crypto codes come from the exchange-rate table; stablecoins and other quotes
+    fall back to the coin fetch, then to the stablecoin peg.
+    """
+    base = base.upper()
+    base_rate = rates.get(base.lower())
+    out = {}
+    for c in currencies:
+        c = c.upper()
+        live = (coin_prices.get(c.lower()) or {}).get("price") or 0.0
+        if c == base:
+            out[c] = 1.0
+        elif c in STABLECOIN_PEGS:
+            if live > 0:
+                out[c] = float(live)
+            else:
+                peg = STABLECOIN_PEGS[c]
+                out[c] = 1.0 if peg == base else (base_rate / rates[peg.lower()] if base_rate and rates.get(peg.lower()) else np.nan)
+        elif base_rate and rates.get(c.lower()):
+            out[c] = base_rate / rates[c.lower()]
+        elif live > 0:
+            out[c] = float(live)
+        else:
+            out[c] = np.nan
+    return pd.Series(out, dtype=float)
+
+def cross_rate_matrix(currencies, rates: dict, coin_prices: dict | None = None, base: str = "USD") -> pd.DataFrame:
+    """
+    Square cross-rate matrix: m.loc[a, b] = units of b per 1 unit of a.
+    Built from one exchange-rate table plus the coin prices already fetched in `base`,
+    so adding a reporting quote never costs another upstream call.
+    """
+    vals = _unit_values(sorted({c.upper() for c in currencies} | {base.upper()}), rates, coin_prices or {}, base)
+    m = np.outer(vals.to_numpy(), 1.0 / vals.to_numpy())
+    return pd.DataFrame(m, index=vals.index, columns=vals.index)
+
+def _orders_frame(orders, default_quote: str) -> pd.DataFrame:
+    if hasattr(orders, "lots_frame"):  # OrderTable: decode columns in bulk
+        return orders.lots_frame(default_quote)
+    df = pd.DataFrame(orders)
+    if df.empty or "asset" not in df.columns:
+        return pd.DataFrame(columns=["base", "quote", "side", "amount", "price", "exchange"])
+    pairs = [split_pair(a, default_quote) for a in df["asset"]]
+    out = pd.DataFrame({
+        "base": [p[0] for p in pairs],
+        "quote": [p[1] for p in pairs],
+        "side": df["side"].astype(str).str.lower() if "side" in df.columns else "",
+        "amount": pd.to_numeric(df["amount"], errors="coerce").fillna(0.0) if "amount" in df.columns else 0.0,
+        "price": pd.to_numeric(df["price"], errors="coerce").fillna(0.0) if "price" in df.columns else 0.0,
+        "exchange": df["exchange"] if "exchange" in df.columns else None,
+    })
+    return out[out["base"] != ""]
+
+def value_lots(orders, coin_prices: dict, matrix: pd.DataFrame, base: str = "USD",
+               default_quote: str = DEFAULT_QUOTE) -> pd.DataFrame:
+    """
+    Per-order valuation in each lot's own quote (an XRP/USDT buy stays in USDT, BTC/EUR in EUR).
+    Columns: base, quote, side, amount, price, cost, cur_price, cur_value, unrealized, cost_in_base.
+    FX is applied at today's cross rate; historical FX is not tracked. A lot whose quote has no
+    known rate is unpriced: its cur_price, cur_value, unrealized and cost_in_base are NaN.
+    """
+    lots = _orders_frame(orders, default_quote)
+    if lots.empty:
+        return lots
+    base = base.upper()
+    to_base = lots["quote"].map(matrix[base]).astype(float)
+    price_base = lots["base"].map(lambda b: (coin_prices.get(b.lower()) or {}).get("price") or 0.0).astype(float)
+    lots["cost"] = lots["amount"] * lots["price"]
+    lots["cur_price"] = price_base / to_base
+    lots["cur_value"] = lots["amount"] * lots["cur_price"]
+    lots["unrealized"] = np.where(lots["side"] == "buy", lots["cur_value"] - lots["cost"], 0.0)
+    lots["unrealized"] = lots["unrealized"].where(to_base.notna())
+    lots["cost_in_base"] = lots["cost"] * to_base
+    return lots
+
+def stats_by_quote(orders, coin_prices: dict, matrix: pd.DataFrame, quotes, base: str = "USD",
+                   default_quote: str = DEFAULT_QUOTE) -> dict:
+    """
+    Returns { quote: { BASE: stat } } where each stat has the same keys as
+    Portfolio.compute_stats plus 'quote'. Every quote is derived from the same
+    base-currency prices through the cross-rate matrix.
+    Buys in a quote with no known FX rate still count towards remaining_qty, but not towards
+    avg_buy; an asset bought only through such lots, or a reporting quote with no rate, is
+    reported with NaN prices and P/L rather than zeros.
+    """
+    lots = value_lots(orders, coin_prices, matrix, base=base, default_quote=default_quote)
+    quotes = [q.upper() for q in quotes]
+    if lots.empty:
+        return {q: {} for q in quotes}
+
+    is_buy = lots["side"] == "buy"
+    is_sell = lots["side"] == "sell"
+    priced_buy = is_buy & lots["cost_in_base"].notna()
+    grouped = pd.DataFrame({
+        "base": lots["base"],
+        "buys_qty": lots["amount"].where(is_buy, 0.0),
+        "priced_qty": lots["amount"].where(priced_buy, 0.0),
+        "buys_cost": lots["cost_in_base"].where(priced_buy, 0.0),
+        "sells_qty": lots["amount"].where(is_sell, 0.0),
+        "exchange": lots["exchange"].where(lots["exchange"].notna() & (lots["exchange"] != "")),
+    }).groupby("base", sort=False).agg({"buys_qty": "sum", "priced_qty": "sum", "buys_cost": "sum",
+                                        "sells_qty": "sum", "exchange": "first"})
+
+    remaining = (grouped["buys_qty"] - grouped["sells_qty"]).clip(lower=0.0)
+    # No buys at all averages to 0 as in compute_stats; buys that are all unpriced are unknown.
+    avg_base = (grouped["buys_cost"] / grouped["priced_qty"]).where(grouped["priced_qty"] > 0,
+                                                                     np.where(grouped["buys_qty"] > 0, np.nan, 0.0))
+    cur_base = pd.Series({b: float((coin_prices.get(b.lower()) or {}).get("price") or 0.0) for b in grouped.index})
+    pct = ((cur_base - avg_base) / avg_base * 100.0).where(avg_base > 0, np.where(avg_base.isna(), np.nan, 0.0))
+
+    out = {}
+    for q in quotes:
+        rate = float(matrix.loc[base.upper(), q]) if q in matrix.columns else np.nan
+        avg_q = avg_base * rate
+        cur_q = cur_base * rate
+        out[q] = {
+            b: {
+                "remaining_qty": float(remaining[b]),
+                "avg_buy": float(avg_q[b]),
+                "current_price": float(cur_q[b]),
+                "unrealized_value": float(remaining[b] * (cur_q[b] - avg_q[b])),
+                "unrealized_pct": float(pct[b]),
+                "change_24h": (coin_prices.get(b.lower()) or {}).get("change_24h"),
+                "exchange": grouped.at[b, "exchange"] if pd.notna(grouped.at[b, "exchange"]) else None,
+                "quote": q,
+            }
+            for b in grouped.index
+        }
+    return out
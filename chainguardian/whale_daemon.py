@@ -0,0 +1,205 @@
+"""
+Headless whale watcher: polls tracked wallet balances around the clock and appends them to
+the snapshot store, so the Streamlit and Tk apps only read local files. It also evaluates each
+account's alert rules every tick and hands what fires to the profile's alert sinks, so alerts
+are delivered whether or not a browser has the dashboard open.
+
+    python -m chainguardian.whale_daemon                  # all profiles, forever
+    python -m chainguardian.whale_daemon --profile alice --once
+"""
+import argparse
+import json
+import os
+import signal
+import time
+from .alerts import engine_for, alert_inputs
+from .config import DAEMON_TICK_SECONDS, DAEMON_STALE_SECONDS, WHALE_FETCH_DEADLINE, DEFAULT_QUOTE, DEFAULT_PROFILE, VALUATION_BASE
+from .dispatch import dispatcher_for, flush_dispatchers
+from .indicators import indicators_for
+from .market_data import prices_coingecko, historical_prices_coingecko
+from .metrics import price_history_frame, cached_performance_metrics
+from .polling import PollScheduler, poll_balances, price_scheduler_for, scheduled_prices
+from .portfolio import Portfolio
+from .snapshots import SnapshotStore
+from .storage import load_store, list_profiles
+from .top_wallets import PENDING
+
+STATUS_FILENAME = "daemon.json"
+
+def collect_tracked(store: dict) -> dict:
+    """
+    Tracked addresses of a store's accounts (and the pre-accounts top level), grouped by the
+    API keys each of them is configured with, so every wallet is polled with its owner's keys.
+    Returns { keys: ({chain: [addr, ...]}, api_keys) }, where keys is a hashable form of api_keys.
+    """
+    sources = [store] + list((store.get("accounts") or {}).values())
+    groups = {}
+    for src in sources:
+        api_keys = {name: value for name, value in (src.get("api_keys") or {}).items() if value}
+        tracked, _ = groups.setdefault(tuple(sorted(api_keys.items())), ({}, api_keys))
+        for chain, addrs in (src.get("tracked_addresses") or {}).items():
+            tracked.setdefault(chain, {}).update(dict.fromkeys(addrs or []))
+    return {k: ({c: list(a) for c, a in t.items() if a}, keys) for k, (t, keys) in groups.items()
+            if any(t.values())}
+
+def _status_path(snapshots: SnapshotStore) -> str:
+    return os.path.join(snapshots.path, STATUS_FILENAME)
+
+def write_status(snapshots: SnapshotStore, **fields):
+    os.makedirs(snapshots.path, exist_ok=True)
+    tmp = _status_path(snapshots) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(fields, fh)
+    os.replace(tmp, _status_path(snapshots))
+
+def read_status(snapshots: SnapshotStore | None = None) -> dict:
+    snapshots = snapshots or SnapshotStore()
+    try:
+        with open(_status_path(snapshots), "r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+def daemon_alive(snapshots: SnapshotStore | None = None, max_age: float = DAEMON_STALE_SECONDS,
+                 profile: str | None = None) -> bool:
+    """
+    True if a daemon has polled recently and, for a given profile, that profile is among the
+    ones it watches (a daemon started with --profile only polls and alerts for those).
+    """
+    status = read_status(snapshots)
+    if not status or time.time() - status.get("last_poll", 0) >= max_age:
+        return False
+    return profile is None or (profile or DEFAULT_PROFILE) in status.get("profiles", [])
+
+def daemon_balances(tracked: dict, snapshots: SnapshotStore | None = None,
+                    max_age: float = DAEMON_STALE_SECONDS, profile: str = DEFAULT_PROFILE) -> dict | None:
+    """
+    Balances for `tracked` ({chain: [addr]}) read from the daemon's snapshots, in the
+    fetch_balances shape (PENDING for wallets it has not reached yet).
+    Returns None when no daemon is polling `profile`, so the caller can fall back to fetching.
+    """
+    snapshots = snapshots or SnapshotStore()
+    if not daemon_alive(snapshots, max_age, profile):
+        return None
+    latest = snapshots.latest()
+    return {chain: {a: latest.get((chain, a), (None, PENDING))[1] for a in dict.fromkeys(addrs)}
+            for chain, addrs in tracked.items()}
+
+def run_once(schedulers: dict, snapshots: SnapshotStore, profiles=None,
+             deadline: float = WHALE_FETCH_DEADLINE) -> int:
+    """
+    One tick: reload the stores (addresses may have been added in a UI), poll whatever is due,
+    append the answers to the snapshot store. Returns the number of snapshot records written.
+    Each profile's wallets are polled with that profile's (or account's) own API keys, under a
+    PollScheduler of their own kept in `schedulers` ({(profile, keys): PollScheduler}).
+    """
+    written = 0
+    for profile in profiles or list_profiles():
+        for keys, (tracked, api_keys) in collect_tracked(load_store(profile)).items():
+            scheduler = schedulers.get((profile, keys))
+            if scheduler is None:
+                scheduler = schedulers[(profile, keys)] = PollScheduler()
+                scheduler.seed(snapshots.latest())
+            _, fetched = poll_balances(scheduler, tracked, api_keys, deadline=deadline)
+            written += snapshots.append(fetched)
+    return written
+
+def _change_pct(hist) -> float | None:
+    if hist and len(hist) >= 2 and hist[0][1] > 0:
+        return (hist[-1][1] - hist[0][1]) / hist[0][1] * 100
+    return None
+
+def account_alert_inputs(profile: str, account: str, account_data: dict, default_quote: str,
+                         snapshots: SnapshotStore, now: float | None = None) -> dict:
+    """
+    The alert engine's inputs for one account, built the way the dashboard builds them:
+    prices through the account's price scheduler, % changes and RSI from the cached daily
+    history, 24h whale flows from the snapshot store, drawdown from the performance metrics.
+    """
+    now = time.time() if now is None else now
+    scheduler = price_scheduler_for(f"{profile}:{account}:{VALUATION_BASE}")
+    provider = lambda syms: scheduled_prices(scheduler, lambda due: prices_coingecko(due, quote=VALUATION_BASE), syms)
+    quote = default_quote.lower()
+    stats = Portfolio(account_data).compute_stats_multi(provider, quotes=[default_quote],
+                                                        default_quote=default_quote)[default_quote]
+    rsi = {}
+    for sym in stats:
+        for days in (7, 30, 365):
+            stats[sym][f"change_{days}d"] = _change_pct(historical_prices_coingecko(sym, days=days, quote=quote))
+        hist = historical_prices_coingecko(sym, days=100, quote=quote)
+        if hist and len(hist) > 50:
+            rsi[sym] = indicators_for(sym, default_quote, hist)["rsi"]
+    tracked = frozenset((c, a) for c, addrs in (account_data.get("tracked_addresses") or {}).items() for a in addrs)
+    flows = snapshots.net_flows(since=now - 86400, addresses=tracked)
+    prices = price_history_frame({sym: historical_prices_coingecko(sym, days=365, quote=quote) for sym in stats})
+    perf = cached_performance_metrics(f"{profile}:{account}", account_data.get("orders", []), prices, default_quote=default_quote)
+    return alert_inputs(stats, rsi, flows, perf)
+
+def run_alerts(snapshots: SnapshotStore, profiles=None, now: float | None = None) -> int:
+    """
+    Evaluate every account's alert rules and submit what fires to its profile's alert sinks.
+    Profiles without sinks are skipped (nothing to deliver to). Engines are kept per
+    profile/account across ticks, so alerts stay edge-triggered. Returns the number submitted.
+    """
+    submitted = 0
+    for profile in profiles or list_profiles():
+        store = load_store(profile)
+        settings = store.get("settings") or {}
+        sinks = settings.get("alert_sinks") or []
+        if not sinks:
+            continue
+        dispatcher = dispatcher_for(profile, sinks)
+        default_quote = settings.get("default_quote") or DEFAULT_QUOTE
+        for account, account_data in (store.get("accounts") or {}).items():
+            rules = account_data.get("alert_rules") or []
+            if not rules:
+                continue
+            inputs = account_alert_inputs(profile, account, account_data, default_quote, snapshots, now)
+            for event in engine_for(f"{profile}:{account}", rules).update(inputs, now):
+                dispatcher.submit(event)
+                submitted += 1
+    return submitted
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Poll tracked whale balances into the local snapshot store.")
+    parser.add_argument("--profile", action="append", help="profile to watch (repeatable; default: every profile)")
+    parser.add_argument("--tick", type=float, default=DAEMON_TICK_SECONDS, help="seconds between scheduler ticks")
+    parser.add_argument("--snapshots", help="snapshot directory (default: ~/.chainguardian/snapshots)")
+    parser.add_argument("--once", action="store_true", help="run a single tick and exit")
+    args = parser.parse_args(argv)
+
+    snapshots = SnapshotStore(args.snapshots)
+    schedulers = {}
+    stopping = []
+    signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+    started = time.time()
+    try:
+        while True:
+            t0 = time.time()
+            profiles = args.profile or list_profiles()
+            try:
+                written = run_once(schedulers, snapshots, profiles)
+                error = None
+            except Exception as e:
+                written, error = 0, str(e)
+            try:
+                alerted = run_alerts(snapshots, profiles)
+            except Exception as e:
+                alerted, error = 0, error or str(e)
+            wallets = len({key for sched in schedulers.values() for key in sched.state})
+            write_status(snapshots, pid=os.getpid(), started_at=started, last_poll=time.time(), tick=args.tick, profiles=profiles,
+                         addresses=wallets, written=written, alerts=alerted, error=error)
+            print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {wallets} wallets, {written} new snapshots, "
+                  f"{alerted} alerts" + (f", error: {error}" if error else ""), flush=True)
+            if args.once:
+                flush_dispatchers(timeout=30.0)
+                return 0
+            while not stopping and time.time() - t0 < args.tick:
+                time.sleep(min(1.0, args.tick))
+            if stopping:
+                return 0
+    except KeyboardInterrupt:
+        return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
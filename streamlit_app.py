@@ -1,15 +1,36 @@
 import streamlit as st
 import pandas as pd
 import json
+import time
+import os
 from datetime import timedelta
 import plotly.express as px
 from chainguardian.storage import load_store, save_store
 from chainguardian.portfolio import Portfolio
-from chainguardian.market_data import prices_coingecko, fetch_fear_greed, historical_prices_coingecko, calculate_rsi, calculate_macd, calculate_sma, calculate_ema
-from chainguardian.thresholds import profit_take_signal, fear_buy_signal
-from chainguardian.top_wallets import get_whale_activity, get_top_btc_addresses, get_top_eth_addresses, get_top_xrp_addresses, get_top_bnb_addresses, get_top_ada_addresses, _blockchair_balance_btc, _blockchair_balance_eth, _blockchair_balance_xrp, _blockchair_balance_bnb, _blockchair_balance_ada
-from chainguardian.graphs import fig_distribution_pie, fig_unrealized_bar
-from chainguardian.config import DEFAULT_QUOTE, PROFIT_PCT_DEFAULT
+from chainguardian.market_data import prices_coingecko, fetch_fear_greed, fear_greed_history, historical_prices_coingecko
+from chainguardian.thresholds import profit_take_table, fear_buy_signal, whale_flow_signal
+from chainguardian.top_wallets import get_whale_activity, PENDING
+from chainguardian.discovery import get_top_btc_addresses, get_top_eth_addresses, get_top_xrp_addresses, get_top_bnb_addresses, get_top_ada_addresses, discovery_cache
+from chainguardian.snapshots import SnapshotStore
+from chainguardian.polling import scheduler_for, poll_balances, price_scheduler_for, scheduled_prices, realized_volatility
+from chainguardian.whale_daemon import daemon_alive, daemon_balances, read_status as whale_daemon_status
+from chainguardian.leaderboard import leaderboard_for
+from chainguardian.anomalies import detect_anomalies
+from chainguardian.addresses import tracked_for
+from chainguardian.tables import order_page, wallet_page, ORDER_SORT_KEYS
+from chainguardian.alerts import engine_for, alert_inputs, trigger_levels, describe_rule, RULE_KINDS, CHANGE_WINDOWS
+from chainguardian.dispatch import dispatcher_for
+from chainguardian.backtest import backtest
+from chainguardian.indicators import indicators_for
+from chainguardian.risk import risk_model_for
+from chainguardian.candles import candle_store
+from chainguardian.screener import screener_frame, screen, movers, MOVER_WINDOWS, SCREENER_COLUMNS
+from chainguardian.sweep import sweep
+from chainguardian.graphs import fig_distribution_pie, fig_unrealized_bar, fig_correlation_heatmap, fig_candles
+from chainguardian.rebalance import plan_rebalance, positions_from_stats
+from chainguardian.valuation import split_pair
+from chainguardian.metrics import price_history_frame, cached_performance_metrics, TOTAL as PERF_TOTAL
+from chainguardian.config import DEFAULT_QUOTE, PROFIT_PCT_DEFAULT, PROFIT_PCT_MIN, PROFIT_PCT_MAX, VALUATION_BASE, REPORT_QUOTES, REBALANCE_FEE_DEFAULT, REBALANCE_MIN_NOTIONAL_DEFAULT, REBALANCE_BAND_PCT_DEFAULT, FEAR_BUY_THRESHOLD, BACKTEST_BUY_AMOUNT, BACKTEST_FEE_PCT, SWEEP_PROFIT_PCTS, SWEEP_FEAR_THRESHOLDS, SCREENER_SIZE, RISK_WINDOW_DAYS, CANDLE_RESOLUTIONS, WHALE_FETCH_DEADLINE, LEADERBOARD_SIZE, WHALE_ZSCORE_THRESHOLD, WHALE_ZSCORE_WINDOW, PAGE_SIZE_DEFAULT
 from chainguardian.rtc import now_str
 
 st.set_page_config(page_title="Chain Guardian", layout="wide")
@@ -99,11 +120,12 @@ with st.sidebar.expander("⚙️ Settings", expanded=False):
         "Default quote (e.g., USD)",
         value=store.get("settings", {}).get("default_quote", DEFAULT_QUOTE)
     ).upper()
+    # Stored values are clamped so an out-of-range setting can't make the input raise on load.
     profit_pct = st.number_input(
         "Profit % threshold",
-        min_value=10.0,
-        max_value=1000.0,
-        value=float(store.get("settings", {}).get("profit_pct_to_take", PROFIT_PCT_DEFAULT)),
+        min_value=PROFIT_PCT_MIN,
+        max_value=PROFIT_PCT_MAX,
+        value=min(max(float(store.get("settings", {}).get("profit_pct_to_take", PROFIT_PCT_DEFAULT)), PROFIT_PCT_MIN), PROFIT_PCT_MAX),
         help="Trigger a profit-take suggestion"
     )
 
@@ -114,7 +136,8 @@ with st.sidebar.expander("⚙️ Settings", expanded=False):
     for asset in assets_list:
         key = f"thresh_{asset}"
         current = custom_thresholds.get(asset, profit_pct)
-        new_val = st.number_input(f"{asset} threshold %", min_value=10.0, max_value=1000.0, value=float(current), key=key)
+        new_val = st.number_input(f"{asset} threshold %", min_value=PROFIT_PCT_MIN, max_value=PROFIT_PCT_MAX,
+                                  value=min(max(float(current), PROFIT_PCT_MIN), PROFIT_PCT_MAX), key=key)
         if new_val != current:
             custom_thresholds[asset] = new_val
             updated = True
@@ -130,6 +153,20 @@ with st.sidebar.expander("⚙️ Settings", expanded=False):
 # Sidebar: Manage addresses
 # Moved to Status tab
 
+def track_addresses(chain, addrs, label=""):
+    """
+    Add addresses to the account's normalized per-chain index and persist it.
+    Returns (added, invalid) as AddressIndex.extend does.
+    """
+    tracked = tracked_for(f"{profile}:{account}", account_data)
+    added, invalid = tracked.add(chain, addrs, label=label)
+    if added:
+        tracked.save_to(account_data)
+        accounts[account] = account_data
+        store["accounts"] = accounts
+        save_store(store, profile)
+    return added, invalid
+
 st.title("🛡️ Chain Guardian - Crypto Portfolio Tracker")
 st.caption(f"Refreshed at {now_str()}")
 
@@ -147,10 +184,38 @@ df = portfolio.df
 bases = list({ (a.split("/")[0].split()[0].upper() if "/" in a else a.split()[0].upper()) for a in df["asset"].astype(str).unique() }) if not df.empty else []
 bases_lower = [b.lower() for b in bases]
 
-price_provider = lambda syms: prices_coingecko(syms, quote=default_quote)
-stats = portfolio.compute_stats(price_provider, default_quote=default_quote)
+# Prices are fetched once in the valuation base; every reporting quote is a cross-rate away,
+# so switching the default quote doesn't refetch anything. Each asset has its own refresh
+# interval (volatility and nearness to a trigger); a rerun fetches only the due ones, in one call.
+# Every fetched price is also folded into the local OHLC candles.
+price_scheduler = price_scheduler_for(f"{profile}:{account}:{VALUATION_BASE}", default=refresh_seconds)
+candles = candle_store()
+price_provider = lambda syms: scheduled_prices(
+    price_scheduler, lambda due: candles.record(prices_coingecko(due, quote=VALUATION_BASE)), syms)
+report_quotes = list(dict.fromkeys([default_quote, *REPORT_QUOTES]))
+stats_by_quote = portfolio.compute_stats_multi(price_provider, quotes=report_quotes, default_quote=default_quote)
+stats = stats_by_quote[default_quote]
 fear_greed = fetch_fear_greed()
-whale_lines = get_whale_activity(account_data)
+# Whale balances come from the snapshot store when the whale daemon is running (a local read).
+# Without it, the page polls itself: one bounded, concurrent fetch of the wallets the scheduler
+# says are due, shared by the Whale Watch and Status tabs; anything slower than the deadline
+# shows as pending instead of blocking the page.
+snapshot_store = SnapshotStore()
+# The snapshot directory holds every profile's and account's wallets; views only show this account's.
+tracked_keys = frozenset((c, a) for c, addrs in (account_data.get("tracked_addresses", {}) or {}).items() for a in addrs)
+whale_balances = daemon_balances(account_data.get("tracked_addresses", {}), snapshot_store, profile=profile)
+if whale_balances is None:
+    poll_scheduler = scheduler_for(f"{profile}:{account}", latest=snapshot_store.latest())
+    whale_balances, whale_fetched = poll_balances(poll_scheduler, account_data.get("tracked_addresses", {}),
+                                                  account_data.get("api_keys"), deadline=WHALE_FETCH_DEADLINE)
+    snapshot_store.append(whale_fetched)
+# Built once per account and reused across reruns; the lists' shape changing (an add or remove) rebuilds it.
+tracked_wallets = tracked_for(f"{profile}:{account}", account_data)
+tracked_wallets.record_balances(whale_balances)
+whale_lines = get_whale_activity(account_data, balances=whale_balances)
+whale_anomalies = detect_anomalies(snapshot_store, since=time.time() - 86400,
+                                   exchanges=tracked_wallets.labelled("exchange"),
+                                   addresses=tracked_keys)
 
 # Add 7-day change for each asset
 for sym in stats:
@@ -167,9 +232,11 @@ for sym in stats:
         stats[sym]['change_7d'] = None
 
 # Add longer term changes
+asset_vols = {}
 for sym in stats:
     # 30d
     hist = historical_prices_coingecko(sym, days=30, quote=default_quote.lower())
+    asset_vols[sym] = realized_volatility(hist)
     if hist and len(hist) >= 2:
         start_price = hist[0][1]
         end_price = hist[-1][1]
@@ -205,13 +272,27 @@ for sym in stats:
     else:
         stats[sym]['change_365d'] = None
 
+# Take-profit evaluation for every asset, computed once and shared by the Portfolio and Signals tabs.
+take_profit = profit_take_table(stats, profit_pct, custom_thresholds)
+
+# Feed the price scheduler for the next rerun: history only seeds assets without a volatility
+# estimate yet. Trigger levels are in the default quote; scale them into the valuation base the
+# scheduler's prices are in. The scheduler is this account's, so its levels are the only ones.
+price_scheduler.set_volatility(asset_vols)
+price_scheduler.set_triggers({
+    sym: [l * price_scheduler.prices([sym])[sym.lower()]["price"] / stats[sym]["current_price"] for l in lv]
+    for sym, lv in trigger_levels(take_profit, account_data.get("alert_rules", [])).items()
+    if sym in stats and stats[sym].get("current_price")
+})
+
 # --- Dashboard tab ---
 with tab_dashboard:
     st.header("📊 Portfolio Dashboard")
     
     # Summary metrics
-    total_value = sum((s['remaining_qty'] or 0.0) * (s['current_price'] or 0.0) for s in stats.values())
-    total_unreal = sum((s['unrealized_value'] or 0.0) for s in stats.values())
+    # Unpriced assets (no FX rate for their lots' quote) are NaN and left out of the totals.
+    total_value = pd.Series([(s['remaining_qty'] or 0.0) * (s['current_price'] or 0.0) for s in stats.values()], dtype=float).sum()
+    total_unreal = pd.Series([(s['unrealized_value'] or 0.0) for s in stats.values()], dtype=float).sum()
     total_unreal_pct = (total_unreal / total_value * 100.0) if total_value else 0.0
     
     col1, col2, col3, col4 = st.columns(4)
@@ -226,6 +307,10 @@ with tab_dashboard:
         fg_class = fear_greed.get('classification', '—')
         st.metric("Fear & Greed Index", f"{fg_value} ({fg_class})" if fg_value is not None else "—")
     
+    totals_by_quote = {q: pd.Series([(s['remaining_qty'] or 0.0) * (s['current_price'] or 0.0) for s in qs.values()], dtype=float).sum()
+                       for q, qs in stats_by_quote.items()}
+    st.caption("Total value: " + " · ".join(f"{v:,.{8 if q == 'BTC' else 2}f} {q}" for q, v in totals_by_quote.items()))
+
     st.divider()
     
     # Top holdings
@@ -243,9 +328,9 @@ with tab_dashboard:
     
     # Recent activity
     st.subheader("📈 Recent Orders")
-    orders_df = pd.DataFrame(account_data.get("orders", []))
-    if not orders_df.empty:
-        recent_orders = orders_df.tail(5).sort_values("timestamp", ascending=False)
+    n_orders = len(portfolio.orders)
+    if n_orders:
+        recent_orders = portfolio.orders.take(range(max(0, n_orders - 5), n_orders)).sort_values("timestamp", ascending=False)
         for _, row in recent_orders.iterrows():
             st.write(f"• {row['side'].upper()} {row['amount']} {row['asset']} @ ${row['price']} ({row['exchange']})")
     else:
@@ -266,14 +351,9 @@ with tab_portfolio:
         chg_str = f"{chg:.2f}%" if isinstance(chg, (int,float)) else "—"
         chg_7d = s.get("change_7d")
         chg_7d_str = f"{chg_7d:.2f}%" if isinstance(chg_7d, (int,float)) else "—"
-        signal, qty_to_sell = profit_take_signal(s, profit_pct=custom_thresholds.get(sym, profit_pct))
-        if signal:
-            proceeds = qty_to_sell * cur
-            original_for_sold = qty_to_sell * avg
-            profit_from_sold = proceeds - original_for_sold
-            remaining_qty = qty - qty_to_sell
-            remaining_value = remaining_qty * cur
-            note = f"Sell {qty_to_sell:.6f} for ${proceeds:.2f} (recover ${original_for_sold:.2f} + ${profit_from_sold:.2f} profit), keep {remaining_qty:.6f} worth ${remaining_value:.2f}"
+        tp = take_profit.loc[sym]
+        if tp["signal"]:
+            note = f"Sell {tp['sell_qty']:.6f} for ${tp['proceeds']:.2f} (recover ${tp['principal']:.2f} + ${tp['profit']:.2f} profit), keep {tp['keep_qty']:.6f} worth ${tp['keep_value']:.2f}"
         else:
             note = ""
         table_rows.append({
@@ -293,7 +373,18 @@ with tab_portfolio:
     st.subheader("📈 Asset Price Charts")
     asset_options = list(stats.keys())
     selected_asset = st.selectbox("Select asset for price chart", asset_options, key="asset_chart")
-    if selected_asset:
+    chart_source = st.radio("Range", ["30 days", *(f"Local {r} candles" for r in CANDLE_RESOLUTIONS)],
+                            horizontal=True, key="asset_chart_source")
+    if selected_asset and chart_source != "30 days":
+        # Built from the prices this app has fetched itself (in VALUATION_BASE): no upstream call.
+        res = chart_source.split()[1]
+        bars = candles.candles(selected_asset, res)
+        if bars.empty:
+            st.info("No local candles yet; they fill in as prices are refreshed.")
+        else:
+            st.plotly_chart(fig_candles(bars.tail(300), title=f"{selected_asset.upper()}/{VALUATION_BASE} ({res})"),
+                            use_container_width=True)
+    elif selected_asset:
         hist = historical_prices_coingecko(selected_asset, days=30, quote=default_quote.lower())
         if hist:
             df_hist = pd.DataFrame(hist, columns=["timestamp", "price"])
@@ -303,11 +394,48 @@ with tab_portfolio:
         else:
             st.info("No historical data available for this asset")
 
+    st.divider()
+    st.subheader("📐 Performance")
+    perf_prices = price_history_frame({sym: historical_prices_coingecko(sym, days=365, quote=default_quote.lower()) for sym in stats})
+    perf = cached_performance_metrics(account, account_data.get("orders", []), perf_prices, default_quote=default_quote)
+    if perf.empty:
+        st.info("Not enough price history for performance metrics.")
+    else:
+        st.dataframe(perf.style.format({
+            "twr": "{:.2%}", "xirr": "{:.2%}", "max_drawdown": "{:.2%}", "drawdown": "{:.2%}",
+            "volatility": "{:.2%}", "sharpe": "{:.2f}", "sortino": "{:.2f}"
+        }, na_rep="—"), use_container_width=True)
+        with st.expander("All accounts"):
+            all_syms = {split_pair(o.get("asset", ""), default_quote)[0] for acct in accounts.values() for o in acct.get("orders", [])} - {""}
+            all_prices = price_history_frame({sym: historical_prices_coingecko(sym, days=365, quote=default_quote.lower()) for sym in all_syms})
+            acct_rows = {}
+            for acct_name, acct in accounts.items():
+                acct_perf = cached_performance_metrics(acct_name, acct.get("orders", []), all_prices, default_quote=default_quote)
+                if not acct_perf.empty:
+                    acct_rows[acct_name] = acct_perf.loc[PERF_TOTAL]
+            st.dataframe(pd.DataFrame(acct_rows).T, use_container_width=True)
+
+    st.divider()
+    st.subheader("🔗 Correlation & Risk")
+    if perf_prices.shape[1] < 2:
+        st.info("Hold at least two assets with price history to see correlations.")
+    else:
+        # Rolling sums per account: a rerun on the same day is a no-op, a new day is one update.
+        risk = risk_model_for(account, perf_prices)
+        rc1, rc2 = st.columns([3, 2])
+        rc1.plotly_chart(fig_correlation_heatmap(risk.correlation(), title=f"Daily return correlation ({RISK_WINDOW_DAYS}d)"),
+                         use_container_width=True)
+        values = {sym: (s.get("remaining_qty") or 0.0) * (s.get("current_price") or 0.0) for sym, s in stats.items()}
+        rc2.dataframe(risk.contributions({sym.upper(): v for sym, v in values.items()}).style.format({
+            "weight": "{:.1%}", "volatility": "{:.1%}", "contribution": "{:.2%}", "contribution_pct": "{:.1%}"
+        }, na_rep="—"), use_container_width=True)
+        rc2.caption("Volatility is annualized; contribution is each asset's share of portfolio volatility.")
+
     st.divider()
     st.subheader("⚖️ Portfolio Rebalancing")
     st.write("Set target allocations (%) for each asset. The tool will suggest buys/sells to reach these targets.")
     
-    total_value = sum((s['remaining_qty'] or 0.0) * (s['current_price'] or 0.0) for s in stats.values())
+    total_value = pd.Series([(s['remaining_qty'] or 0.0) * (s['current_price'] or 0.0) for s in stats.values()], dtype=float).sum()
     if total_value > 0:
         saved_targets = account_data.get("rebalance_targets", {})
         targets = {}
@@ -319,38 +447,37 @@ with tab_portfolio:
                 target = st.number_input(f"{sym.upper()} target %", min_value=0.0, max_value=100.0, value=default_target, step=1.0, key=f"target_{sym}")
                 targets[sym] = target
         
-        # Save targets
-        if targets != saved_targets:
+        colB1, colB2, colB3, colB4 = st.columns(4)
+        quote_cash = colB1.number_input(f"Quote cash ({default_quote})", min_value=0.0, value=0.0, step=10.0, key="rebalance_cash")
+        fee_pct = colB2.number_input("Fee %", min_value=0.0, max_value=5.0, value=REBALANCE_FEE_DEFAULT * 100.0, step=0.05, key="rebalance_fee")
+        min_trade = colB3.number_input("Min trade size", min_value=0.0, value=REBALANCE_MIN_NOTIONAL_DEFAULT, step=1.0, key="rebalance_min")
+        band = colB4.number_input("Tolerance band %", min_value=0.0, max_value=50.0, value=REBALANCE_BAND_PCT_DEFAULT, step=0.5, key="rebalance_band")
+
+        # Targets are only persisted on request, not on every rerun
+        if targets != saved_targets and st.button("💾 Save targets"):
             account_data["rebalance_targets"] = targets
             accounts[account] = account_data
             store["accounts"] = accounts
             save_store(store, profile)
+            st.success("Targets saved")
         
         total_target = sum(targets.values())
         if abs(total_target - 100.0) > 0.1:
             st.error(f"Targets must sum to 100%. Current sum: {total_target:.1f}%")
         else:
             st.subheader("Rebalancing Suggestions")
-            suggestions = []
-            for sym, target_pct in targets.items():
-                s = stats[sym]
-                current_value = (s['remaining_qty'] or 0.0) * (s['current_price'] or 0.0)
-                target_value = total_value * (target_pct / 100.0)
-                diff_value = target_value - current_value
-                cur_price = s['current_price'] or 0.0
-                if cur_price > 0:
-                    diff_qty = diff_value / cur_price
-                    if diff_qty > 0.000001:
-                        suggestions.append(f"**{sym.upper()}**: Buy {diff_qty:.6f} units (${diff_value:.2f})")
-                    elif diff_qty < -0.000001:
-                        suggestions.append(f"**{sym.upper()}**: Sell {abs(diff_qty):.6f} units (${abs(diff_value):.2f})")
-                    else:
-                        suggestions.append(f"**{sym.upper()}**: Balanced")
-                else:
-                    suggestions.append(f"**{sym.upper()}**: No price data")
-            
-            for sug in suggestions:
-                st.write(sug)
+            trades = plan_rebalance(
+                positions_from_stats(stats, account), targets, cash=quote_cash,
+                band_pct=band, default_fee=fee_pct / 100.0, default_min_notional=min_trade
+            )
+            if trades.empty:
+                st.write("Portfolio is within tolerance — no trades needed.")
+            for t in trades.itertuples():
+                verb = "Buy" if t.side == "buy" else "Sell"
+                st.write(f"**{t.asset.upper()}**: {verb} {t.qty:.6f} units (${t.notional:.2f}, fee ${t.fee:.2f})")
+            no_price = [sym.upper() for sym, s in stats.items() if not (s['current_price'] or 0.0)]
+            if no_price:
+                st.write(f"No price data: {', '.join(no_price)}")
     else:
         st.info("No portfolio value to rebalance.")
 
@@ -362,6 +489,26 @@ with tab_whales:
     else:
         st.info("No whale activity to display. Add addresses in the sidebar.")
 
+    st.subheader("🔀 Biggest Movers Since Last Refresh")
+    day_ago = time.time() - 86400
+    movers = snapshot_store.top_movers(10, since=day_ago, addresses=tracked_keys)
+    if movers.empty:
+        st.info("No balance changes recorded in the last 24h.")
+    else:
+        st.dataframe(movers, use_container_width=True)
+    flows = snapshot_store.net_flows(since=day_ago, addresses=tracked_keys)
+    if not flows.empty:
+        st.write("**Net flow by chain (24h, native units)**")
+        st.dataframe(flows, use_container_width=True)
+
+    st.subheader("🚨 Unusual Activity (24h)")
+    if whale_anomalies.empty:
+        st.info("No statistically unusual whale flows in the last 24h.")
+    else:
+        st.caption(f"|z| ≥ {WHALE_ZSCORE_THRESHOLD} against each wallet's (or chain's) last {WHALE_ZSCORE_WINDOW} refreshes. "
+                   "Label exchange wallets when adding them to split out exchange-bound flows.")
+        st.dataframe(whale_anomalies, use_container_width=True)
+
     st.divider()
     st.subheader("➕ Add Top Wallets")
     btc_top = st.text_area("Top BTC addresses (one per line)", height=100, help="Paste known top BTC wallet addresses here")
@@ -369,102 +516,72 @@ with tab_whales:
     xrp_top = st.text_area("Top XRP addresses (one per line)", height=100, help="Paste known top XRP wallet addresses here")
     bnb_top = st.text_area("Top BNB addresses (one per line)", height=100, help="Paste known top BNB wallet addresses here")
     ada_top = st.text_area("Top ADA addresses (one per line)", height=100, help="Paste known top ADA wallet addresses here")
+    are_exchanges = st.checkbox("These are exchange wallets", help="Exchange wallets are watched for unusual deposits and withdrawals")
     if st.button("Add to Tracked"):
-        btc_list = [l.strip() for l in btc_top.splitlines() if l.strip()]
-        eth_list = [l.strip() for l in eth_top.splitlines() if l.strip()]
-        xrp_list = [l.strip() for l in xrp_top.splitlines() if l.strip()]
-        bnb_list = [l.strip() for l in bnb_top.splitlines() if l.strip()]
-        ada_list = [l.strip() for l in ada_top.splitlines() if l.strip()]
-        account_data.setdefault("tracked_addresses", {})
-        account_data["tracked_addresses"].setdefault("btc", []).extend(btc_list)
-        account_data["tracked_addresses"].setdefault("eth", []).extend(eth_list)
-        account_data["tracked_addresses"].setdefault("xrp", []).extend(xrp_list)
-        account_data["tracked_addresses"].setdefault("bnb", []).extend(bnb_list)
-        account_data["tracked_addresses"].setdefault("ada", []).extend(ada_list)
-        # remove duplicates
-        account_data["tracked_addresses"]["btc"] = list(set(account_data["tracked_addresses"]["btc"]))
-        account_data["tracked_addresses"]["eth"] = list(set(account_data["tracked_addresses"]["eth"]))
-        account_data["tracked_addresses"]["xrp"] = list(set(account_data["tracked_addresses"]["xrp"]))
-        account_data["tracked_addresses"]["bnb"] = list(set(account_data["tracked_addresses"]["bnb"]))
-        account_data["tracked_addresses"]["ada"] = list(set(account_data["tracked_addresses"]["ada"]))
-        accounts[account] = account_data
-        store["accounts"] = accounts
-        save_store(store, profile)
-        st.success("Added top wallets to tracked")
+        added_total, invalid_total = 0, []
+        for chain, text in [("btc", btc_top), ("eth", eth_top), ("xrp", xrp_top), ("bnb", bnb_top), ("ada", ada_top)]:
+            added, invalid = track_addresses(chain, [l.strip() for l in text.splitlines() if l.strip()],
+                                             label="exchange" if are_exchanges else "manual")
+            added_total += len(added)
+            invalid_total += invalid
+        if invalid_total:
+            st.warning(f"Skipped {len(invalid_total)} invalid address(es): {', '.join(invalid_total[:5])}")
+        st.success(f"Added {added_total} new wallet(s) to tracked")
         st.rerun()
 
     st.divider()
     st.subheader("🤖 Auto-add Top Wallets")
+    top_depth = st.select_slider("How many top wallets", options=[100, 250, 500, 1000, 2500], value=100,
+                                 help="Rankings are cached on disk for a day and refreshed in the background")
+    ranked_at = {c: (discovery_cache().load(c) or {}).get("fetched_at") for c in ("btc", "eth", "xrp", "bnb", "ada")}
+    ranked_at = {c: t for c, t in ranked_at.items() if t}
+    if ranked_at:
+        st.caption("Cached rankings: " + ", ".join(f"{c.upper()} {time.strftime('%Y-%m-%d %H:%M', time.localtime(t))}" for c, t in ranked_at.items()))
     col1, col2, col3 = st.columns(3)
     with col1:
-        if st.button("₿ Auto-add Top 100 BTC", use_container_width=True):
-            top_btc = get_top_btc_addresses(100)
+        if st.button(f"₿ Auto-add Top {top_depth} BTC", use_container_width=True):
+            top_btc = get_top_btc_addresses(top_depth)
             if top_btc:
-                account_data.setdefault("tracked_addresses", {})
-                account_data["tracked_addresses"].setdefault("btc", []).extend(top_btc)
-                account_data["tracked_addresses"]["btc"] = list(set(account_data["tracked_addresses"]["btc"]))
-                accounts[account] = account_data
-                store["accounts"] = accounts
-                save_store(store, profile)
-                st.success(f"Added {len(top_btc)} top BTC wallets")
+                added, _ = track_addresses("btc", top_btc, label="top")
+                st.success(f"Added {len(added)} new top BTC wallets")
                 st.rerun()
             else:
                 st.error("Failed to fetch top BTC wallets")
     with col2:
-        if st.button("Ξ Auto-add Top 100 ETH", use_container_width=True):
-            top_eth = get_top_eth_addresses(100)
+        if st.button(f"Ξ Auto-add Top {top_depth} ETH", use_container_width=True):
+            top_eth = get_top_eth_addresses(top_depth)
             if top_eth:
-                account_data.setdefault("tracked_addresses", {})
-                account_data["tracked_addresses"].setdefault("eth", []).extend(top_eth)
-                account_data["tracked_addresses"]["eth"] = list(set(account_data["tracked_addresses"]["eth"]))
-                accounts[account] = account_data
-                store["accounts"] = accounts
-                save_store(store, profile)
-                st.success(f"Added {len(top_eth)} top ETH wallets")
+                added, _ = track_addresses("eth", top_eth, label="top")
+                st.success(f"Added {len(added)} new top ETH wallets")
                 st.rerun()
             else:
                 st.error("Failed to fetch top ETH wallets")
     with col3:
-        if st.button("💧 Auto-add Top 100 XRP", use_container_width=True):
-            top_xrp = get_top_xrp_addresses(100)
+        if st.button(f"💧 Auto-add Top {top_depth} XRP", use_container_width=True):
+            top_xrp = get_top_xrp_addresses(top_depth)
             if top_xrp:
-                account_data.setdefault("tracked_addresses", {})
-                account_data["tracked_addresses"].setdefault("xrp", []).extend(top_xrp)
-                account_data["tracked_addresses"]["xrp"] = list(set(account_data["tracked_addresses"]["xrp"]))
-                accounts[account] = account_data
-                store["accounts"] = accounts
-                save_store(store, profile)
-                st.success(f"Added {len(top_xrp)} top XRP wallets")
+                added, _ = track_addresses("xrp", top_xrp, label="top")
+                st.success(f"Added {len(added)} new top XRP wallets")
                 st.rerun()
             else:
                 st.error("Failed to fetch top XRP wallets")
     
     col4, col5, col6 = st.columns(3)
     with col4:
-        if st.button("🟡 Auto-add Top 100 BNB", use_container_width=True):
-            top_bnb = get_top_bnb_addresses(100)
+        if st.button(f"🟡 Auto-add Top {top_depth} BNB", use_container_width=True):
+            top_bnb = get_top_bnb_addresses(top_depth)
             if top_bnb:
-                account_data.setdefault("tracked_addresses", {})
-                account_data["tracked_addresses"].setdefault("bnb", []).extend(top_bnb)
-                account_data["tracked_addresses"]["bnb"] = list(set(account_data["tracked_addresses"]["bnb"]))
-                accounts[account] = account_data
-                store["accounts"] = accounts
-                save_store(store, profile)
-                st.success(f"Added {len(top_bnb)} top BNB wallets")
+                added, _ = track_addresses("bnb", top_bnb, label="top")
+                st.success(f"Added {len(added)} new top BNB wallets")
                 st.rerun()
             else:
                 st.error("Failed to fetch top BNB wallets")
     with col5:
-        if st.button("₳ Auto-add Top 100 ADA", use_container_width=True):
-            top_ada = get_top_ada_addresses(100)
+        if st.button(f"₳ Auto-add Top {top_depth} ADA", use_container_width=True):
+            top_ada = get_top_ada_addresses(top_depth)
             if top_ada:
-                account_data.setdefault("tracked_addresses", {})
-                account_data["tracked_addresses"].setdefault("ada", []).extend(top_ada)
-                account_data["tracked_addresses"]["ada"] = list(set(account_data["tracked_addresses"]["ada"]))
-                accounts[account] = account_data
-                store["accounts"] = accounts
-                save_store(store, profile)
-                st.success(f"Added {len(top_ada)} top ADA wallets")
+                added, _ = track_addresses("ada", top_ada, label="top")
+                st.success(f"Added {len(added)} new top ADA wallets")
                 st.rerun()
             else:
                 st.error("Failed to fetch top ADA wallets")
@@ -475,11 +592,23 @@ with tab_whales:
 # --- Orders tab ---
 with tab_orders:
     st.subheader("📝 Orders")
-    orders_df = pd.DataFrame(account_data.get("orders", []))
-    if orders_df.empty:
+    order_table = portfolio.orders
+    if not len(order_table):
         st.info("No orders yet. Add one below.")
     else:
-        st.dataframe(orders_df, use_container_width=True)
+        oc1, oc2, oc3, oc4, oc5 = st.columns([1, 1, 2, 1, 1])
+        order_base = oc1.selectbox("Asset", ["all"] + sorted(bases), key="order_base")
+        order_side = oc2.selectbox("Side", ["all", "buy", "sell"], key="order_side")
+        order_text = oc3.text_input("Search exchange / note / pair", key="order_text")
+        order_sort = oc4.selectbox("Sort by", list(ORDER_SORT_KEYS), key="order_sort")
+        order_page_no = oc5.number_input("Page", min_value=1, value=1, step=1, key="order_page")
+        orders_view, orders_total, order_pages = order_page(
+            order_table, page=order_page_no, page_size=PAGE_SIZE_DEFAULT, sort_by=order_sort,
+            descending=order_sort in ("timestamp", "amount", "price", "value", "id"),
+            base=None if order_base == "all" else order_base, side=None if order_side == "all" else order_side,
+            text=order_text.strip())
+        st.dataframe(orders_view, use_container_width=True, hide_index=True)
+        st.caption(f"{orders_total} of {len(order_table)} order(s) · page {min(order_page_no, order_pages)} of {order_pages}")
 
     st.divider()
     st.subheader("➕ Add Order")
@@ -514,22 +643,26 @@ with tab_orders:
 
     st.divider()
     st.subheader("🗑️ Delete Orders")
-    if not orders_df.empty:
-        ids = st.multiselect("Select IDs to delete", orders_df["id"].tolist())
+    if len(portfolio.orders):
+        ids = st.multiselect("Select IDs to delete (from the page shown above)", orders_view["id"].tolist())
         if st.button("Delete selected"):
-            account_data["orders"] = [o for o in account_data.get("orders", []) if o.get("id") not in ids]
+            # Compare ids as text on both sides, so a stored "123" matches a displayed 123.
+            drop = {str(i) for i in ids}
+            kept = [o for o in account_data.get("orders", []) if str(o.get("id")) not in drop]
+            deleted = len(account_data.get("orders", [])) - len(kept)
+            account_data["orders"] = kept
             accounts[account] = account_data
             store["accounts"] = accounts
             save_store(store, profile)
-            st.success(f"Deleted {len(ids)} order(s)")
+            st.success(f"Deleted {deleted} order(s)")
             st.rerun()
 
     st.divider()
     st.subheader("📥📤 Export/Import Orders")
     colE1, colE2 = st.columns(2)
     with colE1:
-        if not orders_df.empty:
-            csv = orders_df.to_csv(index=False)
+        if len(portfolio.orders):
+            csv = portfolio.df.to_csv(index=False)
             st.download_button("Download Orders as CSV", csv, "orders.csv", "text/csv", use_container_width=True)
     with colE2:
         uploaded_file = st.file_uploader("Upload Orders CSV", type="csv")
@@ -592,22 +725,28 @@ with tab_signals:
     
     st.divider()
     
+    # Whale flow signals
+    st.subheader("🐋 Whale Flow Signals")
+    flow_signals = whale_flow_signal(whale_anomalies)
+    if flow_signals:
+        for chain, lean in flow_signals.items():
+            if lean == "bearish":
+                st.warning(f"🟠 {chain.upper()}: unusual flows toward exchanges / out of tracked wallets")
+            elif lean == "bullish":
+                st.success(f"🟢 {chain.upper()}: unusual withdrawals from exchanges / accumulation")
+            else:
+                st.info(f"⚪ {chain.upper()}: unusual but mixed whale flows")
+    else:
+        st.write("No unusual whale flows in the last 24h.")
+    
+    st.divider()
+    
     # Profit Taking Alerts
     st.subheader("🚨 Profit Taking Alerts")
     alerts = []
-    for sym, s in stats.items():
-        qty = s['remaining_qty'] or 0.0
-        avg = s['avg_buy'] or 0.0
-        cur = s['current_price'] or 0.0
-        signal, qty_to_sell = profit_take_signal(s, profit_pct=custom_thresholds.get(sym, profit_pct))
-        if signal:
-            proceeds = qty_to_sell * cur
-            original_for_sold = qty_to_sell * avg
-            profit_from_sold = proceeds - original_for_sold
-            remaining_qty = qty - qty_to_sell
-            remaining_value = remaining_qty * cur
-            alert = f"**{sym.upper()}**: Sell {qty_to_sell:.6f} units for ${proceeds:.2f} (recovers ${original_for_sold:.2f} investment + ${profit_from_sold:.2f} profit). Keep {remaining_qty:.6f} coins worth ${remaining_value:.2f} for continued growth."
-            alerts.append(alert)
+    for sym, tp in take_profit[take_profit["signal"]].iterrows():
+        alert = f"**{sym.upper()}**: Sell {tp['sell_qty']:.6f} units for ${tp['proceeds']:.2f} (recovers ${tp['principal']:.2f} investment + ${tp['profit']:.2f} profit). Keep {tp['keep_qty']:.6f} coins worth ${tp['keep_value']:.2f} for continued growth."
+        alerts.append(alert)
     if alerts:
         for alert in alerts:
             st.warning(alert)
@@ -619,18 +758,25 @@ with tab_signals:
     st.write("RSI, MACD, and Moving Averages for your portfolio assets (based on 100-day history).")
     
     indicator_data = []
+    rsi_by_asset = {}
     for sym in stats.keys():
         hist = historical_prices_coingecko(sym, days=100, quote=default_quote.lower())
         if hist and len(hist) > 50:  # Need enough data
-            prices = [p[1] for p in hist]
-            rsi = calculate_rsi(prices)
-            macd, signal, histo = calculate_macd(prices)
-            sma20 = calculate_sma(prices, 20)
-            ema20 = calculate_ema(prices, 20)
+            # Cached running state: only candles closed since the last rerun are folded in.
+            ind = indicators_for(sym, default_quote, hist)
+            rsi = ind["rsi"]
+            rsi_by_asset[sym] = rsi
+            macd, signal = ind["macd"], ind["signal"]
+            sma20, ema20 = ind["sma"], ind["ema"]
+            # Intraday RSI from the locally built hourly candles (no extra upstream call). Only the
+            # latest run of consecutive bars is used: hours the app wasn't running are missing, and
+            # a run that restarts after a gap reseeds the indicator state ("—" until it is long enough).
+            rsi_1h = indicators_for(sym, f"{VALUATION_BASE}:1h", candles.history(sym, "1h", contiguous=True))["rsi"]
             current_price = stats[sym]['current_price'] or 0.0
             indicator_data.append({
                 "Asset": sym.upper(),
                 "RSI (14)": f"{rsi:.1f}" if rsi else "—",
+                "RSI 1h (local)": f"{rsi_1h:.1f}" if rsi_1h else "—",
                 "MACD": f"{macd:.6f}" if macd else "—",
                 "Signal": f"{signal:.6f}" if signal else "—",
                 "SMA (20)": f"${sma20:.2f}" if sma20 else "—",
@@ -644,6 +790,182 @@ with tab_signals:
     else:
         st.info("Not enough historical data for indicators.")
 
+    st.divider()
+    st.subheader("🔔 Custom Alerts")
+    alert_rules = account_data.get("alert_rules", [])
+    # Compiled once per rule set; each refresh only re-checks rules whose input changed.
+    alert_engine = engine_for(f"{profile}:{account}", alert_rules)
+    fired = alert_engine.update(alert_inputs(stats, rsi_by_asset, flows, perf))
+    # Delivery runs on the dispatcher's own thread; submit() only queues. While the whale daemon
+    # runs, it evaluates the same rules every tick and delivers them itself, page open or not;
+    # without it, alerts are only checked (and sent) when this page reruns.
+    alert_sinks = store.get("settings", {}).get("alert_sinks", [])
+    daemon_delivers = daemon_alive(snapshot_store, profile=profile)
+    dispatcher = dispatcher_for(profile, alert_sinks) if alert_sinks and not daemon_delivers else None
+    for event in fired:
+        st.error(f"🔔 {event['message']}")
+        if dispatcher is not None:
+            dispatcher.submit(event)
+    if alert_sinks and not daemon_delivers:
+        st.caption("Alerts are delivered only while this page is open; run `python -m chainguardian.whale_daemon` "
+                   "to deliver them around the clock.")
+    with st.form("add_alert_rule", clear_on_submit=True):
+        ac1, ac2, ac3, ac4 = st.columns(4)
+        rule_kind = ac1.selectbox("Condition", list(RULE_KINDS))
+        rule_asset = ac2.text_input("Asset / chain", help="e.g. BTC; a chain (btc, eth…) for whale outflow; ignored for drawdown")
+        rule_value = ac3.number_input("Threshold", value=0.0, step=1.0)
+        rule_window = ac4.selectbox("Window (% move)", list(CHANGE_WINDOWS))
+        if st.form_submit_button("Add rule"):
+            if rule_kind != "drawdown" and not rule_asset.strip():
+                st.error("asset or chain required")
+            else:
+                rule = {"id": int(time.time() * 1000), "kind": rule_kind, "asset": rule_asset.strip() or "portfolio",
+                        "value": float(rule_value), "enabled": True}
+                if rule_kind == "pct_move":
+                    rule["window"] = rule_window
+                account_data["alert_rules"] = alert_rules + [rule]
+                accounts[account] = account_data
+                store["accounts"] = accounts
+                save_store(store, profile)
+                st.rerun()
+    if alert_rules:
+        rule_labels = {r["id"]: describe_rule(r) for r in alert_rules if r.get("kind") in RULE_KINDS}
+        drop = st.multiselect("Rules (select to delete)", list(rule_labels), format_func=rule_labels.get)
+        if drop and st.button("Delete selected rules"):
+            account_data["alert_rules"] = [r for r in alert_rules if r.get("id") not in drop]
+            accounts[account] = account_data
+            store["accounts"] = accounts
+            save_store(store, profile)
+            st.rerun()
+    with st.expander("Alert delivery"):
+        sinks_by_type = {c.get("type"): c for c in alert_sinks}
+        with st.form("alert_sinks"):
+            webhook_url = st.text_input("Webhook URL", value=sinks_by_type.get("webhook", {}).get("url", ""))
+            file_path = st.text_input("Append to file", value=sinks_by_type.get("file", {}).get("path", ""))
+            sc1, sc2, sc3 = st.columns(3)
+            smtp_cfg = sinks_by_type.get("smtp", {})
+            smtp_host = sc1.text_input("SMTP host", value=smtp_cfg.get("host", ""))
+            smtp_port = sc2.number_input("SMTP port", value=int(smtp_cfg.get("port", 587)), step=1)
+            smtp_to = sc3.text_input("Email to", value=", ".join(smtp_cfg.get("recipients", [])))
+            sc4, sc5, sc6 = st.columns(3)
+            smtp_from = sc4.text_input("Email from", value=smtp_cfg.get("sender", ""))
+            smtp_user = sc5.text_input("SMTP user", value=smtp_cfg.get("username") or "")
+            smtp_password = sc6.text_input("SMTP password", value=smtp_cfg.get("password") or "", type="password")
+            if st.form_submit_button("Save delivery settings"):
+                configs = [c for c in alert_sinks if c.get("type") not in ("webhook", "file", "smtp")]
+                if webhook_url.strip():
+                    configs.append({"type": "webhook", "url": webhook_url.strip()})
+                if file_path.strip():
+                    configs.append({"type": "file", "path": os.path.expanduser(file_path.strip())})
+                if smtp_host.strip() and smtp_to.strip():
+                    configs.append({"type": "smtp", "host": smtp_host.strip(), "port": int(smtp_port),
+                                    "sender": smtp_from.strip() or smtp_user.strip(),
+                                    "recipients": [a.strip() for a in smtp_to.split(",") if a.strip()],
+                                    "username": smtp_user.strip() or None, "password": smtp_password or None})
+                store.setdefault("settings", {})["alert_sinks"] = configs
+                save_store(store, profile)
+                st.rerun()
+        if daemon_delivers:
+            st.caption("Delivered by the whale daemon.")
+        elif dispatcher is not None:
+            ds = dispatcher.stats()
+            p95 = f"{ds['latency_p95']:.2f}s" if ds["latency_p95"] is not None else "—"
+            st.caption(f"sent {ds['submitted'] - ds['deduped'] - ds['dropped'] - ds['queued']} · deduped {ds['deduped']} · "
+                       f"dropped {ds['dropped']} · queued {ds['queued']} · p95 latency {p95} · "
+                       + ", ".join(f"{n}: {c['delivered']} ok / {c['failed']} failed" for n, c in ds["sinks"].items()))
+    if alert_engine.history:
+        st.write("**Recent alerts**")
+        st.dataframe(pd.DataFrame([
+            {"time": pd.to_datetime(e["ts"], unit="s"), "alert": e["message"]} for e in reversed(alert_engine.history)
+        ]), use_container_width=True, hide_index=True)
+
+    st.divider()
+    st.subheader("🧪 Strategy Backtest")
+    st.write("Replays the fear-buy and profit-taking rules over daily price and Fear & Greed history.")
+    with st.form("backtest"):
+        bc1, bc2, bc3 = st.columns(3)
+        bt_assets = bc1.multiselect("Assets", sorted(stats), default=sorted(stats))
+        bt_days = bc2.selectbox("History", [365, 730, 1825], format_func=lambda d: f"{d // 365} year(s)")
+        bt_fee = bc3.number_input("Fee per fill (%)", value=BACKTEST_FEE_PCT, min_value=0.0, step=0.05)
+        bc4, bc5, bc6, bc7 = st.columns(4)
+        bt_profit = bc4.number_input("Take profit at (%)", value=float(profit_pct), min_value=1.0, step=10.0)
+        bt_fear = bc5.number_input("Buy at F&G ≤", value=FEAR_BUY_THRESHOLD, min_value=0, max_value=100, step=1)
+        bt_amount = bc6.number_input(f"Buy per fear day ({default_quote})", value=BACKTEST_BUY_AMOUNT, min_value=0.0, step=10.0)
+        bt_initial = bc7.number_input(f"Initial buy ({default_quote})", value=0.0, min_value=0.0, step=100.0)
+        run_backtest = st.form_submit_button("Run backtest")
+    if run_backtest and bt_assets:
+        bt_prices = price_history_frame({sym: historical_prices_coingecko(sym, days=bt_days, quote=default_quote.lower())
+                                         for sym in bt_assets})
+        bt_fng = price_history_frame({"FNG": fear_greed_history(days=bt_days)})
+        if bt_prices.empty:
+            st.info("No price history available for the selected assets.")
+        else:
+            bt = backtest(bt_prices, bt_fng["FNG"] if not bt_fng.empty else None, profit_pct=bt_profit,
+                          fear_threshold=bt_fear, buy_amount=bt_amount, initial=bt_initial, fee_pct=bt_fee,
+                          custom_thresholds={k.upper(): v for k, v in custom_thresholds.items()})
+            st.dataframe(bt["summary"].style.format({
+                "invested": "{:,.2f}", "proceeds": "{:,.2f}", "final_value": "{:,.2f}", "profit": "{:,.2f}",
+                "return_pct": "{:.1f}%", "hold_return_pct": "{:.1f}%", "max_drawdown": "{:.1%}",
+            }), use_container_width=True)
+            curve = pd.DataFrame({"equity": bt["equity"][PERF_TOTAL], "invested": bt["invested"][PERF_TOTAL]})
+            st.plotly_chart(px.line(curve, labels={"index": "Date", "value": default_quote, "variable": ""}),
+                            use_container_width=True)
+            with st.expander(f"Trades ({len(bt['trades'])})"):
+                st.dataframe(bt["trades"], use_container_width=True, hide_index=True)
+
+    st.subheader("🎛️ Parameter Sweep")
+    st.write("Backtests every combination of the thresholds below across your assets and ranks them.")
+    with st.form("sweep"):
+        sc1, sc2, sc3 = st.columns(3)
+        sw_pcts = sc1.text_input("Take profit at (%)", value=", ".join(f"{p:g}" for p in SWEEP_PROFIT_PCTS))
+        sw_fears = sc2.text_input("Buy at F&G ≤", value=", ".join(str(f) for f in SWEEP_FEAR_THRESHOLDS))
+        sw_days = sc3.selectbox("History", [365, 730, 1825], format_func=lambda d: f"{d // 365} year(s)", key="sweep_days")
+        run_sweep = st.form_submit_button("Run sweep")
+    if run_sweep and stats:
+        try:
+            grid_pcts = [float(x) for x in sw_pcts.split(",") if x.strip()]
+            grid_fears = [float(x) for x in sw_fears.split(",") if x.strip()]
+        except ValueError:
+            st.error("thresholds must be comma-separated numbers")
+            grid_pcts = grid_fears = []
+        if any(not PROFIT_PCT_MIN <= p <= PROFIT_PCT_MAX for p in grid_pcts):
+            # The winner is applied to the settings, which only accept this range.
+            st.error(f"take-profit thresholds must be between {PROFIT_PCT_MIN:g}% and {PROFIT_PCT_MAX:g}%")
+            grid_pcts = []
+        if grid_pcts and grid_fears:
+            sw_prices = price_history_frame({sym: historical_prices_coingecko(sym, days=sw_days, quote=default_quote.lower())
+                                             for sym in stats})
+            sw_fng = price_history_frame({"FNG": fear_greed_history(days=sw_days)})
+            with st.spinner(f"Backtesting {len(grid_pcts) * len(grid_fears)} combinations..."):
+                st.session_state["sweep"] = sweep(sw_prices, sw_fng["FNG"] if not sw_fng.empty else None,
+                                                  profit_pcts=grid_pcts, fear_thresholds=grid_fears)["ranked"]
+    ranked = st.session_state.get("sweep")
+    if ranked is not None and not ranked.empty:
+        shown = ranked.head(20).copy()
+        shown["profit_pct"] = [f"{p:g}%" if p == p else "per asset" for p in shown["profit_pct"]]
+        shown["thresholds"] = [", ".join(f"{a} {v:g}%" for a, v in t.items()) for t in shown["thresholds"]]
+        st.dataframe(shown, use_container_width=True)
+        best = ranked.iloc[0]
+        clear_overrides = False
+        if not best["thresholds"] and custom_thresholds:
+            clear_overrides = st.checkbox(f"Also clear the {len(custom_thresholds)} per-asset threshold override(s)",
+                                          value=False, key="sweep_clear_overrides")
+        if st.button("Apply best take-profit thresholds"):
+            # A tuned winner sets per-asset overrides; a uniform one sets the global threshold and
+            # keeps the overrides unless the user asked to clear them.
+            clamp = lambda v: min(max(float(v), PROFIT_PCT_MIN), PROFIT_PCT_MAX)
+            if best["thresholds"]:
+                account_data["custom_thresholds"] = {**custom_thresholds,
+                                                     **{a: clamp(v) for a, v in best["thresholds"].items()}}
+            else:
+                store.setdefault("settings", {})["profit_pct_to_take"] = clamp(best["profit_pct"])
+                if clear_overrides:
+                    account_data["custom_thresholds"] = {}
+            accounts[account] = account_data
+            store["accounts"] = accounts
+            save_store(store, profile)
+            st.rerun()
+
 # --- Markets tab ---
 with tab_markets:
     st.header("🌍 Markets Overview")
@@ -674,10 +996,53 @@ with tab_markets:
     else:
         st.info("No market data available.")
     
+    # Top coins from the bulk markets endpoint, cached on disk and refreshed in the background.
+    market = screener_frame(default_quote, SCREENER_SIZE)
+
+    st.divider()
+    st.subheader("🚀 Top Movers")
+    if market.empty:
+        st.info("Market data unavailable.")
+    else:
+        mc1, mc2 = st.columns(2)
+        mover_window = mc1.selectbox("Window", list(MOVER_WINDOWS), index=1)
+        mover_min_cap = mc2.number_input(f"Min market cap ({default_quote})", value=1e8, min_value=0.0, step=1e8, format="%.0f")
+        gainers, losers = movers(market, mover_window, n=10, min_market_cap=mover_min_cap)
+        mover_cols = ["symbol", "name", "price", MOVER_WINDOWS[mover_window], "volume_spike", "rsi"]
+        gc, lc = st.columns(2)
+        gc.write("**Gainers**")
+        gc.dataframe(gainers[mover_cols], use_container_width=True, hide_index=True)
+        lc.write("**Losers**")
+        lc.dataframe(losers[mover_cols], use_container_width=True, hide_index=True)
+
+        st.subheader("🧮 Screener")
+        fc1, fc2, fc3, fc4 = st.columns(4)
+        scr_sort = fc1.selectbox("Sort by", [c for c in SCREENER_COLUMNS if c not in ("symbol", "name")],
+                                 index=SCREENER_COLUMNS.index("volume_spike") - 2)
+        scr_desc = fc2.checkbox("Descending", value=True, key="screener_desc")
+        scr_spike = fc3.number_input("Min volume spike (× median)", value=0.0, min_value=0.0, step=0.5)
+        scr_rsi = fc4.slider("RSI (7d hourly)", 0, 100, (0, 100))
+        scr_text = st.text_input("Filter by name or symbol", key="screener_text")
+        screened = screen(market, sort_by=scr_sort, descending=scr_desc, text=scr_text,
+                          min_volume_spike=scr_spike or None,
+                          rsi_above=scr_rsi[0] if scr_rsi[0] > 0 else None,
+                          rsi_below=scr_rsi[1] if scr_rsi[1] < 100 else None)
+        st.caption(f"{len(screened)} of {len(market)} coins")
+        st.dataframe(screened.head(100), use_container_width=True, hide_index=True)
+
     st.divider()
     st.subheader("🔍 Search Asset")
     search_sym = st.text_input("Enter asset symbol (e.g., BTC, ETH, ADA)", key="search_sym").strip().upper()
-    if search_sym:
+    listed = market[market["symbol"] == search_sym] if search_sym and not market.empty else None
+    if listed is not None and len(listed):
+        # Already in the cached market table: no per-horizon history calls needed.
+        row = listed.iloc[0]
+        st.metric(f"{search_sym} Price", f"${row['price']:.2f}", f"{row['change_24h']:.2f}%" if row["change_24h"] == row["change_24h"] else "—")
+        col1, col2, col3, col4 = st.columns(4)
+        for col, label, field in ((col1, "1-Hour Change", "change_1h"), (col2, "7-Day Change", "change_7d"),
+                                  (col3, "30-Day Change", "change_30d"), (col4, "1-Year Change", "change_1y")):
+            col.metric(label, f"{row[field]:.2f}%" if row[field] == row[field] else "—")
+    elif search_sym:
         # Fetch price for searched asset
         try:
             price_data = prices_coingecko([search_sym.lower()], quote=default_quote)
@@ -726,72 +1091,56 @@ with tab_status:
     st.write(f"Tracked XRP: {len(account_data.get('tracked_addresses', {}).get('xrp', []))}")
     st.write(f"Tracked BNB: {len(account_data.get('tracked_addresses', {}).get('bnb', []))}")
     st.write(f"Tracked ADA: {len(account_data.get('tracked_addresses', {}).get('ada', []))}")
+    if price_scheduler.state:
+        with st.expander("Price refresh schedule"):
+            now_ts = time.time()
+            st.dataframe(pd.DataFrame([
+                {"asset": sym.upper(), "interval (s)": round(price_scheduler.interval(sym)),
+                 "daily vol": f"{e['vol']:.2%}" if e["vol"] is not None else "—",
+                 "to trigger": f"{e['distance']:.2f}%" if e["distance"] is not None else "—",
+                 "next fetch in (s)": max(0, round(e["next_due"] - now_ts))}
+                for sym, e in price_scheduler.state.items()
+            ]), use_container_width=True, hide_index=True)
     
     st.subheader("📍 Tracked Wallets")
-    btc_tracked = account_data.get('tracked_addresses', {}).get('btc', [])
-    eth_tracked = account_data.get('tracked_addresses', {}).get('eth', [])
-    xrp_tracked = account_data.get('tracked_addresses', {}).get('xrp', [])
-    bnb_tracked = account_data.get('tracked_addresses', {}).get('bnb', [])
-    ada_tracked = account_data.get('tracked_addresses', {}).get('ada', [])
-    if btc_tracked:
-        st.write("**BTC Wallets:**")
-        for addr in btc_tracked[:10]:
-            st.code(addr, language=None)
-        if len(btc_tracked) > 10:
-            st.write(f"... and {len(btc_tracked) - 10} more")
-    if eth_tracked:
-        st.write("**ETH Wallets:**")
-        for addr in eth_tracked[:10]:
-            st.code(addr, language=None)
-        if len(eth_tracked) > 10:
-            st.write(f"... and {len(eth_tracked) - 10} more")
-    if xrp_tracked:
-        st.write("**XRP Wallets:**")
-        for addr in xrp_tracked[:10]:
-            st.code(addr, language=None)
-        if len(xrp_tracked) > 10:
-            st.write(f"... and {len(xrp_tracked) - 10} more")
-    if bnb_tracked:
-        st.write("**BNB Wallets:**")
-        for addr in bnb_tracked[:10]:
-            st.code(addr, language=None)
-        if len(bnb_tracked) > 10:
-            st.write(f"... and {len(bnb_tracked) - 10} more")
-    if ada_tracked:
-        st.write("**ADA Wallets:**")
-        for addr in ada_tracked[:10]:
-            st.code(addr, language=None)
-        if len(ada_tracked) > 10:
-            st.write(f"... and {len(ada_tracked) - 10} more")
+    # Only the visible page is built and sent; search goes through each chain's address index.
+    wc1, wc2, wc3, wc4 = st.columns([1, 2, 1, 1])
+    wallet_chain = wc1.selectbox("Chain", ["all", "btc", "eth", "xrp", "bnb", "ada"], key="wallet_chain")
+    wallet_search = wc2.text_input("Address starts with", key="wallet_search")
+    wallet_sort = wc3.selectbox("Sort by", ["balance", "added_at", "last_seen", "address", "label"], key="wallet_sort")
+    wallet_page_no = wc4.number_input("Page", min_value=1, value=1, step=1, key="wallet_page")
+    wallets_view, wallets_total, wallet_pages = wallet_page(
+        tracked_wallets, whale_balances, chain=None if wallet_chain == "all" else wallet_chain,
+        search=wallet_search, page=wallet_page_no, page_size=PAGE_SIZE_DEFAULT, sort_by=wallet_sort,
+        descending=wallet_sort in ("balance", "added_at", "last_seen"))
+    if wallets_total:
+        st.dataframe(wallets_view, use_container_width=True, hide_index=True)
+        st.caption(f"{wallets_total} wallet(s) · page {min(wallet_page_no, wallet_pages)} of {wallet_pages}")
+    else:
+        st.info("No tracked wallets match.")
+    
+    daemon = whale_daemon_status(snapshot_store)
+    if daemon_alive(snapshot_store, profile=profile):
+        st.write(f"Whale daemon: running (pid {daemon.get('pid')}, last poll {int(time.time() - daemon['last_poll'])}s ago, "
+                 f"{daemon.get('addresses', 0)} wallets)")
+    elif daemon_alive(snapshot_store):
+        st.write(f"Whale daemon: running, but not for profile '{profile}' — balances are polled while this page is open. "
+                 f"Start it with `--profile {profile}` (or without --profile) to cover this profile.")
+    else:
+        st.write("Whale daemon: not running — balances are polled while this page is open. "
+                 "Start `python -m chainguardian.whale_daemon` to keep them fresh in the background.")
     
     st.subheader("🐋 Top Tracked Wallets by Balance")
-    top_wallets = []
-    for coin, addrs in account_data.get('tracked_addresses', {}).items():
-        for addr in addrs:
-            if coin == "btc":
-                bal = _blockchair_balance_btc(addr)
-                unit = "BTC"
-            elif coin == "eth":
-                bal = _blockchair_balance_eth(addr)
-                unit = "ETH"
-            elif coin == "xrp":
-                bal = _blockchair_balance_xrp(addr)
-                unit = "XRP"
-            elif coin == "bnb":
-                bal = _blockchair_balance_bnb(addr)
-                unit = "BNB"
-            elif coin == "ada":
-                bal = _blockchair_balance_ada(addr)
-                unit = "ADA"
-            else:
-                continue
-            if bal and bal > 0:
-                top_wallets.append((f"{coin.upper()} {addr[:8]}…", bal, unit))
+    # Served from the snapshot-backed leaderboard: no balance lookups happen here.
+    board = leaderboard_for(snapshot_store, LEADERBOARD_SIZE, addresses=tracked_keys)
+    pending = sum(1 for bals in whale_balances.values() for bal in bals.values() if bal == PENDING)
+    if pending:
+        st.caption(f"{pending} wallet(s) still pending — they will appear on a later refresh.")
     
+    top_wallets = board.top()
     if top_wallets:
-        top_wallets.sort(key=lambda x: x[1], reverse=True)
-        for name, bal, unit in top_wallets[:10]:
-            st.metric(name, f"{bal:.4f} {unit}")
+        for chain, addr, bal in top_wallets:
+            st.metric(f"{chain.upper()} {addr[:8]}…", f"{bal:.4f} {chain.upper()}")
     else:
         st.info("No wallet balances available or tracked.")
     
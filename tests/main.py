@@ -11,6 +11,10 @@ from .thresholds import profit_take_signal, fear_buy_signal
 from .top_wallets import get_whale_activity
 from .config import REFRESH_SECONDS_DEFAULT, DEFAULT_QUOTE, PROFIT_PCT_DEFAULT
 from .rtc import now_str
+from chainguardian.whale_daemon import daemon_balances
+from chainguardian.thresholds import profit_take_table
+from chainguardian.polling import price_scheduler_for, scheduled_prices
+from chainguardian.candles import candle_store
 
 import threading
 import time
@@ -259,17 +263,23 @@ class ChainGuardianApp(tk.Tk):
 
         bases = list({ (a.split("/")[0].upper() if "/" in a else a.upper()) for a in df["asset"].astype(str).unique() }) if not df.empty else []
         bases_lower = [b.lower() for b in bases]
+        # Only assets whose own refresh interval has elapsed are re-fetched (one batched call).
+        scheduler = price_scheduler_for("USD", default=self.refresh_seconds)
         def provider(symbols_lower):
-            data = prices_coingecko(symbols_lower)
+            data = scheduled_prices(scheduler, lambda due: candle_store().record(prices_coingecko(due)), symbols_lower)
             return data
 
         stats = self.portfolio.compute_stats(provider, default_quote=self.store.get("settings", {}).get("default_quote", DEFAULT_QUOTE))
         fng = fetch_fear_greed()
-        whales = get_whale_activity(self.store)
+        # Read whale balances from the whale daemon's snapshots when it is running.
+        tracked = self.store.get("tracked_addresses", {})
+        whales = get_whale_activity(self.store, balances=daemon_balances(tracked))
 
-        self.after(0, lambda: self._update_ui(stats, fng, whales))
+        take_profit = profit_take_table(stats, self.store.get("settings", {}).get("profit_pct_to_take", PROFIT_PCT_DEFAULT))
 
-    def _update_ui(self, stats, fng, whale_lines):
+        self.after(0, lambda: self._update_ui(stats, fng, whales, take_profit))
+
+    def _update_ui(self, stats, fng, whale_lines, take_profit):
         # Portfolio table and summary
         for r in self.table.get_children():
             self.table.delete(r)
@@ -288,8 +298,8 @@ class ChainGuardianApp(tk.Tk):
             chg = s.get("change_24h", None)
             chg_str = f"{chg:.2f}%" if isinstance(chg, (int,float)) else "—"
 
-            signal, qty_to_sell = profit_take_signal(s, profit_pct=self.store.get("settings", {}).get("profit_pct_to_take", PROFIT_PCT_DEFAULT))
-            note = f"Take-profit: sell {qty_to_sell:.6f}" if signal else ""
+            tp = take_profit.loc[sym]
+            note = f"Take-profit: sell {tp['sell_qty']:.6f}" if tp["signal"] else ""
 
             self.table.insert("", "end", values=[
                 sym, f"{qty:.6f}", f"{avg:.4f}", f"{cur:.4f}", chg_str,
@@ -0,0 +1,35 @@
+from chainguardian.addresses import TrackedAddresses, normalize_address, tracked_for
+
+ETH = "0xde0B295669a9FD93d5F28D9Ec85E40f4cb697BAe"
+
+def test_normalized_dedup_and_order():
+    account = {"tracked_addresses": {"eth": [ETH, ETH.lower()], "btc": ["bc1qxy2kgdygjrsqtzq2n0yrf2493p83kkfjhx0wlh", "1BoatSLRHtKNngkdXEeobR76b53LETtpyT"]}}
+    tracked = TrackedAddresses.from_store(account)
+    assert tracked["eth"].addresses() == [ETH.lower()]
+    added, invalid = tracked.add("btc", ["1BoatSLRHtKNngkdXEeobR76b53LETtpyT", "not-an-address", "BC1QXY2KGDYGJRSQTZQ2N0YRF2493P83KKFJHX0WLH"], label="x")
+    assert added == [] and invalid == ["not-an-address"]
+    assert ETH.upper().replace("0X", "0x") in tracked["eth"]
+    tracked.record_balances({"eth": {ETH: 12.5}})
+    tracked.save_to(account)
+    assert account["tracked_addresses"]["btc"][0].startswith("bc1q")
+    assert account["tracked_meta"]["eth"][ETH.lower()]["last_balance"] == 12.5
+    assert normalize_address("xrp", "rEb8TK3gBgk5auZkwc6sHnwrGVJH8DuaLh") == "rEb8TK3gBgk5auZkwc6sHnwrGVJH8DuaLh"
+
+def test_tracked_for_reuses_the_index_until_the_lists_change():
+    account = {"tracked_addresses": {"eth": [ETH.lower()]}}
+    tracked = tracked_for("p:test", account)
+    tracked.record_balances({"eth": {ETH.lower(): 3.0}})
+    assert tracked_for("p:test", account) is tracked  # a rerun keeps the recorded balance
+    assert tracked["eth"].meta(ETH)["last_balance"] == 3.0
+    tracked.add("btc", ["1BoatSLRHtKNngkdXEeobR76b53LETtpyT"])
+    tracked.save_to(account)
+    rebuilt = tracked_for("p:test", account)
+    assert rebuilt is not tracked and rebuilt["eth"].meta(ETH)["last_balance"] == 3.0
+    assert "1BoatSLRHtKNngkdXEeobR76b53LETtpyT" in rebuilt["btc"]
+
+def test_mistyped_checksum_address_is_rejected():
+    assert normalize_address("eth", "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed") == "0x5aaeb6053f3e94c9b9a09f33669435e7ef1beaed"
+    assert normalize_address("eth", "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAeD") is None  # one letter's case is off
+    assert normalize_address("bnb", "0x5AAEB6053F3E94C9B9A09F33669435E7EF1BEAED") is not None  # no checksum to check
+    added, invalid = TrackedAddresses().add("eth", ["0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAeD"])
+    assert added == [] and invalid == ["0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAeD"]
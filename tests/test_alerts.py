@@ -0,0 +1,33 @@
+import pandas as pd
+from chainguardian.alerts import AlertEngine, alert_inputs, engine_for
+from chainguardian.metrics import TOTAL
+
+def test_rules_fire_on_edges_and_only_changed_inputs_are_checked():
+    rules = [{"id": 1, "kind": "price_above", "asset": "btc", "value": 100.0},
+             {"id": 2, "kind": "price_below", "asset": "BTC", "value": 50.0},
+             {"id": 3, "kind": "pct_move", "asset": "ETH", "value": 10.0, "window": "7d"},
+             {"id": 4, "kind": "rsi_below", "asset": "ETH", "value": 30.0, "enabled": False}]
+    engine = AlertEngine(rules)
+    assert len(engine) == 3
+    fired = engine.update(alert_inputs({"BTC": {"current_price": 120.0}, "ETH": {"current_price": 1.0, "change_7d": -12.5}}))
+    assert sorted(e["rule"]["id"] for e in fired) == [1, 3]
+    assert engine.update({("price", "BTC"): 130.0}) == []          # still above: no repeat
+    assert engine.update({("price", "BTC"): 90.0}) == []           # re-arms
+    assert [e["rule"]["id"] for e in engine.update({("price", "BTC"): 40.0})] == [2]
+    assert [e["rule"]["id"] for e in engine.update({("price", "BTC"): 101.0})] == [1]
+
+def test_many_rules_share_one_compare_and_state_survives_edits():
+    rules = [{"id": i, "kind": "price_above", "asset": "BTC", "value": float(i)} for i in range(5000)]
+    engine = engine_for("t", rules)
+    assert len(engine.update({("price", "BTC"): 2499.5})) == 2500
+    assert engine.active.sum() == 2500
+    edited = engine_for("t", rules + [{"id": -1, "kind": "drawdown", "asset": "portfolio", "value": 20.0}])
+    assert edited is not engine and edited.update({("price", "BTC"): 2499.5}) == []
+    assert len(edited.history) == edited.history.maxlen  # log carried over (bounded)
+
+def test_drawdown_rule_clears_after_recovery():
+    engine = AlertEngine([{"id": 1, "kind": "drawdown", "asset": "portfolio", "value": 20.0}])
+    perf = lambda current: pd.DataFrame({"max_drawdown": [-0.5], "drawdown": [current]}, index=[TOTAL])
+    assert [e["rule"]["id"] for e in engine.update(alert_inputs({}, perf=perf(-0.3)))] == [1]
+    assert engine.update(alert_inputs({}, perf=perf(0.0))) == [] and not engine.active[0]  # recovered: re-armed
+    assert [e["rule"]["id"] for e in engine.update(alert_inputs({}, perf=perf(-0.25)))] == [1]
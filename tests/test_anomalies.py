@@ -0,0 +1,48 @@
+import numpy as np
+from chainguardian.anomalies import rolling_zscore, detect_anomalies
+from chainguardian.snapshots import SnapshotStore
+from chainguardian.thresholds import whale_flow_signal
+
+def test_rolling_zscore_matches_per_group_loop():
+    rng = np.random.default_rng(0)
+    groups = np.repeat([1, 2, 3], [30, 5, 40])
+    values = rng.normal(size=len(groups))
+    z = rolling_zscore(groups, values, window=10, min_periods=3)
+    for i in range(len(values)):
+        start = np.flatnonzero(groups == groups[i])[0]
+        prev = values[max(start, i - 10):i]
+        if len(prev) < 3:
+            assert np.isnan(z[i])
+        else:
+            assert np.isclose(z[i], (values[i] - prev.mean()) / prev.std())
+
+def test_detect_anomalies_flags_spikes(tmp_path):
+    store = SnapshotStore(str(tmp_path), heartbeat=0)
+    rng = np.random.default_rng(1)
+    bal = {"a": 1000.0, "x": 5000.0}
+    for t in range(30):
+        bal["a"] += rng.normal()
+        bal["x"] += rng.normal()
+        if t == 29:
+            bal["x"] += 400.0  # deposit into the exchange wallet
+        store.append({"btc": dict(bal)}, ts=1000 + t * 60)
+    found = detect_anomalies(store, since=1000 + 29 * 60, exchanges={("btc", "x")}, window=20, threshold=4.0)
+    assert set(found["kind"]) == {"exchange_inflow", "chain_surge"}
+    assert found.loc[found["kind"] == "exchange_inflow", "address"].tolist() == ["x"]
+    # The chain surge is the same deposit seen in aggregate: the reading is the inflow's.
+    assert whale_flow_signal(found) == {"btc": "bearish"}
+
+def test_flat_history_is_not_flagged():
+    z = rolling_zscore(np.zeros(8, dtype=int), np.array([0.0] * 6 + [0.5, 0.0]), window=5, min_periods=3)
+    assert np.isnan(z[3:7]).all()  # the 0.5 after a flat run is not an infinite z
+    assert np.isfinite(z[7])
+
+def test_small_wallet_behind_a_large_one_keeps_its_scale():
+    rng = np.random.default_rng(2)
+    big, small = rng.normal(0, 5e4, 5000), rng.normal(0, 0.01, 200)
+    small[-1] = 0.2
+    groups = np.repeat([1, 2], [len(big), len(small)])
+    z = rolling_zscore(groups, np.r_[big, small], window=20, min_periods=5)
+    prev = small[-21:-1]
+    assert np.isclose(z[-1], (0.2 - prev.mean()) / prev.std())
+    assert np.isfinite(z[len(big) + 5:]).all()
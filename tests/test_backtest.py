@@ -0,0 +1,33 @@
+import time
+import numpy as np
+import pandas as pd
+from chainguardian.backtest import backtest, TRADE_COLUMNS
+from chainguardian.metrics import TOTAL
+
+def test_take_profit_recovers_principal_and_rides_the_rest():
+    days = pd.date_range("2024-01-01", periods=6, freq="D")
+    prices = pd.DataFrame({"BTC": [100.0, 100.0, 250.0, 400.0, 500.0, 800.0]}, index=days)
+    fng = pd.Series([50, 20, 60, 60, 60, 60], index=days)  # one fear day
+    r = backtest(prices, fng, profit_pct=300.0, buy_amount=100.0, initial=100.0, fee_pct=0.0)
+    trades = r["trades"]
+    assert list(trades.columns) == TRADE_COLUMNS
+    assert trades["reason"].tolist() == ["initial", "fear_buy", "take_profit"]
+    sell = trades.iloc[2]
+    assert sell["date"] == days[3] and abs(sell["value"] - 200.0) < 1e-9  # principal back at +300%
+    s = r["summary"]
+    assert abs(s.loc["BTC", "final_value"] - 1.5 * 800.0) < 1e-9
+    assert abs(s.loc["BTC", "profit"] - (1200.0 + 200.0 - 200.0)) < 1e-9
+    assert abs(s.loc["BTC", "hold_return_pct"] - 700.0) < 1e-9
+    assert s.loc[TOTAL, "sells"] == 1 and abs(r["equity"][TOTAL].iloc[-1] - 1400.0) < 1e-9
+
+def test_multi_year_multi_asset_is_fast():
+    rng = np.random.default_rng(0)
+    days = pd.date_range("2018-01-01", periods=365 * 6, freq="D")
+    prices = pd.DataFrame(np.exp(np.cumsum(rng.normal(0.001, 0.04, (len(days), 20)), axis=0)) * 100,
+                          index=days, columns=[f"A{i}" for i in range(20)])
+    fng = pd.Series(rng.integers(0, 100, len(days)), index=days)
+    t = time.perf_counter()
+    r = backtest(prices, fng, profit_pct=100.0)
+    assert time.perf_counter() - t < 1.0
+    assert r["summary"].loc[TOTAL, "buys"] == (fng <= 25).sum() * 20
+    assert (r["summary"]["max_drawdown"] <= 0).all()
@@ -0,0 +1,8 @@
+from benchmarks.bench_core import run, compare
+
+def test_bench_smoke():
+    doc = run(order_sizes=[50], address_sizes=[5], repeat=1)
+    names = {r["bench"] for r in doc["results"]}
+    assert {"storage.load_store", "Portfolio.compute_stats", "graphs._stats_to_df", "market_data.indicators"} <= names
+    rows, regressed = compare(doc, doc)
+    assert rows and not regressed
@@ -0,0 +1,34 @@
+import os
+from chainguardian.candles import CandleStore, CANDLE_DTYPE
+
+def test_samples_aggregate_into_ohlc_bars(tmp_path):
+    store = CandleStore(str(tmp_path))
+    t0 = 1_700_000_040.0  # on a minute boundary
+    for dt, price in ((0, 10.0), (20, 12.0), (40, 9.0), (59, 11.0), (60, 11.5), (400, 13.0)):
+        store.record({"btc": {"price": price}}, ts=t0 + dt)
+    m1 = store.candles("BTC", "1m")
+    assert len(m1) == 3
+    assert m1.iloc[0][["open", "high", "low", "close", "samples"]].tolist() == [10.0, 12.0, 9.0, 11.0, 4]
+    h1 = store.candles("btc", "1h")
+    assert len(h1) == 1 and h1.iloc[0]["high"] == 13.0 and h1.iloc[0]["close"] == 13.0
+    assert store.history("BTC", "5m")[-1] == [int((t0 + 400) // 300 * 300 * 1000), 13.0]
+    # Persisted: a fresh store reads the same bars back.
+    assert CandleStore(str(tmp_path)).candles("BTC", "1m").equals(m1)
+
+def test_ring_overwrites_oldest_bars_without_growing(tmp_path):
+    store = CandleStore(str(tmp_path), resolutions={"1m": 60}, capacity={"1m": 10})
+    for i in range(25):
+        store.add("ETH", 100.0 + i, ts=60.0 * (i + 1))
+    store.add("ETH", 1.0, ts=60.0)  # older than the ring's span: ignored
+    bars = store.candles("ETH", "1m")
+    assert len(bars) == 10 and bars["close"].tolist() == [115.0 + i for i in range(10)]
+    assert os.path.getsize(tmp_path / "ETH_1m.bin") == 10 * CANDLE_DTYPE.itemsize
+    assert store.candles("XRP", "1m").empty and store.history("XRP", "1m") == []
+
+def test_contiguous_history_starts_after_the_last_gap(tmp_path):
+    store = CandleStore(str(tmp_path), resolutions={"1h": 3600}, capacity={"1h": 100})
+    for h in list(range(1, 20)) + list(range(30, 36)):  # the app was off for hours 20-29
+        store.add("BTC", 100.0 + h, ts=3600.0 * h + 5)
+    assert len(store.history("BTC", "1h")) == 25
+    run = store.history("BTC", "1h", contiguous=True)
+    assert [t // 3_600_000 for t, _ in run] == list(range(30, 36))
@@ -0,0 +1,41 @@
+import json
+import time
+from chainguardian import discovery
+from chainguardian.discovery import DiscoveryCache
+
+class _Resp:
+    def __init__(self, payload):
+        self.payload = payload
+    def raise_for_status(self):
+        pass
+    def json(self):
+        return self.payload
+
+def test_rich_list_paginates(monkeypatch):
+    calls = []
+    def fake_get(url, params=None, timeout=None):
+        calls.append(params["offset"])
+        rows = [{"address": f"a{params['offset'] + i}", "balance": 10 ** 8} for i in range(params["limit"])]
+        return _Resp({"data": rows[:max(0, 250 - params["offset"])]})
+    monkeypatch.setattr(discovery.requests, "get", fake_get)
+    entries = discovery.fetch_rich_list("btc", 1000)
+    assert calls == [0, 100, 200]  # third page comes back short: stop
+    assert len(entries) == 250 and entries[-1] == {"rank": 250, "address": "a249", "balance": 1.0}
+
+def test_cache_serves_from_disk_and_refreshes_stale_in_background(tmp_path):
+    fetches = []
+    def fake_fetch(chain, n):
+        fetches.append((chain, n))
+        return [{"rank": i + 1, "address": f"{chain}{i}", "balance": 1.0} for i in range(n)]
+    cache = DiscoveryCache(str(tmp_path), ttl=3600, fetch=fake_fetch)
+    assert cache.addresses("eth", 3) == ["eth0", "eth1", "eth2"]
+    assert cache.addresses("eth", 2) == ["eth0", "eth1"] and len(fetches) == 1
+    # Age the file past the TTL: the stale list is returned at once and refreshed behind it.
+    path = tmp_path / "eth.json"
+    data = json.loads(path.read_text())
+    data["fetched_at"] = time.time() - 7200
+    path.write_text(json.dumps(data))
+    assert cache.addresses("eth", 3) == ["eth0", "eth1", "eth2"]
+    cache._refreshing["eth"].join(timeout=5)
+    assert fetches == [("eth", 3), ("eth", 3)]
+    assert time.time() - cache.load("eth")["fetched_at"] < 60
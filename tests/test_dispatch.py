@@ -0,0 +1,54 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+from chainguardian.dispatch import AlertDispatcher, FileSink, SocketSink, sinks_from_settings
+
+class _SlowSink:
+    name = "slow"
+    async def send(self, batch):
+        await asyncio.sleep(5)
+
+def _event(rule_id, msg="x"):
+    return {"rule": {"id": rule_id}, "key": ("price", "BTC"), "value": 1.0, "ts": time.time(), "message": msg}
+
+def test_dispatch_batches_dedups_and_isolates_slow_sinks(tmp_path):
+    path = tmp_path / "alerts.jsonl"
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+    received = []
+    def serve():
+        conn, _ = server.accept()
+        with conn:
+            received.append(conn.makefile().read())
+    threading.Thread(target=serve, daemon=True).start()
+
+    sinks = [FileSink(str(path)), SocketSink(*server.getsockname()), _SlowSink()]
+    d = AlertDispatcher(sinks, cooldown=60, batch_window=0.2, sink_timeout=0.5)
+    t = time.perf_counter()
+    assert d.submit(_event(1, "a")) and d.submit(_event(2, "b"))
+    assert not d.submit(_event(1, "a again"))  # same rule inside the cooldown
+    assert time.perf_counter() - t < 0.05      # submit never waits on delivery
+    assert d.flush(timeout=3)
+    stats = d.stats()
+    assert stats["submitted"] == 3 and stats["deduped"] == 1 and stats["batches"] == 1
+    assert stats["sinks"] == {"file": {"delivered": 2, "failed": 0}, "socket": {"delivered": 2, "failed": 0},
+                              "slow": {"delivered": 0, "failed": 2}}
+    assert stats["latency_p50"] is not None and stats["latency_p50"] < 1.0
+    assert [json.loads(l)["message"] for l in path.read_text().splitlines()] == ["a", "b"]
+    assert len(received[0].splitlines()) == 2
+    d.close()
+
+def test_sinks_from_settings_skips_bad_entries(tmp_path):
+    sinks = sinks_from_settings([{"type": "file", "path": str(tmp_path / "a")}, {"type": "webhook"}, {"type": "pager"}])
+    assert [s.name for s in sinks] == ["file"]
+
+def test_sinks_of_one_type_are_counted_separately(tmp_path):
+    bad = tmp_path / "missing" / "alerts.jsonl"  # parent doesn't exist: every write fails
+    d = AlertDispatcher([FileSink(str(tmp_path / "a.jsonl")), FileSink(str(bad))], batch_window=0.05)
+    d.submit(_event(1))
+    assert d.flush(timeout=3)
+    assert d.stats()["sinks"] == {"file": {"delivered": 1, "failed": 0}, "file#2": {"delivered": 0, "failed": 1}}
+    d.close()
@@ -0,0 +1,55 @@
+import numpy as np
+from chainguardian.indicators import indicators_for, _states
+from chainguardian.market_data import calculate_rsi, calculate_macd, calculate_sma, calculate_ema
+
+def _close(a, b):
+    return (a is None and b is None) or abs(a - b) < 1e-9 * max(1.0, abs(b))
+
+def test_incremental_matches_full_recompute():
+    rng = np.random.default_rng(3)
+    prices = (100 * np.exp(np.cumsum(rng.normal(0, 0.03, 120)))).tolist()
+    hist = [[86_400_000 * i, p] for i, p in enumerate(prices)]
+    for n in range(2, len(hist) + 1):
+        got = indicators_for("btc", "usd", hist[:n])
+        series = prices[:n]
+        macd, signal, histo = calculate_macd(series)
+        assert _close(got["rsi"], calculate_rsi(series))
+        assert _close(got["macd"], macd) and _close(got["signal"], signal) and _close(got["histogram"], histo)
+        assert _close(got["sma"], calculate_sma(series, 20)) and _close(got["ema"], calculate_ema(series, 20))
+    state = _states[("BTC", "USD", (14, 12, 26, 9, 20, 20))]
+    assert state.pushed == len(hist) - 1  # every candle committed exactly once
+
+def test_live_point_is_peeked_and_gaps_rebuild():
+    hist = [[i, 100.0 + i] for i in range(60)]
+    first = indicators_for("eth", "usd", hist)
+    state = _states[("ETH", "USD", (14, 12, 26, 9, 20, 20))]
+    # The live price moves but no candle closed: nothing is committed, and repeats hit the memo.
+    moved = indicators_for("eth", "usd", hist[:-1] + [[59, 120.0]])
+    assert state.pushed == 59 and moved["sma"] != first["sma"]
+    assert indicators_for("eth", "usd", hist[:-1] + [[59, 120.0]]) is moved
+    # A history that skips past the last committed candle starts over.
+    indicators_for("eth", "usd", [[i, 50.0] for i in range(100, 160)])
+    assert _states[("ETH", "USD", (14, 12, 26, 9, 20, 20))] is not state
+
+def test_concurrent_reruns_push_each_candle_once(monkeypatch):
+    import threading
+    import time
+    from chainguardian.indicators import IndicatorState
+    push = IndicatorState.push
+    def slow_push(self, ts, price):
+        time.sleep(0.0005)  # widen the window between reading last_ts and committing the candle
+        push(self, ts, price)
+    monkeypatch.setattr(IndicatorState, "push", slow_push)
+    hist = [[i, 100.0 + (i % 7)] for i in range(40)]
+    indicators_for("ada", "usd", hist[:30])
+    barrier = threading.Barrier(4)
+    def rerun():
+        barrier.wait()
+        for n in range(31, len(hist) + 1):
+            indicators_for("ada", "usd", hist[:n])
+    threads = [threading.Thread(target=rerun) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert _states[("ADA", "USD", (14, 12, 26, 9, 20, 20))].pushed == len(hist) - 1
@@ -0,0 +1,34 @@
+import heapq
+from chainguardian.leaderboard import Leaderboard, leaderboard_for
+from chainguardian.snapshots import SnapshotStore
+
+def test_leaderboard_incremental_matches_full_sort():
+    board = Leaderboard(3)
+    board.update({"btc": {"a": 10.0, "b": 5.0, "c": "pending"}, "eth": {"x": 100.0, "y": 1.0}})
+    assert board.top() == [("eth", "x", 100.0), ("btc", "a", 10.0), ("btc", "b", 5.0)]
+    # A member drops out of the top 3; the next-best known balance takes its place.
+    board.update({"eth": {"x": 0.5}})
+    assert board.top() == [("btc", "a", 10.0), ("btc", "b", 5.0), ("eth", "y", 1.0)]
+    board.update({"btc": {"c": 7.0}})
+    expected = heapq.nlargest(3, ((b, c, a) for (c, a), b in board.balances.items()))
+    assert board.top() == [(c, a, b) for b, c, a in expected]
+
+def test_leaderboard_catches_up_from_snapshots(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    store.append({"btc": {"a": 1.0, "b": 2.0}}, ts=1000)
+    board = leaderboard_for(store, 2)
+    assert board.top() == [("btc", "b", 2.0), ("btc", "a", 1.0)]
+    store.append({"btc": {"a": 3.0}, "eth": {"x": 2.5}}, ts=2000)
+    assert leaderboard_for(SnapshotStore(str(tmp_path)), 2) is board
+    assert board.top() == [("btc", "a", 3.0), ("eth", "x", 2.5)]
+    assert board.offset == 4
+
+def test_leaderboard_and_flows_only_cover_tracked_wallets(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    store.append({"btc": {"mine": 1.0, "theirs": 50.0}}, ts=1000)
+    store.append({"btc": {"mine": 2.0, "theirs": 10.0}}, ts=2000)
+    mine = {("btc", "mine")}
+    assert leaderboard_for(store, 5, addresses=mine).top() == [("btc", "mine", 2.0)]
+    assert leaderboard_for(store, 5).top()[0] == ("btc", "theirs", 10.0)
+    assert store.net_flows(addresses=mine).loc["btc", "net"] == 1.0
+    assert list(store.top_movers(addresses=mine)["address"]) == ["mine"]
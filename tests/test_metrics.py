@@ -0,0 +1,27 @@
+import pandas as pd
+from chainguardian.metrics import performance_metrics, cached_performance_metrics, TOTAL
+
+def test_twr_xirr_drawdown():
+    days = pd.date_range("2024-01-01", periods=366, freq="D")
+    prices = pd.DataFrame({"BTC": [100.0] * 100 + [50.0] * 100 + [200.0] * 166}, index=days)
+    orders = [{"id": 1, "asset": "BTC/USD", "side": "buy", "amount": 1.0, "price": 100.0,
+               "timestamp": "2024-01-01T00:00:00+00:00"}]
+    m = performance_metrics(orders, prices, default_quote="USD")
+    assert abs(m.loc["BTC", "twr"] - 1.0) < 1e-9
+    assert abs(m.loc["BTC", "max_drawdown"] + 0.5) < 1e-9
+    assert m.loc["BTC", "drawdown"] == 0.0  # recovered to a new high
+    assert abs(m.loc["BTC", "xirr"] - 1.0) < 1e-4  # doubled over one year
+    assert abs(m.loc[TOTAL, "twr"] - 1.0) < 1e-9
+    assert cached_performance_metrics("main", orders, prices, default_quote="USD") is \
+        cached_performance_metrics("main", orders, prices, default_quote="USD")
+
+def test_flows_in_other_quotes_are_converted():
+    days = pd.date_range("2024-01-01", periods=3, freq="D")
+    prices = pd.DataFrame({"BTC": [100.0, 100.0, 110.0]}, index=days)
+    orders = [{"id": 1, "asset": "BTC/USD", "side": "buy", "amount": 1.0, "price": 100.0, "timestamp": "2024-01-01"},
+              {"id": 2, "asset": "BTC/EUR", "side": "buy", "amount": 1.0, "price": 80.0, "timestamp": "2024-01-02"}]
+    rates = {"btc": 1.0, "usd": 100.0, "eur": 80.0}  # 1 EUR = 1.25 USD: the EUR buy cost 100 USD
+    m = performance_metrics(orders, prices, default_quote="USD", rates=rates)
+    assert abs(m.loc[TOTAL, "twr"] - 0.10) < 1e-9  # flat, then +10%; the EUR buy is no 20% gain
+    no_fx = performance_metrics(orders, prices, default_quote="USD", rates={"btc": 1.0, "usd": 100.0})
+    assert abs(no_fx.loc[TOTAL, "twr"] - 0.10) < 1e-9  # unknown EUR rate: that lot is left out
@@ -0,0 +1,60 @@
+from chainguardian.orders import OrderTable
+from chainguardian.portfolio import Portfolio
+
+ORDERS = [
+    {"id": "1", "asset": "BTC/USDT", "side": "buy", "amount": "2", "price": 100.0, "exchange": "kraken",
+     "timestamp": "2024-01-01T00:00:00+00:00", "note": "", "status": "recorded"},
+    {"id": 2, "asset": "BTC/USDT", "side": "sell", "amount": 0.5, "price": 150.0, "exchange": "",
+     "timestamp": "2024-01-02T00:00:00+00:00", "note": "trim", "status": "recorded"},
+    {"id": "x-3", "asset": "eth", "side": "buy", "amount": 1.0, "price": 10.0, "exchange": "binance"},
+]
+
+def test_order_table_round_trip_and_size():
+    table = OrderTable.from_records(ORDERS)
+    assert table.data.itemsize < 64
+    recs = table.to_records()
+    assert [r["id"] for r in recs] == ["1", 2, "x-3"]
+    assert recs[0]["amount"] == 2.0 and recs[1]["note"] == "trim"
+    assert recs[1]["timestamp"].startswith("2024-01-02T00:00:00")
+
+def test_compute_stats_from_table():
+    store = {"orders": list(ORDERS)}
+    p = Portfolio(store)
+    stats = p.compute_stats(lambda syms: {"btc": {"price": 400.0}, "eth": {"price": 20.0}})
+    assert stats["BTC"]["remaining_qty"] == 1.5
+    assert stats["BTC"]["avg_buy"] == 100.0 and stats["BTC"]["exchange"] == "kraken"
+    p.add_order({"id": 4, "asset": "ETH", "side": "buy", "amount": 1.0, "price": 30.0})
+    assert len(p.orders) == 4 and p.compute_stats(lambda syms: {})["ETH"]["avg_buy"] == 20.0
+
+def test_order_ids_and_unknown_fields_survive():
+    orders = [
+        {"id": "123", "asset": "BTC", "side": "buy", "amount": 1.0, "price": 1.0},
+        {"id": "007", "asset": "BTC", "side": "buy", "amount": 1.0, "price": 1.0},
+        {"id": "98765432109876543210987", "asset": "BTC", "side": "buy", "amount": 1.0, "price": 1.0,
+         "fill_id": "f-1"},
+        {"id": 2.5, "asset": "BTC", "side": "sell", "amount": 1.0, "price": 1.0},
+        {"id": 10 ** 30, "asset": "BTC", "side": "sell", "amount": 1.0, "price": 1.0, "tag": "x"},
+    ]
+    table = OrderTable.from_records(orders)
+    ids = ["123", "007", "98765432109876543210987", 2.5, 10 ** 30]
+    assert [r["id"] for r in table.to_records()] == ids
+    assert table.to_records()[2]["fill_id"] == "f-1"
+    frame = table.frame()
+    assert frame["id"].tolist() == ids
+    assert frame["fill_id"].iloc[2] == "f-1" and frame["fill_id"].drop(2).isna().all()
+    assert table.take([4])["tag"].tolist() == ["x"]
+
+def test_side_and_timestamp_round_trip_verbatim():
+    orders = [
+        {"id": 1, "asset": "BTC", "side": "BUY", "amount": 1.0, "price": 1.0, "timestamp": "2024-01-01T00:00:00.123456"},
+        {"id": 2, "asset": "BTC", "side": "sell", "amount": 1.0, "price": 1.0, "timestamp": 1704153600000},
+        {"id": 3, "asset": "BTC", "side": "buy", "amount": 1.0, "price": 1.0, "timestamp": "2024-01-03T00:00:00+00:00"},
+        {"id": 4, "asset": "BTC", "side": "transfer", "amount": 1.0, "price": 1.0, "timestamp": "yesterday"},
+    ]
+    table = OrderTable.from_records(orders)
+    recs = table.to_records()
+    assert [(r["side"], r["timestamp"]) for r in recs] == [(o["side"], o["timestamp"]) for o in orders]
+    assert 2 not in table.extras  # canonical values stay packed only
+    assert table.data["side"].tolist() == [1, -1, 1, 0]
+    assert table.frame()["side"].tolist() == ["BUY", "sell", "buy", "transfer"]
+    assert table.take([1])["timestamp"].tolist() == [1704153600000]
@@ -0,0 +1,93 @@
+from chainguardian import polling, top_wallets
+from chainguardian.polling import PollScheduler, poll_balances, PriceScheduler, scheduled_prices, realized_volatility
+from chainguardian.top_wallets import PENDING
+
+class _Resp:
+    def __init__(self, payload):
+        self.payload = payload
+    def raise_for_status(self):
+        pass
+    def json(self):
+        return self.payload
+
+def test_scheduler_backs_off_unchanged_and_resets_on_change():
+    sched = PollScheduler(hot=60, cold=600)
+    tracked = {"eth": ["a", "b"]}
+    assert sched.due(tracked, now=0) == {"eth": ["a", "b"]}
+    sched.record({"eth": {"a": 1.0, "b": 2.0}}, now=0)
+    assert sched.due(tracked, now=59) == {}
+    sched.record({"eth": {"a": 1.0, "b": 3.0}}, now=60)  # a unchanged -> 120s, b changed -> 60s
+    assert sched.due(tracked, now=120) == {"eth": ["b"]}
+    for t in (180, 420, 900):
+        sched.record({"eth": {"a": 1.0}}, now=t)
+    assert sched.state[("eth", "a")]["interval"] == 600  # capped at cold
+    sched.record({"eth": {"b": None}}, now=200)
+    sched.record({"eth": {"b": None}}, now=320)
+    assert sched.state[("eth", "b")]["next_due"] == 320 + 240  # error backoff: hot * 2**failures
+    assert sched.balances({"eth": ["a", "b", "c"]}) == {"eth": {"a": 1.0, "b": 3.0, "c": PENDING}}
+
+def test_poll_skips_chain_without_new_block(monkeypatch):
+    calls = []
+    def fake_get(url, params=None, timeout=None):
+        calls.append(url)
+        if url.endswith("/stats"):
+            return _Resp({"data": {"best_block_height": 800000}})
+        addrs = url.split("/")[-1].split(",")
+        return _Resp({"data": {"addresses": {a: {"balance": 100_000_000} for a in addrs}}})
+    monkeypatch.setattr(top_wallets.requests, "get", fake_get)
+    tracked = {"btc": [f"bc1q{i:04d}" for i in range(250)]}
+    sched = PollScheduler(hot=60, cold=600)
+    balances, fetched = poll_balances(sched, tracked, now=0)
+    assert len(calls) == 1 + 3 and balances["btc"]["bc1q0000"] == 1.0
+    calls.clear()
+    balances, fetched = poll_balances(sched, tracked, now=60)  # same height: one probe, no balance calls
+    assert calls == ["https://api.blockchair.com/bitcoin/stats"] and fetched == {}
+    assert balances["btc"]["bc1q0249"] == 1.0 and sched.due(tracked, now=100) == {}
+
+def test_height_waits_for_pending_wallets(monkeypatch):
+    tracked = {"btc": [f"bc1q{i:04d}" for i in range(250)]}
+    sched = PollScheduler(hot=60, cold=600)
+    sched.seed({("btc", a): (0.0, 1.0) for a in tracked["btc"]}, now=0)
+    sched.heights["btc"] = 800000
+    asked = []
+    def fetch(due, api_keys, deadline):
+        asked.append(len(due.get("btc", [])))
+        # A new block; the last batch is still in flight at the deadline.
+        return {"btc": {a: (PENDING if i >= 200 else 2.0) for i, a in enumerate(due["btc"])} if len(asked) == 1
+                else {a: 2.0 for a in due["btc"]}}
+    monkeypatch.setattr(polling, "chain_height", lambda chain: 800001)
+    monkeypatch.setattr(polling, "fetch_balances", fetch)
+    poll_balances(sched, tracked, now=60)
+    assert sched.heights["btc"] == 800000  # not every wallet was read at the new height
+    balances, fetched = poll_balances(sched, tracked, now=61)  # same height, but the pending ones are re-read
+    assert len(fetched["btc"]) == 50 and balances["btc"]["bc1q0249"] == 2.0
+
+def test_price_scheduler_polls_by_volatility_and_trigger_distance():
+    sched = PriceScheduler(default=60, min_interval=15, max_interval=900, move_pct=0.5)
+    calls = []
+    def provider(syms):
+        calls.append(sorted(syms))
+        return {s: {"price": {"btc": 100.0, "usdt": 1.0, "doge": 0.1}[s], "change_24h": 0.0} for s in syms}
+    syms = ["btc", "usdt", "doge"]
+    assert scheduled_prices(sched, provider, syms, now=0)["usdt"]["price"] == 1.0
+    assert calls == [["btc", "doge", "usdt"]]  # one batched call
+    sched.set_volatility({"btc": 0.03, "usdt": 0.0, "doge": 0.08})
+    assert sched.interval("usdt") == 900
+    assert sched.interval("btc") == 900  # 2400s, capped
+    assert sched.interval("doge") == 337.5
+    sched.set_triggers({"BTC": [100.2]})  # 0.2% away: target 0.1% move
+    assert abs(sched.interval("btc") - 86400 * (0.001 / 0.03) ** 2) < 1e-9
+    scheduled_prices(sched, provider, syms, now=100)
+    assert calls[-1] == ["btc"]  # doge is not yet past half its interval
+    scheduled_prices(sched, provider, syms, now=250)
+    assert calls[-1] == ["btc", "doge"]  # btc due again, doge rides along
+    assert len(calls) == 3 and sched.next_due(["usdt"]) == 900
+    vol = sched.state["btc"]["vol"]
+    sched.set_volatility({"btc": 0.5})  # a rerun's history seed doesn't undo the EWMA updates
+    assert sched.state["btc"]["vol"] == vol
+
+def test_realized_volatility_scales_to_daily():
+    hourly = [[3_600_000 * i, 100.0 * (1.01 if i % 2 else 1.0)] for i in range(49)]
+    vol = realized_volatility(hourly)
+    assert vol is not None and 0.04 < vol < 0.06  # ~1% hourly swings -> ~5% a day
+    assert realized_volatility([[0, 1.0]]) is None
@@ -0,0 +1,29 @@
+import pandas as pd
+from chainguardian.rebalance import plan_rebalance
+
+def test_rebalance_bands_fees_and_min_notional():
+    pos = pd.DataFrame([
+        {"asset": "BTC", "qty": 1.0, "price": 800.0, "exchange": "kraken"},
+        {"asset": "ETH", "qty": 1.0, "price": 200.0, "exchange": "kraken"},
+        {"asset": "XRP", "qty": 5.0, "price": 1.0, "exchange": "kraken"},
+    ])
+    trades = plan_rebalance(pos, {"BTC": 50.0, "ETH": 49.5, "XRP": 0.5}, fees={"kraken": 0.01}, band_pct=1.0)
+    by_asset = trades.set_index("asset")
+    assert by_asset.loc["BTC", "side"] == "sell"
+    assert "XRP" not in by_asset.index  # drift inside the band
+    # buy is funded only by net sell proceeds, never more
+    assert by_asset.loc["ETH", "notional"] * 1.01 <= by_asset.loc["BTC", "notional"] * 0.99 + 1e-9
+
+def test_dropped_sells_do_not_fund_buys():
+    pos = pd.DataFrame([
+        {"asset": "BTC", "qty": 1.0, "price": 100.0, "exchange": "tiny"},  # sell of 10 < min notional
+        {"asset": "ETH", "qty": 1.0, "price": 10.0, "exchange": "big"},
+        {"asset": "XRP", "qty": 0.0, "price": 1.0, "exchange": "big"},
+    ])
+    trades = plan_rebalance(pos, {"BTC": 81.8, "ETH": 0.0, "XRP": 18.2}, fees={"tiny": 0.0, "big": 0.0},
+                            min_notional={"tiny": 50.0, "big": 1.0}, band_pct=0.0)
+    by_asset = trades.set_index("asset")
+    assert "BTC" not in by_asset.index
+    assert by_asset.loc["ETH", "notional"] == 10.0
+    # Only the kept ETH sale (10) funds XRP, not the dropped BTC sale as well.
+    assert by_asset.loc["XRP", "notional"] <= 10.0 + 1e-9
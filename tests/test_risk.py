@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+from chainguardian.metrics import TOTAL
+from chainguardian.risk import RiskModel
+
+def _prices(days=200, seed=5):
+    rng = np.random.default_rng(seed)
+    idx = pd.date_range("2024-01-01", periods=days, freq="D")
+    common = rng.normal(0, 0.02, days)
+    rets = np.column_stack([common + rng.normal(0, 0.01, days), common + rng.normal(0, 0.01, days), rng.normal(0, 0.03, days)])
+    prices = pd.DataFrame(100 * np.cumprod(1 + rets, axis=0), index=idx, columns=["BTC", "ETH", "XRP"])
+    prices.iloc[:30, 2] = np.nan  # listed later
+    return prices
+
+def test_incremental_matches_pandas_over_window():
+    prices = _prices()
+    model = RiskModel(window=60)
+    for end in (50, 120, 121, 200):
+        model.update(prices.iloc[:end])
+    expected = prices.pct_change(fill_method=None).iloc[-60:]
+    pd.testing.assert_frame_equal(model.covariance(), expected.cov(), check_exact=False, atol=1e-12)
+    pd.testing.assert_frame_equal(model.correlation(), expected.corr(), check_exact=False, atol=1e-9)
+    assert model.correlation().loc["BTC", "ETH"] > 0.5
+
+def test_contributions_sum_to_portfolio_volatility():
+    model = RiskModel(window=90).update(_prices())
+    c = model.contributions({"BTC": 500.0, "ETH": 300.0, "XRP": 200.0})
+    assert abs(c.loc[TOTAL, "weight"] - 1.0) < 1e-12
+    assert abs(c.drop(TOTAL)["contribution"].sum() - c.loc[TOTAL, "volatility"]) < 1e-12
+    assert abs(c.loc[TOTAL, "contribution_pct"] - 1.0) < 1e-12
+
+def test_partial_day_is_revised_not_committed():
+    prices = _prices(days=80)
+    partial = prices.iloc[:61].copy()
+    partial.iloc[-1] *= [1.2, 0.8, 1.0]  # intraday price seen by an early rerun
+    model = RiskModel(window=30)
+    model.update(partial)
+    model.update(prices.iloc[:61])  # same day, final close
+    model.update(prices.iloc[:62])  # the next day starts
+    fresh = RiskModel(window=30).update(prices.iloc[:62])
+    pd.testing.assert_frame_equal(model.correlation(), fresh.correlation(), check_exact=False, atol=1e-12)
+    expected = prices.iloc[:62].pct_change(fill_method=None).iloc[-30:]
+    pd.testing.assert_frame_equal(model.covariance(), expected.cov(), check_exact=False, atol=1e-12)
+
+def test_concurrent_updates_add_each_day_once(monkeypatch):
+    import threading, time
+    from chainguardian import risk
+    prices = _prices(days=80)
+    expected = RiskModel(window=60).update(prices).covariance()
+    slow = risk._sums
+    def sums(block):
+        time.sleep(0.001)  # widen the window between reading and writing the running sums
+        return slow(block)
+    monkeypatch.setattr(risk, "_sums", sums)
+    risk.risk_model_for("race", prices.iloc[:40], window=60)
+    threads = [threading.Thread(target=risk.risk_model_for, args=("race", prices), kwargs={"window": 60}) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    got = risk.risk_model_for("race", prices, window=60).covariance()
+    assert np.allclose(got.to_numpy(), expected.to_numpy(), equal_nan=True)
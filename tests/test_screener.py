@@ -0,0 +1,42 @@
+import time
+import numpy as np
+from chainguardian.discovery import DiscoveryCache
+from chainguardian.market_data import calculate_rsi
+from chainguardian.screener import market_frame, screen, movers, screener_frame, rsi_matrix
+
+def _rows(n=300, seed=4):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for i in range(n):
+        spark = (100 * np.exp(np.cumsum(rng.normal(0, 0.01, 168 if i % 7 else 100)))).tolist()
+        rows.append({"id": f"coin-{i}", "symbol": f"c{i}", "name": f"Coin {i}", "market_cap_rank": i + 1,
+                     "current_price": spark[-1], "market_cap": 1e9 / (i + 1), "total_volume": 1e7 * (1 + i % 5),
+                     "price_change_percentage_24h_in_currency": float(rng.normal(0, 5)),
+                     "sparkline_in_7d": {"price": spark}})
+    return rows
+
+def test_vectorized_rsi_matches_scalar():
+    rows = _rows(20)
+    spark = [r["sparkline_in_7d"]["price"] for r in rows]
+    got = market_frame(rows)["rsi"].to_numpy()
+    for g, s in zip(got, spark):
+        assert abs(g - calculate_rsi(s)) < 1e-9
+    assert np.isnan(rsi_matrix(np.full((2, 5), 1.0))).all()
+
+def test_screen_filters_and_movers():
+    frame = market_frame(_rows())
+    big = screen(frame, sort_by="market_cap", min_market_cap=1e8, rsi_below=100)
+    assert (big["market_cap"] >= 1e8).all() and big["rank"].is_monotonic_increasing
+    assert list(screen(frame, text="coin 12", sort_by="rank", descending=False).index[:2]) == ["coin-12", "coin-120"]
+    spiking = screen(frame, min_volume_spike=2.0)
+    assert len(spiking) and (spiking["volume_spike"] >= 2.0).all()
+    gainers, losers = movers(frame, "24h", n=5)
+    assert gainers["change_24h"].min() >= losers["change_24h"].max()
+
+def test_screener_frame_served_from_cache(tmp_path):
+    calls = []
+    cache = DiscoveryCache(str(tmp_path), ttl=3600, fetch=lambda q, n: calls.append(n) or _rows(n))
+    first = screener_frame("usd", 300, cache=cache)
+    t = time.perf_counter()
+    again = screener_frame("usd", 300, cache=cache)
+    assert time.perf_counter() - t < 0.01 and again is first and calls == [300]
@@ -0,0 +1,56 @@
+from chainguardian.snapshots import SnapshotStore
+
+def test_snapshot_deltas_flows_and_movers(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    store.append({"btc": {"a": 10.0, "b": 5.0}, "eth": {"x": 100.0, "y": "pending"}}, ts=1000)
+    store.append({"btc": {"a": 12.0, "b": 5.0}, "eth": {"x": 40.0}}, ts=2000)  # b unchanged: skipped
+    store.append({"btc": {"a": 11.0}}, ts=3000)
+
+    reopened = SnapshotStore(str(tmp_path))
+    assert len(reopened.records()) == 6
+    flows = reopened.net_flows()
+    assert flows.loc["btc", "inflow"] == 2.0 and flows.loc["btc", "outflow"] == 1.0
+    assert flows.loc["eth", "net"] == -60.0
+    movers = reopened.top_movers(2)
+    assert list(movers["address"]) == ["x", "a"] and list(movers["delta"]) == [-60.0, -1.0]
+    assert reopened.latest()[("btc", "a")] == (3000.0, 11.0)
+
+def test_two_writers_share_address_ids(tmp_path):
+    app, daemon = SnapshotStore(str(tmp_path)), SnapshotStore(str(tmp_path))
+    app.append({"btc": {"a": 1.0}}, ts=1000)
+    daemon.append({"btc": {"b": 2.0}}, ts=1001)  # daemon never saw 'a'
+    app.append({"btc": {"c": 3.0}}, ts=1002)     # app never saw 'b'
+    daemon.append({"btc": {"a": 1.5, "c": 3.0}}, ts=1003)
+
+    latest = SnapshotStore(str(tmp_path)).latest()
+    assert latest[("btc", "a")] == (1003.0, 1.5)
+    assert latest[("btc", "b")] == (1001.0, 2.0)
+    assert latest[("btc", "c")] == (1002.0, 3.0)  # unchanged within the heartbeat: not rewritten
+
+def test_concurrent_writers(tmp_path):
+    import threading
+    def write(prefix):
+        store = SnapshotStore(str(tmp_path))
+        for k in range(30):
+            store.append({"eth": {f"{prefix}{k}": float(k)}}, ts=1000 + k)
+    threads = [threading.Thread(target=write, args=(p,)) for p in "xyz"]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    frame = SnapshotStore(str(tmp_path)).frame()
+    assert len(frame) == 90
+    assert all(float(a[1:]) == b for a, b in zip(frame["address"], frame["balance"]))
+
+def test_window_reads_and_torn_tail_repair(tmp_path):
+    from chainguardian.snapshots import SNAPSHOT_DTYPE
+    store = SnapshotStore(str(tmp_path), heartbeat=0)
+    for t in range(100):
+        store.append({"btc": {"a": float(t)}}, ts=1000 + t)
+    assert store.records(since=1090)["balance"].tolist() == [float(t) for t in range(90, 100)]
+    assert len(store.records(since=5000)) == 0 and len(store.records(since=0)) == 100
+    with open(tmp_path / "snapshots.bin", "ab") as fh:
+        fh.write(b"\x01\x02\x03")  # a crashed writer's partial record
+    store.append({"btc": {"a": 500.0}}, ts=2000)
+    assert (tmp_path / "snapshots.bin").stat().st_size == 101 * SNAPSHOT_DTYPE.itemsize
+    assert SnapshotStore(str(tmp_path)).records(since=1500).tolist() == [(2000.0, 1, 0, 500.0)]
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+from chainguardian.backtest import backtest
+from chainguardian.metrics import TOTAL
+from chainguardian.sweep import sweep
+
+def _market(n_assets=3, years=3, seed=1):
+    rng = np.random.default_rng(seed)
+    days = pd.date_range("2021-01-01", periods=365 * years, freq="D")
+    prices = pd.DataFrame(np.exp(np.cumsum(rng.normal(0.002, 0.05, (len(days), n_assets)), axis=0)) * 100,
+                          index=days, columns=[f"A{i}" for i in range(n_assets)])
+    return prices, pd.Series(rng.integers(0, 100, len(days)), index=days)
+
+def test_sweep_ranks_grid_and_tunes_per_asset_thresholds():
+    prices, fng = _market()
+    r = sweep(prices, fng, profit_pcts=(50.0, 200.0), fear_thresholds=(20, 30), workers=1, fee_pct=0.0)
+    ranked = r["ranked"]
+    assert len(ranked) == 2 * 2 + 2
+    assert ranked["return_pct"].is_monotonic_decreasing
+    # Each grid row matches a direct backtest.
+    row = ranked[(ranked["profit_pct"] == 200.0) & (ranked["fear_threshold"] == 30)].iloc[0]
+    direct = backtest(prices, fng, profit_pct=200.0, fear_threshold=30, fee_pct=0.0)["summary"].loc[TOTAL]
+    assert abs(row["profit"] - direct["profit"]) < 1e-6
+    # The tuned row picks each asset's best threshold, so it is at least as good as any uniform one.
+    for fear in (20, 30):
+        rows = ranked[ranked["fear_threshold"] == fear]
+        tuned = rows[rows["profit_pct"].isna()].iloc[0]
+        assert set(tuned["thresholds"]) == set(prices.columns)
+        assert tuned["profit"] >= rows["profit"].max() - 1e-6
+
+def test_sweep_process_pool_matches_inline():
+    prices, fng = _market(n_assets=2, years=1, seed=2)
+    inline = sweep(prices, fng, profit_pcts=(100.0, 300.0), fear_thresholds=(25,), workers=1)["ranked"]
+    pooled = sweep(prices, fng, profit_pcts=(100.0, 300.0), fear_thresholds=(25,), workers=2)["ranked"]
+    pd.testing.assert_frame_equal(inline.drop(columns="thresholds"), pooled.drop(columns="thresholds"))
+
+def test_assets_without_a_score_fall_back_to_the_best_uniform_threshold():
+    prices, fng = _market(n_assets=2, years=1, seed=3)
+    r = sweep(prices, None, profit_pcts=[50, 100], fear_thresholds=[25], workers=1)  # no F&G: nothing is bought
+    tuned = r["ranked"][r["ranked"]["profit_pct"].isna()].iloc[0]
+    assert set(tuned["thresholds"].values()) <= {50.0, 100.0} and set(tuned["thresholds"]) == set(prices.columns)
+
+def test_asset_listed_late_still_gets_a_threshold():
+    prices, fng = _market(n_assets=2, years=1, seed=4)
+    prices.iloc[:-1, 1] = np.nan  # A1 only has a price on the last day
+    r = sweep(prices, fng, profit_pcts=[50, 100], fear_thresholds=[25], workers=1)
+    tuned = r["ranked"][r["ranked"]["profit_pct"].isna()].iloc[0]
+    assert tuned["thresholds"]["A1"] in (50.0, 100.0)
@@ -0,0 +1,26 @@
+from chainguardian.addresses import TrackedAddresses
+from chainguardian.orders import OrderTable
+from chainguardian.tables import order_page, wallet_page, page_bounds
+
+def test_order_page_filters_sorts_and_decodes_only_the_page():
+    orders = [{"id": i, "asset": "XRP/USDT" if i % 2 else "BTC/USD", "side": "buy" if i % 3 else "sell",
+               "amount": float(i), "price": 2.0, "exchange": "kraken" if i % 5 == 0 else "binance",
+               "timestamp": f"2024-01-{1 + i % 28:02d}T00:00:00", "note": "", "status": "recorded"} for i in range(1, 101)]
+    table = OrderTable.from_records(orders)
+    page, total, pages = order_page(table, page=2, page_size=10, sort_by="amount", base="xrp")
+    assert total == 50 and pages == 5 and len(page) == 10
+    assert page["amount"].tolist() == [79.0, 77.0, 75.0, 73.0, 71.0, 69.0, 67.0, 65.0, 63.0, 61.0]
+    page, total, _ = order_page(table, side="sell", text="KRAK", sort_by="id", descending=False)
+    assert total == 6 and page["id"].tolist() == [15, 30, 45, 60, 75, 90]
+    assert page_bounds(0, 3, 10) == (0, 0, 1) and page_bounds(25, 9, 10) == (20, 25, 3)
+
+def test_wallet_page_uses_index_prefix_search():
+    tracked = TrackedAddresses()
+    tracked.add("eth", [f"0x{i:040x}" for i in range(300)])
+    tracked.add("btc", ["1BoatSLRHtKNngkdXEeobR76b53LETtpyT"])
+    assert tracked["eth"].search("0x00000000000000000000000000000000000001", limit=3) == \
+        [f"0x{i:040x}" for i in (0x100, 0x101, 0x102)]
+    view, total, pages = wallet_page(tracked, {"eth": {f"0x{5:040x}": 9.0}}, chain="eth", page_size=20)
+    assert total == 300 and pages == 15 and view.loc[0, "balance"] == 9.0
+    view, total, _ = wallet_page(tracked, search="1boat")
+    assert total == 1 and view.loc[0, "chain"] == "btc"
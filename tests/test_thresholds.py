@@ -4,3 +4,22 @@ def test_threshold_signal():
     sig, qty = profit_take_signal(stats, profit_pct=300.0)
     assert sig is True
     assert qty > 0
+
+def test_profit_take_table_matches_scalar_signal():
+    import numpy as np
+    from chainguardian.thresholds import profit_take_table, profit_take_accounts
+    rng = np.random.default_rng(3)
+    stats = {f"A{i}": {"remaining_qty": float(q), "avg_buy": float(a), "current_price": float(c)}
+             for i, (q, a, c) in enumerate(zip(rng.uniform(0, 5, 200), rng.uniform(0, 10, 200), rng.uniform(0, 60, 200)))}
+    stats["A0"]["avg_buy"] = None
+    custom = {"A1": 50.0, "A2": 0.0}
+    table = profit_take_table(stats, 300.0, custom)
+    for sym, s in stats.items():
+        sig, qty = profit_take_signal(s, profit_pct=custom.get(sym, 300.0))
+        assert bool(table.loc[sym, "signal"]) == sig and np.isclose(table.loc[sym, "sell_qty"], qty)
+    hit = table[table["signal"]]
+    assert np.allclose(hit["principal"], hit["sell_qty"] * hit["avg_buy"])
+    assert np.allclose(hit["proceeds"] - hit["principal"], hit["profit"])
+    both = profit_take_accounts({"main": stats, "alt": stats}, 300.0, {"main": custom})
+    assert both.loc["main", "threshold"].loc["A1"] == 50.0 and both.loc["alt", "threshold"].loc["A1"] == 300.0
+    assert both.loc["main"]["signal"].equals(table["signal"])
@@ -0,0 +1,97 @@
+from chainguardian import top_wallets
+
+class _Resp:
+    def __init__(self, payload):
+        self.payload = payload
+    def raise_for_status(self):
+        pass
+    def json(self):
+        return self.payload
+
+def test_balances_are_batched(monkeypatch):
+    calls = []
+    def fake_get(url, params=None, timeout=None):
+        calls.append(url)
+        if "etherscan" in url:
+            addrs = params["address"].split(",")
+            return _Resp({"status": "1", "result": [{"account": a.lower(), "balance": "2000000000000000000"} for a in addrs]})
+        addrs = url.split("/")[-1].split(",")
+        return _Resp({"data": {"addresses": {a: {"balance": 50_000_000} for a in addrs}}})
+    monkeypatch.setattr(top_wallets.requests, "get", fake_get)
+
+    btc = [f"bc1q{i:04d}" for i in range(250)]
+    eth = [f"0xAbC{i:037d}" for i in range(45)]
+    lines = top_wallets.get_whale_activity({"tracked_addresses": {"btc": btc, "eth": eth}, "api_keys": {"etherscan": "k"}})
+    assert len(calls) == 3 + 3  # ceil(250/100) + ceil(45/20)
+    assert len(lines) == 295 and "2.0000 ETH" in lines[0] and "0.500000 BTC" in lines[-1]
+
+def test_fetch_balances_deadline_marks_pending(monkeypatch):
+    import time
+    def fake_get(url, params=None, timeout=None):
+        addr = url.split("/")[-1]
+        if addr.startswith("slow"):
+            time.sleep(1.0)
+        return _Resp({"data": {addr: {"address": {"balance": str(10 ** 18)}}}})
+    monkeypatch.setattr(top_wallets.requests, "get", fake_get)
+    t = time.perf_counter()
+    out = top_wallets.fetch_balances({"eth": ["fast1", "fast2", "slow1"]}, deadline=0.3)
+    assert time.perf_counter() - t < 0.9
+    assert out["eth"] == {"fast1": 1.0, "fast2": 1.0, "slow1": top_wallets.PENDING}
+
+def test_late_answers_go_to_the_next_fetch(monkeypatch):
+    import threading
+    calls, gate = [], threading.Event()
+    def fake_get(url, params=None, timeout=None):
+        addr = url.split("/")[-1]
+        calls.append(addr)
+        if addr.startswith("late"):
+            gate.wait(2.0)
+        return _Resp({"data": {addr: {"address": {"balance": str(3 * 10 ** 18)}}}})
+    monkeypatch.setattr(top_wallets.requests, "get", fake_get)
+    assert top_wallets.fetch_balances({"eth": ["late1"]}, deadline=0.1)["eth"] == {"late1": top_wallets.PENDING}
+    gate.set()
+    assert top_wallets.fetch_balances({"eth": ["late1"]}, deadline=1.0)["eth"] == {"late1": 3.0}
+    assert calls == ["late1"]  # answered by the first request, not sent again
+
+def test_busy_provider_does_not_hold_up_another(monkeypatch):
+    import threading, time
+    gate = threading.Event()
+    def fake_get(url, params=None, timeout=None):
+        if "etherscan" in url:
+            gate.wait(2.0)
+            return _Resp({"status": "1", "result": []})
+        addr = url.split("/")[-1]
+        return _Resp({"data": {addr: {"account": {"account_data": {"Balance": "1000000"}}}}})
+    monkeypatch.setattr(top_wallets.requests, "get", fake_get)
+    eth = [f"0x{i:040x}" for i in range(20 * 12)]  # 12 etherscan batches, 3x its concurrency
+    xrp = [f"rBusy{i}" for i in range(4)]
+    t = time.perf_counter()
+    out = top_wallets.fetch_balances({"eth": eth, "xrp": xrp}, {"etherscan": "k"}, deadline=0.5)
+    gate.set()
+    assert out["xrp"] == {a: 1.0 for a in xrp}
+    assert time.perf_counter() - t < 1.0
+
+def test_keyless_eth_balances_are_shown(monkeypatch):
+    def fake_get(url, params=None, timeout=None):
+        addr = url.split("/")[-1]
+        return _Resp({"data": {addr: {"address": {"balance": str(2 * 10 ** 18)}}}})
+    monkeypatch.setattr(top_wallets.requests, "get", fake_get)
+    lines = top_wallets.get_whale_activity({"tracked_addresses": {"eth": ["0xkeyless"]}, "api_keys": {}})
+    assert lines == ["ETH 0xkeyles…: 2.0000 ETH"]
+
+def test_late_answers_stay_with_their_api_key_and_untracked_ones_are_dropped(monkeypatch):
+    import threading
+    gate = threading.Event()
+    def fake_get(url, params=None, timeout=None):
+        gate.wait(2.0)
+        return _Resp({"status": "1", "result": [{"account": a, "balance": str(10 ** 18)} for a in params["address"].split(",")]})
+    monkeypatch.setattr(top_wallets.requests, "get", fake_get)
+    top_wallets.fetch_balances({"eth": ["0xk1"]}, {"etherscan": "alice"}, deadline=0.05)
+    assert top_wallets.fetch_balances({"eth": ["0xk1"]}, {"etherscan": "bob"}, deadline=0.05)["eth"]["0xk1"] == top_wallets.PENDING
+    gate.set()
+    assert len([k for k in top_wallets._in_flight if k[2] == "0xk1"]) == 2  # one lookup per key
+    top_wallets.fetch_balances({"eth": ["0xk1"]}, {"etherscan": "alice"}, deadline=1.0)
+    left = [k for k in top_wallets._in_flight if k[2] == "0xk1"]
+    assert left == [(("etherscan", "bob"), "eth", "0xk1")]
+    top_wallets.fetch_balances({"eth": []}, {"etherscan": "bob"}, chains=["eth"], deadline=1.0)  # bob untracked it
+    assert not [k for k in top_wallets._in_flight if k[2] == "0xk1"]
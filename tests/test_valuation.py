@@ -0,0 +1,36 @@
+import math
+from chainguardian.portfolio import Portfolio
+
+def test_multi_quote_from_one_fetch():
+    store = {"orders": [
+        {"id": 1, "asset": "BTC/EUR", "side": "buy", "amount": 1.0, "price": 50000.0},
+        {"id": 2, "asset": "XRP/USDT", "side": "buy", "amount": 100.0, "price": 1.0},
+    ]}
+    calls = []
+    def provider(syms):
+        calls.append(syms)
+        return {"btc": {"price": 60000.0, "change_24h": 1.0}, "xrp": {"price": 2.0, "change_24h": None}}
+    # units per 1 BTC: 1 EUR = 1.2 USD
+    rates = {"btc": 1.0, "usd": 60000.0, "eur": 50000.0}
+    out = Portfolio(store).compute_stats_multi(provider, quotes=["USD", "EUR", "BTC"], rates=rates)
+    assert len(calls) == 1 and "usdt" in calls[0]
+    assert out["USD"]["BTC"]["avg_buy"] == 60000.0  # 50k EUR lot valued in USD
+    assert out["EUR"]["BTC"]["current_price"] == 50000.0
+    assert out["BTC"]["BTC"]["current_price"] == 1.0
+    assert out["USD"]["XRP"]["unrealized_value"] == 100.0  # USDT pegged at 1 USD
+
+def test_lots_without_fx_are_unpriced_not_zero():
+    store = {"orders": [
+        {"id": 1, "asset": "BTC/USD", "side": "buy", "amount": 1.0, "price": 50000.0},
+        {"id": 2, "asset": "BTC/ZZZ", "side": "buy", "amount": 3.0, "price": 7.0},  # no FX rate for ZZZ
+        {"id": 3, "asset": "ETH/ZZZ", "side": "buy", "amount": 2.0, "price": 9.0},
+    ]}
+    provider = lambda syms: {"btc": {"price": 60000.0}, "eth": {"price": 3000.0}}
+    rates = {"btc": 1.0, "usd": 60000.0}
+    out = Portfolio(store).compute_stats_multi(provider, quotes=["USD", "GBP"], rates=rates)
+    btc = out["USD"]["BTC"]
+    assert btc["remaining_qty"] == 4.0
+    assert btc["avg_buy"] == 50000.0  # the ZZZ lot doesn't dilute the average
+    eth = out["USD"]["ETH"]
+    assert math.isnan(eth["avg_buy"]) and math.isnan(eth["unrealized_value"]) and eth["current_price"] == 3000.0
+    assert math.isnan(out["GBP"]["BTC"]["current_price"])  # no rate for the reporting quote either
@@ -0,0 +1,56 @@
+import time
+from chainguardian import whale_daemon
+from chainguardian.polling import PriceScheduler
+from chainguardian.snapshots import SnapshotStore
+from chainguardian.top_wallets import PENDING
+
+def test_daemon_tick_writes_snapshots_the_ui_reads(tmp_path, monkeypatch):
+    store = {"accounts": {"main": {"tracked_addresses": {"btc": ["a", "b"]}},
+                          "alt": {"tracked_addresses": {"btc": ["b"], "eth": ["x"]}, "api_keys": {"etherscan": ""}}}}
+    monkeypatch.setattr(whale_daemon, "load_store", lambda profile=None: store)
+    monkeypatch.setattr(whale_daemon, "poll_balances",
+                        lambda sched, tracked, keys, deadline: (None, {c: {a: 1.5 for a in addrs} for c, addrs in tracked.items()}))
+    assert whale_daemon.collect_tracked(store) == {(): ({"btc": ["a", "b"], "eth": ["x"]}, {})}
+
+    snaps = SnapshotStore(str(tmp_path))
+    assert whale_daemon.daemon_balances({"btc": ["a"]}, snaps) is None  # no daemon yet: caller fetches
+    assert whale_daemon.run_once({}, snaps, profiles=["default"]) == 3
+    whale_daemon.write_status(snaps, pid=1, last_poll=time.time(), profiles=["default"])
+    reader = SnapshotStore(str(tmp_path))
+    assert whale_daemon.daemon_balances({"btc": ["a", "new"]}, reader) == {"btc": {"a": 1.5, "new": PENDING}}
+    # A daemon watching other profiles doesn't relieve this one of fetching (or alerting).
+    assert whale_daemon.daemon_balances({"btc": ["a"]}, reader, profile="bob") is None
+    assert whale_daemon.daemon_alive(reader) and not whale_daemon.daemon_alive(reader, profile="bob")
+
+def test_each_profile_polls_with_its_own_keys(tmp_path, monkeypatch):
+    stores = {"alice": {"accounts": {"main": {"tracked_addresses": {"eth": ["x"]}, "api_keys": {"etherscan": "A"}}}},
+              "bob": {"accounts": {"main": {"tracked_addresses": {"eth": ["y"]}}}}}
+    calls = []
+    monkeypatch.setattr(whale_daemon, "load_store", lambda profile=None: stores[profile])
+    def poll(sched, tracked, keys, deadline):
+        calls.append((tracked, keys))
+        return None, {c: {a: 1.0 for a in addrs} for c, addrs in tracked.items()}
+    monkeypatch.setattr(whale_daemon, "poll_balances", poll)
+    schedulers = {}
+    assert whale_daemon.run_once(schedulers, SnapshotStore(str(tmp_path)), profiles=["alice", "bob"]) == 2
+    assert calls == [({"eth": ["x"]}, {"etherscan": "A"}), ({"eth": ["y"]}, {})]
+    assert len(schedulers) == 2
+
+def test_daemon_delivers_alerts_without_the_page(tmp_path, monkeypatch):
+    store = {"settings": {"alert_sinks": [{"type": "file", "path": str(tmp_path / "alerts.jsonl")}]},
+             "accounts": {"main": {"orders": [{"id": 1, "asset": "BTC/USD", "side": "buy", "amount": 1.0, "price": 100.0}],
+                                   "alert_rules": [{"id": 7, "kind": "price_above", "asset": "BTC", "value": 150.0}]}}}
+    price = {"btc": 120.0}
+    monkeypatch.setattr(whale_daemon, "load_store", lambda profile=None: store)
+    monkeypatch.setattr(whale_daemon, "prices_coingecko", lambda syms, quote: {s: {"price": price["btc"]} for s in syms})
+    monkeypatch.setattr(whale_daemon, "historical_prices_coingecko", lambda sym, days, quote: [])
+    monkeypatch.setattr(whale_daemon, "price_scheduler_for", lambda key: PriceScheduler(default=0))
+    snaps = SnapshotStore(str(tmp_path))
+    rates = {"btc": 1.0, "usd": 1.0}
+    monkeypatch.setattr("chainguardian.portfolio.fetch_exchange_rates", lambda *a, **k: rates)
+    assert whale_daemon.run_alerts(snaps, profiles=["daemon-test"]) == 0
+    price["btc"] = 160.0
+    assert whale_daemon.run_alerts(snaps, profiles=["daemon-test"]) == 1
+    assert whale_daemon.run_alerts(snaps, profiles=["daemon-test"]) == 0  # edge-triggered across ticks
+    assert whale_daemon.flush_dispatchers(timeout=3)
+    assert "BTC price" in (tmp_path / "alerts.jsonl").read_text()